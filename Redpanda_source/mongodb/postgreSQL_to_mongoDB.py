@@ -1,8 +1,9 @@
 import os
+import argparse
 import psycopg2
 from psycopg2.extras import DictCursor
 from psycopg2 import pool
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne, DeleteOne
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
 from decimal import Decimal
@@ -61,16 +62,24 @@ def preprocess_document(doc):
     return doc
 
 def copy_single_table(postgres_pool, mongo_db, postgres_table, mongo_collection, batch_size=45000):
-    """Transfer data from a PostgreSQL table to a MongoDB collection."""
+    """
+    Transfer data from a PostgreSQL table to a MongoDB collection.
+
+    Returns True once every row is copied, False if the transfer failed (the
+    collection may then be empty or partially copied).
+    """
+    conn = None
+    cursor = None
     try:
         conn = postgres_pool.getconn()
         cursor = conn.cursor(cursor_factory=DictCursor)
 
         logging.info(f"Starting transfer for table: {postgres_table} -> collection: {mongo_collection}")
 
-        # Fetch and transfer data in batches
+        # Fetch and transfer data in batches, replacing the previous copy
         cursor.execute(f"SELECT * FROM {postgres_table};")
         mongo_col = mongo_db[mongo_collection]
+        mongo_col.drop()
         
         while True:
             rows = cursor.fetchmany(batch_size)
@@ -83,8 +92,11 @@ def copy_single_table(postgres_pool, mongo_db, postgres_table, mongo_collection,
             
             logging.info(f"Inserted {len(documents)} records from {postgres_table} to {mongo_collection}.")
 
+        return True
+
     except Exception as e:
         logging.error(f"Error transferring data for table {postgres_table}: {e}")
+        return False
 
     finally:
         if cursor:
@@ -92,25 +104,169 @@ def copy_single_table(postgres_pool, mongo_db, postgres_table, mongo_collection,
         if conn:
             postgres_pool.putconn(conn)
 
-def copy_table(postgres_config, mongo_config, table_map):
-    """Main function to orchestrate the data transfer."""
+def get_sync_state(mongo_db):
+    """Return the last updates_log position synced to MongoDB, or None."""
+    state = mongo_db[SYNC_STATE_COLLECTION].find_one({'_id': 'updates_log'})
+    if state is None:
+        return None
+    return datetime.fromisoformat(state['update_date']), state['log_id']
+
+def save_sync_state(mongo_db, position):
+    """Persist the updates_log high-water mark once its changes are applied."""
+    update_date, log_id = position
+    # ISO string: BSON dates would truncate the microseconds of the keyset position
+    mongo_db[SYNC_STATE_COLLECTION].update_one(
+        {'_id': 'updates_log'},
+        {'$set': {'update_date': update_date.isoformat(), 'log_id': log_id, 'synced_at': datetime.now()}},
+        upsert=True
+    )
+
+def current_log_position(postgres_pool):
+    """Return the newest settled updates_log position, to resume from after a full copy."""
+    conn = postgres_pool.getconn()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT update_date, id FROM updates_log
+                WHERE update_date <= LOCALTIMESTAMP - make_interval(secs => %s)
+                ORDER BY update_date DESC, id DESC
+                LIMIT 1
+            """, (SYNC_SETTLE_SECONDS,))
+            row = cursor.fetchone()
+        conn.rollback()
+        return tuple(row) if row else (datetime(1970, 1, 1), 0)
+    finally:
+        postgres_pool.putconn(conn)
+
+def create_key_indexes(mongo_db, table_map):
+    """Index the business key of each collection, used as the upsert filter."""
+    for postgres_table, mongo_collection in table_map.items():
+        mongo_db[mongo_collection].create_index(table_keys[postgres_table])
+
+def sync_page(cursor, mongo_db, table_map, entries):
+    """
+    Apply one page of updates_log entries to MongoDB.
+
+    The current PostgreSQL row is the source of truth: entities that still exist
+    are upserted, the others are deleted. Each collection receives a single
+    unordered bulk write.
+    """
+    changed = {}
+    for entry in entries:
+        if entry['entity_type'] in table_map:
+            changed.setdefault(entry['entity_type'], set()).add(entry['entity_id'])
+
+    counts = {}
+    for postgres_table, entity_ids in changed.items():
+        key = table_keys[postgres_table]
+        cursor.execute(
+            f"SELECT * FROM {postgres_table} WHERE {key} = ANY(%s);",
+            (list(entity_ids),)
+        )
+        operations = []
+        for row in cursor.fetchall():
+            doc = preprocess_document(dict(row))
+            doc.pop('content_hash', None)
+            entity_ids.discard(row[key])
+            operations.append(UpdateOne({key: row[key]}, {'$set': doc}, upsert=True))
+        operations.extend(DeleteOne({key: entity_id}) for entity_id in entity_ids)
+
+        result = mongo_db[table_map[postgres_table]].bulk_write(operations, ordered=False)
+        counts[postgres_table] = (result.upserted_count + result.modified_count, result.deleted_count)
+    return counts
+
+def sync_changes(postgres_pool, mongo_db, table_map, position, batch_size=10000):
+    """
+    Replay the updates_log entries written since `position` into MongoDB.
+
+    The log is read with keyset pagination on (update_date, id), an ordered scan of
+    the idx_log_date_id btree created by the data updater schema (the BRIN index on
+    update_date cannot return rows in order); the high-water mark is saved after
+    each page, so an interrupted sync resumes where it stopped.
+    Entries younger than SYNC_SETTLE_SECONDS are left for the next run, a merge
+    still running may commit log rows dated before the newest ones.
+    """
+    conn = postgres_pool.getconn()
+    try:
+        cursor = conn.cursor(cursor_factory=DictCursor)
+        while True:
+            cursor.execute("""
+                SELECT id, update_date, entity_type, entity_id FROM updates_log
+                WHERE update_date >= %(since_date)s
+                AND (update_date, id) > (%(since_date)s, %(since_id)s)
+                AND update_date <= LOCALTIMESTAMP - make_interval(secs => %(settle)s)
+                ORDER BY update_date, id
+                LIMIT %(batch_size)s;
+            """, {
+                'since_date': position[0],
+                'since_id': position[1],
+                'settle': SYNC_SETTLE_SECONDS,
+                'batch_size': batch_size,
+            })
+            entries = cursor.fetchall()
+            if not entries:
+                break
+
+            counts = sync_page(cursor, mongo_db, table_map, entries)
+            conn.rollback()
+            position = (entries[-1]['update_date'], entries[-1]['id'])
+            save_sync_state(mongo_db, position)
+            for postgres_table, (upserted, deleted) in counts.items():
+                logging.info(f"Synced {postgres_table}: {upserted} upserted, {deleted} deleted.")
+
+            if len(entries) < batch_size:
+                break
+        cursor.close()
+        logging.info(f"Incremental sync completed up to {position[0]} (log id {position[1]}).")
+    finally:
+        postgres_pool.putconn(conn)
+
+def copy_table(postgres_config, mongo_config, table_map, full=False):
+    """
+    Main function to orchestrate the data transfer.
+
+    Without a saved high-water mark (or with `full`), every table is copied and the
+    current updates_log position recorded. Later runs only sync the tables fed by
+    the updater from updates_log; the reference tables keep their full copy.
+    """
+    postgres_pool = None
+    mongo_client = None
     try:
         # Initialize PostgreSQL pool and MongoDB client
         postgres_pool = get_postgres_pool(postgres_config)
         mongo_client = get_mongo_client(mongo_config)
         mongo_db = mongo_client[mongo_config['DATABASE']]
 
-        # Parallelize the transfer using ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = []
-            for postgres_table, mongo_collection in table_map.items():
-                futures.append(executor.submit(copy_single_table, postgres_pool, mongo_db, postgres_table, mongo_collection))
+        position = None if full else get_sync_state(mongo_db)
+        if position is None:
+            # Taken before copying: changes made during the copy are replayed next run
+            position = current_log_position(postgres_pool)
+            # Until every table is copied, the next run must copy again
+            mongo_db[SYNC_STATE_COLLECTION].delete_one({'_id': 'updates_log'})
+
+            # Parallelize the transfer using ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = []
+                for postgres_table, mongo_collection in table_map.items():
+                    futures.append(executor.submit(copy_single_table, postgres_pool, mongo_db, postgres_table, mongo_collection))
 
-            # Wait for all tasks to complete
-            for future in futures:
-                future.result()
+                # Wait for all tasks to complete
+                copied = [future.result() for future in futures]
 
-        logging.info("Data transfer completed successfully.")
+            if not all(copied):
+                logging.error("Full copy incomplete: no high-water mark saved, the next run copies again.")
+                return
+
+            create_key_indexes(mongo_db, table_map)
+            save_sync_state(mongo_db, position)
+            logging.info("Data transfer completed successfully.")
+
+        synced_tables = {
+            postgres_table: mongo_collection
+            for postgres_table, mongo_collection in table_map.items()
+            if postgres_table in logged_tables
+        }
+        sync_changes(postgres_pool, mongo_db, synced_tables, position)
 
     except Exception as e:
         logging.error(f"Error during data transfer: {e}")
@@ -151,6 +307,32 @@ table_map = {
     'unitelegale': 'unitelegale',
 }
 
+# Business key of each table, used to upsert and delete documents
+table_keys = {
+    'adresse': 'siret',
+    'categorie_juridique': 'codecj',
+    'etablissement': 'siret',
+    'geolocalisation': 'siret',
+    'nafv2': 'codenaf',
+    'unitelegale': 'siren',
+}
+
+# Tables whose changes are recorded in updates_log by the data updater
+logged_tables = ('adresse', 'etablissement', 'unitelegale')
+
+# Collection holding the updates_log high-water mark
+SYNC_STATE_COLLECTION = 'sync_state'
+
+# updates_log entries younger than this are synced on the next run
+SYNC_SETTLE_SECONDS = int(os.getenv('SYNC_SETTLE_SECONDS', '600'))
+
 # Transfer data
 if __name__ == "__main__":
-    copy_table(postgres_config, mongo_config, table_map)
+    parser = argparse.ArgumentParser(description="PostgreSQL to MongoDB sync")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Copy every table again instead of syncing the changes since the last run"
+    )
+    args = parser.parse_args()
+    copy_table(postgres_config, mongo_config, table_map, full=args.full)
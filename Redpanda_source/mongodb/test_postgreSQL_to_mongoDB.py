@@ -0,0 +1,76 @@
+"""Tests of the PostgreSQL to MongoDB sync."""
+
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from pymongo import DeleteOne, UpdateOne
+
+import postgreSQL_to_mongoDB as sync
+
+
+def test_sync_page_upserts_existing_rows_and_deletes_missing_ones():
+    """ Rows still in PostgreSQL are upserted, the other logged ids are deleted """
+    cursor = MagicMock()
+    cursor.fetchall.return_value = [
+        {'siret': '11111111111111', 'denominationusuelleetablissement': 'A', 'content_hash': 'x'},
+    ]
+    mongo_db = MagicMock()
+    collection = mongo_db['etablissement']
+    collection.bulk_write.return_value = MagicMock(upserted_count=0, modified_count=1, deleted_count=1)
+    entries = [
+        {'entity_type': 'etablissement', 'entity_id': '11111111111111'},
+        {'entity_type': 'etablissement', 'entity_id': '22222222222222'},
+        {'entity_type': 'etablissement', 'entity_id': '11111111111111'},
+        {'entity_type': 'geolocalisation', 'entity_id': '33333333333333'},
+    ]
+
+    counts = sync.sync_page(cursor, mongo_db, {'etablissement': 'etablissement'}, entries)
+
+    query, params = cursor.execute.call_args.args
+    assert "FROM etablissement WHERE siret = ANY(%s)" in query
+    assert sorted(params[0]) == ['11111111111111', '22222222222222']
+    operations = collection.bulk_write.call_args.args[0]
+    assert operations == [
+        UpdateOne({'siret': '11111111111111'},
+                  {'$set': {'siret': '11111111111111', 'denominationusuelleetablissement': 'A'}},
+                  upsert=True),
+        DeleteOne({'siret': '22222222222222'}),
+    ]
+    assert collection.bulk_write.call_args.kwargs == {'ordered': False}
+    assert counts == {'etablissement': (1, 1)}
+
+
+def test_failed_full_copy_saves_no_high_water_mark():
+    """ If one table fails to copy, the next run copies everything again """
+    mongo_client = MagicMock()
+    mongo_db = mongo_client['siren']
+
+    with patch.object(sync, 'get_postgres_pool'), \
+         patch.object(sync, 'get_mongo_client', return_value=mongo_client), \
+         patch.object(sync, 'current_log_position', return_value=(datetime(2024, 3, 1), 42)), \
+         patch.object(sync, 'copy_single_table', side_effect=lambda pool, db, table, collection: table != 'nafv2'), \
+         patch.object(sync, 'save_sync_state') as save_sync_state, \
+         patch.object(sync, 'sync_changes') as sync_changes:
+        sync.copy_table({}, {'DATABASE': 'siren'}, sync.table_map, full=True)
+
+    mongo_db[sync.SYNC_STATE_COLLECTION].delete_one.assert_called_once_with({'_id': 'updates_log'})
+    save_sync_state.assert_not_called()
+    sync_changes.assert_not_called()
+
+
+def test_complete_full_copy_saves_the_position_taken_before_copying():
+    """ The mark is the log position read before the copy, changes made during it are replayed """
+    mongo_client = MagicMock()
+    position = (datetime(2024, 3, 1), 42)
+
+    with patch.object(sync, 'get_postgres_pool'), \
+         patch.object(sync, 'get_mongo_client', return_value=mongo_client), \
+         patch.object(sync, 'current_log_position', return_value=position), \
+         patch.object(sync, 'copy_single_table', return_value=True), \
+         patch.object(sync, 'save_sync_state') as save_sync_state, \
+         patch.object(sync, 'sync_changes') as sync_changes:
+        sync.copy_table({}, {'DATABASE': 'siren'}, sync.table_map, full=True)
+
+    save_sync_state.assert_called_once_with(mongo_client['siren'], position)
+    assert sync_changes.call_args.args[3] == position
+    assert set(sync_changes.call_args.args[2]) == set(sync.logged_tables)
@@ -0,0 +1,131 @@
+"""Module du client asynchrone pour l'API INSEE."""
+
+import os
+import time
+import asyncio
+
+import httpx
+from dotenv import load_dotenv
+
+from app.src.config.settings import API_TIMEOUT, API_CALLS_PER_MINUTE, API_BURST, HTTP_POOL_SIZE
+from app.src.utils.logger import DatabaseLogger
+from app.src.api.base_client import build_insee_url, InseeFetchError, NO_RESULT_STATUS
+from app.src.api.metrics import RequestStats
+from app.src.api.rate_limiter import AsyncTokenBucket
+from app.src.api.retry import RetryPolicy, RETRY_STATUSES
+
+
+class AsyncInseeClient:
+    """
+    Client asynchrone pour l'API INSEE (httpx).
+
+    Les appels de tous les clients d'une même boucle passent par le même
+    limiteur `limiter` ; les réponses 429/5xx sont retentées selon la même
+    politique que le client synchrone.
+    """
+
+    def __init__(self, table_name, limiter: AsyncTokenBucket = None, policy: RetryPolicy = None):
+        """
+        Args:
+            table_name (str): 'etablissement' ou 'unitelegale'
+            limiter (AsyncTokenBucket): Limiteur partagé entre les clients
+            policy (RetryPolicy): Politique de nouvelles tentatives
+        """
+        load_dotenv()
+
+        self.api_key = os.getenv("api_key")
+        if not self.api_key:
+            raise ValueError("La clé API est manquante")
+
+        self.table_name = table_name
+        self.logger = DatabaseLogger()
+        self.stats = RequestStats(table_name)
+        self.limiter = limiter or AsyncTokenBucket(API_CALLS_PER_MINUTE, API_BURST)
+        self.policy = policy or RetryPolicy()
+        self.headers = {
+            "Accept": "application/json",
+            "X-INSEE-Api-Key-Integration": self.api_key
+        }
+        self.http = httpx.AsyncClient(
+            timeout=API_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=HTTP_POOL_SIZE),
+            headers={"Accept-Encoding": "gzip, deflate"}
+        )
+
+    async def get(self, url, headers=None) -> httpx.Response:
+        """
+        Effectue un GET sous le limiteur de débit, avec nouvelles tentatives.
+
+        Args:
+            url (str): URL complète de la requête
+            headers (dict): En-têtes HTTP (par défaut ceux du client)
+
+        Returns:
+            httpx.Response: Dernière réponse de l'API
+
+        Raises:
+            httpx.TransportError: Si toutes les tentatives échouent sur le réseau
+        """
+        headers = headers if headers is not None else self.headers
+
+        for attempt in range(1, self.policy.attempts + 1):
+            await self.limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = await self.http.get(url, headers=headers)
+            except httpx.TransportError as e:
+                self.stats.record(time.perf_counter() - started)
+                if attempt == self.policy.attempts:
+                    raise
+                delay = self.policy.backoff(attempt)
+                reason = str(e)
+            else:
+                self.stats.record(time.perf_counter() - started, response.status_code)
+                if response.status_code not in RETRY_STATUSES or attempt == self.policy.attempts:
+                    return response
+                delay = self.policy.delay_for(response, attempt)
+                reason = f"HTTP {response.status_code}"
+
+            print(f"⏳ {reason} - tentative {attempt + 1}/{self.policy.attempts} dans {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def fetch_page(self, base_url, params, parse_page):
+        """
+        Récupère et convertit une page de résultats.
+
+        Args:
+            base_url (str): Point d'accès (/siret ou /siren)
+            params (dict): Paramètres de la requête
+            parse_page (callable): JSON -> (données, curseur suivant)
+
+        Returns:
+            tuple: (données, curseur suivant) ; (None, None) si la fenêtre
+            ne contient aucun enregistrement
+
+        Raises:
+            InseeFetchError: Si la page n'a pas pu être récupérée
+        """
+        response = await self.get(build_insee_url(base_url, params))
+
+        if response.status_code == NO_RESULT_STATUS:
+            return None, None
+
+        if response.status_code != 200:
+            print(f"❌ Erreur API: {response.status_code}")
+            raise InseeFetchError(f"{base_url} : statut {response.status_code}")
+
+        try:
+            return parse_page(response.json())
+        except ValueError as e:
+            print(f"Erreur lors de la conversion JSON: {str(e)}")
+            raise InseeFetchError(f"{base_url} : JSON invalide") from e
+
+    def log_request_stats(self):
+        """Exporte les temps de requête du client dans les logs."""
+        summary = self.stats.summary()
+        self.logger.log_api_timing(summary)
+        return summary
+
+    async def aclose(self):
+        """Ferme les connexions du client."""
+        await self.http.aclose()
@@ -1,18 +1,60 @@
 """Module de base pour les clients API INSEE."""
 
 import os
-import time
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from app.src.config.settings import HTTP_POOL_SIZE
 from app.src.utils.logger import DatabaseLogger
+from app.src.api.retry import insee_get
+from app.src.api.metrics import RequestStats
 from app.src.database.last_treatment import get_latest_treatment_date
 
+# Statut renvoyé par l'API Sirene lorsqu'aucun enregistrement ne correspond
+NO_RESULT_STATUS = 404
+
+
+class InseeFetchError(Exception):
+    """Page INSEE non récupérée (erreur HTTP ou JSON invalide) après les relances."""
+
+
+def create_insee_session(pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """
+    Crée une session HTTP persistante pour l'API INSEE.
+
+    Les connexions TLS sont conservées (keep-alive) et réutilisées d'une
+    page à l'autre ; les réponses sont demandées compressées.
+
+    Args:
+        pool_size (int): Nombre de connexions conservées dans le pool
+
+    Returns:
+        requests.Session: Session configurée
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "Connection": "keep-alive"
+    })
+    return session
+
+def build_insee_url(base_url, params):
+    """Construit l'URL avec les paramètres (listes jointes par des virgules)."""
+    query_parts = []
+
+    for key, value in params.items():
+        if isinstance(value, list):
+            query_parts.append(f"{key}=" + "%2C".join(value))
+        else:
+            query_parts.append(f"{key}={value}")
+
+    return f"{base_url}?{'&'.join(query_parts)}"
+
 class BaseInseeClient:
     """Client de base pour les API INSEE."""
     
-    # Constantes pour les limites API
-    API_CALL_DELAY = 2  # secondes entre chaque appel
-    
     def __init__(self, table_name, api_route):
         load_dotenv()
         
@@ -20,6 +62,8 @@ class BaseInseeClient:
         self.table_name = table_name
         self.api_route = api_route
         self.logger = DatabaseLogger()
+        self.session = create_insee_session()
+        self.stats = RequestStats(table_name)
         
         # Ajout des headers par défaut
         self.headers = {
@@ -37,27 +81,52 @@ class BaseInseeClient:
     def get_initial_db_date(self):
         return self._initial_db_date
 
+    def get(self, url, headers=None):
+        """
+        Effectue un GET via la session persistante du client.
+
+        Args:
+            url (str): URL complète de la requête
+            headers (dict): En-têtes HTTP (par défaut ceux du client)
+
+        Returns:
+            requests.Response: Réponse de l'API
+        """
+        return insee_get(
+            url,
+            headers if headers is not None else self.headers,
+            session=self.session,
+            stats=self.stats
+        )
+
+    def connections_opened(self) -> int:
+        """Nombre de connexions TCP/TLS ouvertes par la session."""
+        total = 0
+        for adapter in self.session.adapters.values():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                total += pools[key].num_connections
+        return total
+
+    def log_request_stats(self):
+        """Exporte les temps de requête du client dans les logs."""
+        summary = self.stats.summary(self.connections_opened())
+        self.logger.log_api_timing(summary)
+        return summary
+
+    def close(self):
+        """Ferme les connexions de la session."""
+        self.session.close()
+
     def build_url(self, base_url, params):
         """Construit l'URL avec les paramètres."""
-        query_parts = []
-        
-        for key, value in params.items():
-            if isinstance(value, list):
-                query_parts.append(f"{key}=" + "%2C".join(value))
-            else:
-                query_parts.append(f"{key}={value}")
-            
-        return f"{base_url}?{'&'.join(query_parts)}"
+        return build_insee_url(base_url, params)
 
     def fetch_data(self, url):
-        """Effectue la requête à l'API avec délai."""
+        """Effectue la requête à l'API (débit limité, nouvelles tentatives)."""
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = self.get(url)
             response.raise_for_status()
-            
-            # Pause après chaque appel réussi
-            time.sleep(self.API_CALL_DELAY)
-            
             return response.text
         except requests.RequestException as e:
             self.logger.log_error("API_FETCH", str(e))
@@ -3,22 +3,56 @@
 import requests
 import os
 import time
+import threading
 from datetime import datetime
 from dotenv import load_dotenv
+from app.src.config.settings import LAST_TREATMENT_CACHE_TTL
+from app.src.api.retry import insee_get
 
 # Charger les variables d'environnement
 load_dotenv()
 
-def fetch_last_treatment_date_siret_api(collection_type: str):
+# Cache des dates par collection : {collection: (date, expiration)}
+_date_cache = {}
+_date_cache_lock = threading.Lock()
+
+def clear_last_treatment_cache():
+    """Vide le cache des dates (appelé au début de chaque cycle de mise à jour)."""
+    with _date_cache_lock:
+        _date_cache.clear()
+
+def fetch_last_treatment_date_siret_api(collection_type: str, use_cache: bool = True, client=None):
     """
     Récupère la date du dernier traitement depuis l'API INSEE.
+
+    La date ne change pas pendant un cycle : elle est mise en cache par
+    collection pendant `LAST_TREATMENT_CACHE_TTL` secondes.
     
     Args:
         collection_type (str): "Établissements" ou "Unités Légales"
+        use_cache (bool): Utiliser la valeur en cache si elle est valide
+        client (BaseInseeClient): Client dont la session HTTP est réutilisée
     
     Returns:
         str: Date au format 'YYYY-MM-DD' ou None si erreur
     """
+    now = time.monotonic()
+    if use_cache:
+        with _date_cache_lock:
+            cached = _date_cache.get(collection_type)
+        if cached and cached[1] > now:
+            return cached[0]
+
+    date_str = _request_last_treatment_date(collection_type, client)
+
+    # Les erreurs ne sont pas mises en cache pour permettre une nouvelle tentative
+    if date_str is not None:
+        with _date_cache_lock:
+            _date_cache[collection_type] = (date_str, now + LAST_TREATMENT_CACHE_TTL)
+    return date_str
+
+def _request_last_treatment_date(collection_type: str, client=None):
+    """Interroge le service /informations de l'API INSEE."""
     # Clé API depuis les variables d'environnement
     api_key = os.getenv("api_key")
     if not api_key:
@@ -35,8 +69,10 @@ def fetch_last_treatment_date_siret_api(collection_type: str):
 
     try:
         # Requête vers l'API
-        response = requests.get(url, headers=headers, timeout=30)
-        time.sleep(2)
+        if client is not None:
+            response = client.get(url, headers)
+        else:
+            response = insee_get(url, headers)
         response.raise_for_status()
 
         # Conversion de la réponse en JSON
@@ -0,0 +1,60 @@
+"""Module de mesure des temps de requête vers l'API INSEE."""
+
+import threading
+
+
+class RequestStats:
+    """Statistiques de durée des requêtes HTTP, partageables entre threads."""
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name (str): Nom du client mesuré (pour les logs)
+        """
+        self.name = name
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.min_seconds = None
+        self.max_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed: float, status_code=None):
+        """
+        Enregistre la durée d'une requête.
+
+        Args:
+            elapsed (float): Durée en secondes
+            status_code (int): Code HTTP (None si erreur réseau)
+        """
+        with self._lock:
+            self.count += 1
+            self.total_seconds += elapsed
+            self.max_seconds = max(self.max_seconds, elapsed)
+            if self.min_seconds is None or elapsed < self.min_seconds:
+                self.min_seconds = elapsed
+            if status_code is None or status_code >= 400:
+                self.errors += 1
+
+    def summary(self, connections_opened: int = None) -> dict:
+        """
+        Résume les mesures effectuées.
+
+        Args:
+            connections_opened (int): Connexions TCP ouvertes par le client
+
+        Returns:
+            dict: Nombre de requêtes, erreurs, durées (ms) et connexions
+        """
+        with self._lock:
+            average = self.total_seconds / self.count if self.count else 0.0
+            return {
+                "client": self.name,
+                "requests": self.count,
+                "errors": self.errors,
+                "total_ms": round(self.total_seconds * 1000, 1),
+                "avg_ms": round(average * 1000, 1),
+                "min_ms": round((self.min_seconds or 0.0) * 1000, 1),
+                "max_ms": round(self.max_seconds * 1000, 1),
+                "connections_opened": connections_opened,
+            }
@@ -0,0 +1,113 @@
+"""Module de limitation du débit des appels à l'API INSEE."""
+
+import time
+import asyncio
+import threading
+
+from app.src.config.settings import API_CALLS_PER_MINUTE, API_BURST
+
+
+class TokenBucket:
+    """Limiteur de débit à seau de jetons, partageable entre threads."""
+
+    def __init__(self, calls_per_minute: int, burst: int = 1):
+        """
+        Args:
+            calls_per_minute (int): Nombre d'appels autorisés par minute
+            burst (int): Nombre d'appels pouvant partir sans attente
+        """
+        if calls_per_minute <= 0:
+            raise ValueError("Le débit doit être strictement positif")
+
+        self.rate = calls_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """Ajoute les jetons accumulés depuis le dernier remplissage."""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def _take(self) -> float:
+        """
+        Tente de consommer un jeton.
+
+        Returns:
+            float: 0 si un jeton a été consommé, sinon l'attente nécessaire
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, timeout: float = None) -> bool:
+        """
+        Consomme un jeton, en attendant si nécessaire.
+
+        Args:
+            timeout (float): Attente maximale en secondes (None = illimitée)
+
+        Returns:
+            bool: True si un jeton a été obtenu, False si le délai est dépassé
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            wait = self._take()
+            if not wait:
+                return True
+
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class AsyncTokenBucket(TokenBucket):
+    """Variante asyncio : l'attente d'un jeton ne bloque pas la boucle d'événements."""
+
+    async def acquire(self, timeout: float = None) -> bool:
+        """
+        Consomme un jeton, en attendant si nécessaire.
+
+        Args:
+            timeout (float): Attente maximale en secondes (None = illimitée)
+
+        Returns:
+            bool: True si un jeton a été obtenu, False si le délai est dépassé
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            wait = self._take()
+            if not wait:
+                return True
+
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+
+# Limiteur partagé par tous les clients INSEE du processus
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> TokenBucket:
+    """
+    Retourne le limiteur de débit commun à tous les appels INSEE.
+
+    Returns:
+        TokenBucket: Limiteur dimensionné sur le quota de l'API
+    """
+    global _shared_limiter
+
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = TokenBucket(API_CALLS_PER_MINUTE, API_BURST)
+        return _shared_limiter
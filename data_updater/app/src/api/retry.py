@@ -0,0 +1,125 @@
+"""Module de gestion des nouvelles tentatives pour les appels à l'API INSEE."""
+
+import time
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from app.src.config.settings import (
+    API_RETRY_ATTEMPTS,
+    API_RETRY_DELAY,
+    API_RETRY_BASE_DELAY,
+    API_TIMEOUT
+)
+from app.src.api.rate_limiter import get_rate_limiter
+
+# Codes HTTP pour lesquels une nouvelle tentative a un sens
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RetryPolicy:
+    """Politique de nouvelles tentatives avec backoff exponentiel."""
+
+    def __init__(self, attempts: int = API_RETRY_ATTEMPTS,
+                 base_delay: float = API_RETRY_BASE_DELAY,
+                 max_delay: float = API_RETRY_DELAY):
+        """
+        Args:
+            attempts (int): Nombre total de tentatives
+            base_delay (float): Délai avant la deuxième tentative (secondes)
+            max_delay (float): Délai maximal entre deux tentatives (secondes)
+        """
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        """Délai exponentiel avec gigue après l'échec de la tentative `attempt`."""
+        delay = self.base_delay * (2 ** (attempt - 1))
+        return min(self.max_delay, delay + random.uniform(0, self.base_delay))
+
+    def delay_for(self, response, attempt: int) -> float:
+        """Délai à respecter après une réponse en erreur (`Retry-After` prioritaire)."""
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        return self.backoff(attempt)
+
+
+def parse_retry_after(value):
+    """
+    Interprète l'en-tête `Retry-After`.
+
+    Args:
+        value (str): Nombre de secondes ou date HTTP
+
+    Returns:
+        float: Délai en secondes ou None si absent/invalide
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_date - datetime.now(timezone.utc)).total_seconds())
+
+
+def insee_get(url, headers, timeout=API_TIMEOUT, policy=None, session=None, stats=None):
+    """
+    Effectue un GET vers l'API INSEE sous le limiteur de débit partagé.
+
+    Les réponses 429/5xx et les erreurs de connexion sont retentées avec
+    backoff exponentiel ; la dernière réponse est renvoyée telle quelle.
+
+    Args:
+        url (str): URL complète de la requête
+        headers (dict): En-têtes HTTP
+        timeout (int): Délai d'attente de la requête (secondes)
+        policy (RetryPolicy): Politique de nouvelles tentatives
+        session (requests.Session): Session persistante à réutiliser
+        stats (RequestStats): Mesures de durée à alimenter (par tentative)
+
+    Returns:
+        requests.Response: Réponse de l'API
+
+    Raises:
+        requests.RequestException: Si toutes les tentatives échouent sur le réseau
+    """
+    policy = policy or RetryPolicy()
+    limiter = get_rate_limiter()
+    http = session or requests
+
+    for attempt in range(1, policy.attempts + 1):
+        limiter.acquire()
+        started = time.perf_counter()
+        try:
+            response = http.get(url, headers=headers, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if stats is not None:
+                stats.record(time.perf_counter() - started)
+            if attempt == policy.attempts:
+                raise
+            delay = policy.backoff(attempt)
+            reason = str(e)
+        else:
+            if stats is not None:
+                stats.record(time.perf_counter() - started, response.status_code)
+            if response.status_code not in RETRY_STATUSES or attempt == policy.attempts:
+                return response
+            delay = policy.delay_for(response, attempt)
+            reason = f"HTTP {response.status_code}"
+
+        print(f"⏳ {reason} - tentative {attempt + 1}/{policy.attempts} dans {delay:.1f}s")
+        time.sleep(delay)
@@ -1,12 +1,14 @@
 """Module pour récupérer les données d'unités légales depuis l'API Sirene."""
 
 import requests
-import time
 import urllib.parse
 from datetime import datetime
-from app.src.api.base_client import BaseInseeClient
+from app.src.api.base_client import BaseInseeClient, InseeFetchError, NO_RESULT_STATUS
 from app.src.api.last_treatment import fetch_last_treatment_date_siret_api
 
+# Point d'accès de l'API Sirene pour les unités légales
+UNITELEGALE_URL = "https://api.insee.fr/api-sirene/3.11/siren"
+
 
 class UniteLegaleClient(BaseInseeClient):
     """Client pour l'API des unités légales."""
@@ -21,7 +23,7 @@ class UniteLegaleClient(BaseInseeClient):
     def fetch_data(self, url):
         """Effectue la requête à l'API."""
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = self.get(url)
             response.raise_for_status()
             return response.text
         except requests.HTTPError as e:
@@ -31,29 +33,36 @@ class UniteLegaleClient(BaseInseeClient):
             self.logger.log_error("API_FETCH", f"Erreur de requête: {str(e)}")
             return None
 
-def fetch_unitelegale_data(cursor_value, client=None, db_date=None):
-    """Récupère les données des unités légales."""
-    if client is None:
-        client = BaseInseeClient("unitelegale", "Unités Légales")
-    
-    if db_date is None:
-        db_date = client.get_initial_db_date()
-
-    api_date = fetch_last_treatment_date_siret_api("Unités Légales")
+def unitelegale_row(unite):
+    """
+    Extrait les colonnes de la table unitelegale d'un enregistrement INSEE.
 
-    if db_date is None or api_date is None:
-        return None, None
+    L'ordre des valeurs suit les colonnes de `staging_unite_legale` ; la
+    période la plus récente fournit les champs historisés.
+    """
+    periode = (unite.get('periodesUniteLegale') or [{}])[0]
+    return (
+        unite.get('siren'),
+        unite.get('dateCreationUniteLegale'),
+        unite.get('trancheEffectifsUniteLegale'),
+        unite.get('anneeEffectifsUniteLegale'),
+        unite.get('dateDernierTraitementUniteLegale'),
+        unite.get('categorieEntreprise'),
+        unite.get('anneeCategorieEntreprise'),
+        periode.get('etatAdministratifUniteLegale'),
+        periode.get('nomUniteLegale'),
+        periode.get('nomUsageUniteLegale'),
+        periode.get('denominationUniteLegale'),
+        periode.get('categorieJuridiqueUniteLegale'),
+        periode.get('activitePrincipaleUniteLegale'),
+        periode.get('nicSiegeUniteLegale')
+    )
 
-    if datetime.strptime(api_date, "%Y-%m-%d") <= datetime.strptime(db_date, "%Y-%m-%d"):
-        print("✨ Données unités légales à jour")
-        return None, None
-            
-    print(f"🔄 Traitement unités légales : DB({db_date}) -> API({api_date})")
-    
+def unitelegale_query_params(cursor_value, db_date, api_date):
+    """Paramètres de la requête /siren pour la fenêtre [db_date, api_date]."""
     query = f"dateDernierTraitementUniteLegale:[{db_date} TO {api_date}]"
-    encoded_query = urllib.parse.quote(query)
-    params = {
-        'q': encoded_query,
+    return {
+        'q': urllib.parse.quote(query),
         'champs': [
             "siren", "dateCreationUniteLegale", "trancheEffectifsUniteLegale",
             "anneeEffectifsUniteLegale", "dateDernierTraitementUniteLegale",
@@ -66,70 +75,73 @@ def fetch_unitelegale_data(cursor_value, client=None, db_date=None):
         'nombre': 1000,
         'curseur': cursor_value
     }
+
+def parse_unitelegale_page(json_data):
+    """
+    Convertit une page JSON /siren en lignes prêtes pour COPY.
+
+    Returns:
+        tuple: (lignes unitelegale, curseur suivant)
+    """
+    next_cursor = json_data.get('header', {}).get('curseurSuivant')
+
+    # Lignes prêtes pour COPY (aucun texte CSV intermédiaire)
+    ul_rows = [unitelegale_row(unite) for unite in json_data.get('unitesLegales', [])]
+
+    return ul_rows, next_cursor
+
+def fetch_unitelegale_data(cursor_value, client=None, db_date=None, api_date=None):
+    """
+    Récupère une page de données des unités légales.
+
+    Les enregistrements sont renvoyés sous forme de tuples dans l'ordre des
+    colonnes de staging, prêts à être sérialisés directement pour COPY.
+
+    Args:
+        cursor_value (str): Curseur INSEE de la page
+        client (BaseInseeClient): Client INSEE à réutiliser
+        db_date (str): Borne basse de la fenêtre (dernière date en base)
+        api_date (str): Borne haute de la fenêtre, fixée en début de cycle
+
+    Raises:
+        InseeFetchError: Si la page n'a pas pu être récupérée ; une fenêtre
+            sans résultat renvoie une page vide, qui termine le flux
+    """
+    if client is None:
+        client = BaseInseeClient("unitelegale", "Unités Légales")
     
-    # URL de base
-    base_url = "https://api.insee.fr/api-sirene/3.11/siren"
+    if db_date is None:
+        db_date = client.get_initial_db_date()
+
+    if api_date is None:
+        api_date = fetch_last_treatment_date_siret_api("Unités Légales")
+
+    if db_date is None or api_date is None:
+        return None, None
+
+    if datetime.strptime(api_date, "%Y-%m-%d") <= datetime.strptime(db_date, "%Y-%m-%d"):
+        print("✨ Données unités légales à jour")
+        return None, None
+            
+    print(f"🔄 Traitement unités légales : DB({db_date}) -> API({api_date})")
     
     # Un seul appel API en JSON
+    params = unitelegale_query_params(cursor_value, db_date, api_date)
     headers_json = {**client.headers, 'Accept': 'application/json'}
-    url = client.build_url(base_url, params)
-    response = requests.get(url, headers=headers_json, timeout=30)
+    url = client.build_url(UNITELEGALE_URL, params)
+    response = client.get(url, headers_json)
     
+    if response.status_code == NO_RESULT_STATUS:
+        # Aucun enregistrement dans la fenêtre : fin normale du flux
+        return ([], None)
+
     if response.status_code != 200:
         print(f"❌ Erreur API: {response.status_code}")
-        return None, None
+        raise InseeFetchError(f"Page unités légales {cursor_value} : statut {response.status_code}")
 
     try:
-        json_data = response.json()
-        next_cursor = json_data.get('header', {}).get('curseurSuivant')
-        
-
-        csv_header = params['champs']
-        
-        # Ajout de l'en-tête CSV
-        csv_lines = [','.join(csv_header)]
-        
-        # Conversion des unités légales en lignes CSV
-        for unite in json_data.get('unitesLegales', []):
-            # On prend la période la plus récente
-            periode = unite.get('periodesUniteLegale', [{}])[0]
-            
-            # Création de la ligne CSV avec les données combinées
-            row_data = [
-                unite.get('siren', ''),
-                unite.get('dateCreationUniteLegale', ''),
-                unite.get('trancheEffectifsUniteLegale', ''),
-                unite.get('anneeEffectifsUniteLegale', ''),
-                unite.get('dateDernierTraitementUniteLegale', ''),
-                unite.get('categorieEntreprise', ''),
-                unite.get('anneeCategorieEntreprise', ''),
-                periode.get('etatAdministratifUniteLegale', ''),
-                periode.get('nomUniteLegale', ''),
-                periode.get('nomUsageUniteLegale', ''),
-                periode.get('denominationUniteLegale', ''),
-                periode.get('categorieJuridiqueUniteLegale', ''),
-                periode.get('activitePrincipaleUniteLegale', ''),
-                periode.get('nicSiegeUniteLegale', '')
-            ]
-            
-            # Échapper les virgules et les guillemets si nécessaire
-            escaped_row = []
-            for field in row_data:
-                if field is None:
-                    escaped_row.append('')
-                elif ',' in str(field) or '"' in str(field):
-                    escaped_row.append('"{0}"'.format(str(field).replace('"', '""')))
-                else:
-                    escaped_row.append(str(field))
-            
-            csv_lines.append(','.join(escaped_row))
-        
-        # Création du CSV final
-        csv_output = '\n'.join(csv_lines)
-        
-        time.sleep(2)  # Pause entre les appels
-        return csv_output, next_cursor
+        return parse_unitelegale_page(response.json())
         
-    except Exception as e:
-        print(f"Erreur lors de la conversion JSON->CSV: {str(e)}")
-        return None, None   
\ No newline at end of file
+    except ValueError as e:
+        print(f"Erreur lors de la conversion JSON: {str(e)}")
+        raise InseeFetchError(f"Page unités légales {cursor_value} : JSON invalide") from e
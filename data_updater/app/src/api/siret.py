@@ -1,12 +1,15 @@
 """Module pour récupérer les données d'établissements depuis l'API Sirene."""
 
 import requests
-from app.src.api.base_client import BaseInseeClient
+from app.src.api.base_client import BaseInseeClient, InseeFetchError, NO_RESULT_STATUS
+from app.src.config.settings import IDF_DEPARTEMENTS
 from app.src.api.last_treatment import fetch_last_treatment_date_siret_api
 from datetime import datetime
-import time
 import urllib.parse
 
+# Point d'accès de l'API Sirene pour les établissements
+ETABLISSEMENT_URL = "https://api.insee.fr/api-sirene/3.11/siret"
+
 class EtablissementClient(BaseInseeClient):
     """Client pour l'API des établissements."""
     
@@ -20,7 +23,7 @@ class EtablissementClient(BaseInseeClient):
     def fetch_data(self, url):
         """Effectue la requête à l'API."""
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
+            response = self.get(url)
             response.raise_for_status()
             return response.text
         except requests.HTTPError as e:
@@ -30,17 +33,109 @@ class EtablissementClient(BaseInseeClient):
             self.logger.log_error("API_FETCH", f"Erreur de requête: {str(e)}")
             return None
 
-def fetch_etablissement_data(cursor_value, client=None, db_date=None):
-    """Récupère les données des établissements."""
+def etablissement_row(etab):
+    """
+    Extrait les colonnes de la table etablissement d'un enregistrement INSEE.
+
+    L'ordre des valeurs suit les colonnes de `staging_etablissement`.
+    """
+    periode = (etab.get('periodesEtablissement') or [{}])[0]
+    return (
+        etab.get('siret'),
+        etab.get('nic'),
+        etab.get('siren'),
+        etab.get('dateCreationEtablissement'),
+        etab.get('trancheEffectifsEtablissement'),
+        etab.get('anneeEffectifsEtablissement'),
+        periode.get('activitePrincipaleEtablissement'),
+        etab.get('dateDernierTraitementEtablissement'),
+        periode.get('etatAdministratifEtablissement'),
+        etab.get('etablissementSiege'),
+        periode.get('enseigne1Etablissement'),
+        periode.get('enseigne2Etablissement'),
+        periode.get('enseigne3Etablissement'),
+        periode.get('denominationUsuelleEtablissement')
+    )
+
+def adresse_row(etab):
+    """
+    Extrait les colonnes de la table adresse d'un enregistrement INSEE.
+
+    L'ordre des valeurs suit les colonnes de `staging_adresse`.
+    """
+    adresse = etab.get('adresseEtablissement') or {}
+    return (
+        etab.get('siret'),
+        adresse.get('complementAdresseEtablissement'),
+        adresse.get('numeroVoieEtablissement'),
+        adresse.get('indiceRepetitionEtablissement'),
+        adresse.get('typeVoieEtablissement'),
+        adresse.get('libelleVoieEtablissement'),
+        adresse.get('codePostalEtablissement'),
+        adresse.get('libelleCommuneEtablissement'),
+        adresse.get('codeCommuneEtablissement')
+    )
+
+def etablissement_query_params(cursor_value, db_date, api_date):
+    """
+    Paramètres de la requête /siret : établissements diffusibles
+    d'Île-de-France traités dans la fenêtre [db_date, api_date].
+    """
+    idf_postal_codes = " OR ".join([
+        f"codePostalEtablissement:{dep}*" 
+        for dep in IDF_DEPARTEMENTS
+    ])
+    
+    query = f"dateDernierTraitementEtablissement:[{db_date} TO {api_date}] AND ({idf_postal_codes}) AND statutDiffusionEtablissement:'O'"
+    return {
+        'q': urllib.parse.quote(query),
+        'nombre': 1000,
+        'curseur': cursor_value
+    }
+
+def parse_etablissement_page(json_data):
+    """
+    Convertit une page JSON /siret en lignes prêtes pour COPY.
+
+    Returns:
+        tuple: ((lignes etablissement, lignes adresse), curseur suivant)
+    """
+    next_cursor = json_data.get('header', {}).get('curseurSuivant')
+
+    # Lignes prêtes pour COPY (aucun texte CSV intermédiaire)
+    etablissements = json_data.get('etablissements', [])
+    etab_rows = [etablissement_row(etab) for etab in etablissements]
+    adresse_rows = [adresse_row(etab) for etab in etablissements]
+
+    return (etab_rows, adresse_rows), next_cursor
+
+def fetch_etablissement_data(cursor_value, client=None, db_date=None, api_date=None):
+    """
+    Récupère une page de données des établissements.
+
+    Les enregistrements sont renvoyés sous forme de tuples dans l'ordre des
+    colonnes de staging, prêts à être sérialisés directement pour COPY.
+
+    Args:
+        cursor_value (str): Curseur INSEE de la page
+        client (BaseInseeClient): Client INSEE à réutiliser
+        db_date (str): Borne basse de la fenêtre (dernière date en base)
+        api_date (str): Borne haute de la fenêtre, fixée en début de cycle
+
+    Raises:
+        InseeFetchError: Si la page n'a pas pu être récupérée ; une fenêtre
+            sans résultat renvoie une page vide, qui termine le flux
+    """
     if client is None:
         client = BaseInseeClient("etablissement", "Établissements")
     
     if db_date is None:
         db_date = client.get_initial_db_date()
 
-    api_date = fetch_last_treatment_date_siret_api("Établissements")
+    if api_date is None:
+        api_date = fetch_last_treatment_date_siret_api("Établissements")
 
-    if db_date is None:
+    if db_date is None or api_date is None:
         return None, None
 
     if datetime.strptime(api_date, "%Y-%m-%d") <= datetime.strptime(db_date, "%Y-%m-%d"):
@@ -49,120 +144,22 @@ def fetch_etablissement_data(cursor_value, client=None, db_date=None):
     
     print(f"🔄 Traitement établissements : DB({db_date}) -> API({api_date})")
     
-    # Construction de la requête pour l'Île-de-France
-    idf_postal_codes = " OR ".join([
-        f"codePostalEtablissement:{dep}*" 
-        for dep in ['75', '77', '78', '91', '92', '93', '94', '95']
-    ])
-    
-    query = f"dateDernierTraitementEtablissement:[{db_date} TO {api_date}] AND ({idf_postal_codes}) AND statutDiffusionEtablissement:'O'"
-    encoded_query = urllib.parse.quote(query)
-    
-    # Définition des en-têtes pour chaque type de données
-    etab_header = [
-        "siret", "nic", "siren", "dateCreationEtablissement",
-        "trancheEffectifsEtablissement", "anneeEffectifsEtablissement",
-        "activitePrincipaleEtablissement", "dateDernierTraitementEtablissement",
-        "etatAdministratifEtablissement", "etablissementSiege",
-        "enseigne1Etablissement", "enseigne2Etablissement",
-        "enseigne3Etablissement", "denominationUsuelleEtablissement"
-    ]
-    
-    adresse_header = [
-        "siret", "complementAdresseEtablissement", "numeroVoieEtablissement",
-        "indiceRepetitionEtablissement", "typeVoieEtablissement",
-        "libelleVoieEtablissement", "codePostalEtablissement",
-        "libelleCommuneEtablissement", "codeCommuneEtablissement"
-    ]
-    
-    params = {
-        'q': encoded_query,
-        'nombre': 1000,
-        'curseur': cursor_value
-    }
-    
-    base_url = "https://api.insee.fr/api-sirene/3.11/siret"
+    params = etablissement_query_params(cursor_value, db_date, api_date)
     headers_json = {**client.headers, 'Accept': 'application/json'}
-    url = client.build_url(base_url, params)
-    response = requests.get(url, headers=headers_json, timeout=30)
+    url = client.build_url(ETABLISSEMENT_URL, params)
+    response = client.get(url, headers_json)
     
+    if response.status_code == NO_RESULT_STATUS:
+        # Aucun enregistrement dans la fenêtre : fin normale du flux
+        return (([], []), None)
+
     if response.status_code != 200:
         print(f"❌ Erreur API: {response.status_code}")
-        return None, None
+        raise InseeFetchError(f"Page établissements {cursor_value} : statut {response.status_code}")
 
     try:
-        json_data = response.json()
-        next_cursor = json_data.get('header', {}).get('curseurSuivant')
-        # Création des CSV pour établissements et adresses
-        etab_lines = [','.join(etab_header)]
-        adresse_lines = [','.join(adresse_header)]
-        
-        for etab in json_data.get('etablissements', []):
-            periode = etab.get('periodesEtablissement', [{}])[0]
-            adresse = etab.get('adresseEtablissement', {})
-            
-            # Données établissement
-            etab_row = [
-                etab.get('siret', ''),
-                etab.get('nic', ''),
-                etab.get('siren', ''),
-                etab.get('dateCreationEtablissement', ''),
-                etab.get('trancheEffectifsEtablissement', ''),
-                etab.get('anneeEffectifsEtablissement', ''),
-                periode.get('activitePrincipaleEtablissement', ''),
-                etab.get('dateDernierTraitementEtablissement', ''),
-                periode.get('etatAdministratifEtablissement', ''),
-                etab.get('etablissementSiege', ''),
-                periode.get('enseigne1Etablissement', ''),
-                periode.get('enseigne2Etablissement', ''),
-                periode.get('enseigne3Etablissement', ''),
-                periode.get('denominationUsuelleEtablissement', '')
-            ]
-            
-            
-            # Données adresse
-            adresse_row = [
-                etab.get('siret', ''),
-                adresse.get('complementAdresseEtablissement', ''),
-                adresse.get('numeroVoieEtablissement', ''),
-                adresse.get('indiceRepetitionEtablissement', ''),
-                adresse.get('typeVoieEtablissement', ''),
-                adresse.get('libelleVoieEtablissement', ''),
-                adresse.get('codePostalEtablissement', ''),
-                adresse.get('libelleCommuneEtablissement', ''),
-                adresse.get('codeCommuneEtablissement', '')
-            ]
-            
-            # Échappement des valeurs pour CSV
-            escaped_etab = []
-            escaped_addr = []
-            
-            for field in etab_row:
-                if field is None:
-                    escaped_etab.append('')
-                elif ',' in str(field) or '"' in str(field):
-                    escaped_etab.append('"{0}"'.format(str(field).replace('"', '""')))
-                else:
-                    escaped_etab.append(str(field))
-                    
-            for field in adresse_row:
-                if field is None:
-                    escaped_addr.append('')
-                elif ',' in str(field) or '"' in str(field):
-                    escaped_addr.append('"{0}"'.format(str(field).replace('"', '""')))
-                else:
-                    escaped_addr.append(str(field))
-            
-            etab_lines.append(','.join(escaped_etab))
-            adresse_lines.append(','.join(escaped_addr))
-        
-        # Création des CSV finaux
-        etab_csv = '\n'.join(etab_lines)
-        adresse_csv = '\n'.join(adresse_lines)
-        
-        time.sleep(2)  # Pause entre les appels
-        return (etab_csv, adresse_csv), next_cursor
+        return parse_etablissement_page(response.json())
         
-    except Exception as e:
-        print(f"Erreur lors de la conversion JSON->CSV: {str(e)}")
-        return None, None
\ No newline at end of file
+    except ValueError as e:
+        print(f"Erreur lors de la conversion JSON: {str(e)}")
+        raise InseeFetchError(f"Page établissements {cursor_value} : JSON invalide") from e
@@ -8,10 +8,52 @@ UPDATE_INTERVAL = timedelta(hours=24)  # Vérifie toutes les 12 heures
 
 # Configuration API
 API_RETRY_ATTEMPTS = 3
-API_RETRY_DELAY = 60  # secondes
+API_RETRY_DELAY = 60  # secondes (délai maximal entre deux tentatives)
+API_RETRY_BASE_DELAY = 2  # secondes (premier délai, doublé à chaque tentative)
+API_TIMEOUT = 30  # secondes
+HTTP_POOL_SIZE = 4  # connexions keep-alive conservées par client
+LAST_TREATMENT_CACHE_TTL = 3600  # secondes (date /informations mise en cache)
+
+# Quota de l'API Sirene (30 requêtes/minute pour une clé d'intégration)
+API_CALLS_PER_MINUTE = int(os.getenv("API_CALLS_PER_MINUTE", "30"))
+API_BURST = int(os.getenv("API_BURST", "1"))
+
+# Mode pipeline : pages récupérées à l'avance pendant le chargement en base
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "false").lower() == "true"
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "5"))
+
+# Flux établissements et unités légales parcourus en parallèle
+PARALLEL_STREAMS = os.getenv("PARALLEL_STREAMS", "true").lower() == "true"
+
+# Mode asynchrone : nombre de COPY simultanés (et taille du pool asyncpg)
+ASYNC_DB_CONCURRENCY = int(os.getenv("ASYNC_DB_CONCURRENCY", "4"))
 
 # Configuration Base de données
-DB_BATCH_SIZE = 100000  # Taille max du batch pour staging
+DB_BATCH_SIZE = int(os.getenv("DB_BATCH_SIZE", "100000"))  # Taille max du batch pour staging
+DB_FLUSH_INTERVAL = int(os.getenv("DB_FLUSH_INTERVAL", "600"))  # secondes avant fusion forcée
+
+# Pool de connexions PostgreSQL
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_IDLE_TIMEOUT = int(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))  # secondes avant recyclage
+DB_POOL_WAIT_TIMEOUT = int(os.getenv("DB_POOL_WAIT_TIMEOUT", "30"))  # attente max d'une connexion
+
+# Départements d'Île-de-France (préfixes des codes postaux retenus)
+IDF_DEPARTEMENTS = ('75', '77', '78', '91', '92', '93', '94', '95')
+
+# Chargement initial des fichiers stock INSEE
+STOCK_DIR = os.getenv("FILESIREN", "Files_Siren")  # archives ZIP et CSV de référence
+BULK_LOAD_WORKERS = int(os.getenv("BULK_LOAD_WORKERS", str(os.cpu_count() or 4)))
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", str(64 * 1024 * 1024)))  # octets par COPY
+BULK_STREAM = os.getenv("BULK_STREAM", "false").lower() == "true"  # archives lues sans extraction
+
+# Construction des index (CREATE INDEX CONCURRENTLY après chargement)
+INDEX_MAINTENANCE_WORKERS = int(os.getenv("INDEX_MAINTENANCE_WORKERS", "4"))
+INDEX_MAINTENANCE_WORK_MEM = os.getenv("INDEX_MAINTENANCE_WORK_MEM", "1GB")
+
+# Journal des mises à jour (partitions mensuelles)
+LOG_RETENTION_MONTHS = int(os.getenv("LOG_RETENTION_MONTHS", "12"))  # 0 : conservation illimitée
+LOG_ARCHIVE = os.getenv("LOG_ARCHIVE", "true").lower() == "true"  # export CSV avant suppression
 
 # Chemins
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -0,0 +1,128 @@
+"""Module de chargement asynchrone des données en staging (asyncpg)."""
+
+import os
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import asyncpg
+from dotenv import load_dotenv
+
+from app.src.config.settings import ASYNC_DB_CONCURRENCY
+from app.src.database.loader import MERGE_TABLE_CONFIG
+from app.src.utils.logger import DatabaseLogger
+
+
+async def create_async_pool(max_size: int = ASYNC_DB_CONCURRENCY) -> asyncpg.Pool:
+    """
+    Crée le pool de connexions asyncpg du mode asynchrone.
+
+    Args:
+        max_size (int): Nombre maximal de connexions (COPY simultanés)
+
+    Returns:
+        asyncpg.Pool: Pool de connexions
+    """
+    load_dotenv()
+
+    return await asyncpg.create_pool(
+        host=os.getenv("POSTGRES_HOST"),
+        port=int(os.getenv("POSTGRES_PORT", "5432")),
+        database=os.getenv("POSTGRES_DB"),
+        user=os.getenv("POSTGRES_USER"),
+        password=os.getenv("POSTGRES_PASSWORD"),
+        min_size=1,
+        max_size=max(1, max_size)
+    )
+
+
+# Conversion des valeurs INSEE (texte) vers les types attendus par le COPY binaire
+_TYPE_CONVERTERS = {
+    'date': date.fromisoformat,
+    'timestamp without time zone': datetime.fromisoformat,
+    'boolean': lambda value: str(value).lower() in ('true', 't', '1'),
+    'integer': int,
+    'bigint': int,
+    'smallint': int,
+    'numeric': lambda value: Decimal(str(value)),
+}
+
+# Types des colonnes staging, lus une fois par table
+_column_types = {}
+
+
+def typed_record(row, types) -> tuple:
+    """
+    Convertit une ligne INSEE dans les types des colonnes staging.
+
+    Comme pour le COPY texte, les valeurs vides deviennent NULL.
+
+    Args:
+        row (tuple): Valeurs dans l'ordre des colonnes
+        types (list): Types PostgreSQL des colonnes (information_schema)
+    """
+    return tuple(
+        None if value is None or value == ""
+        else _TYPE_CONVERTERS.get(data_type, str)(value)
+        for value, data_type in zip(row, types)
+    )
+
+
+async def _staging_column_types(conn, table_type: str) -> list:
+    """Retourne les types des colonnes COPY de la staging d'une table."""
+    if table_type not in _column_types:
+        config = MERGE_TABLE_CONFIG[table_type]
+        records = await conn.fetch(
+            """
+            SELECT column_name, data_type FROM information_schema.columns
+            WHERE table_name = $1
+            """,
+            config['staging_table']
+        )
+        types = {record['column_name']: record['data_type'] for record in records}
+        _column_types[table_type] = [types.get(column, 'text') for column in config['columns']]
+    return _column_types[table_type]
+
+
+async def copy_records_to_staging(pool: asyncpg.Pool, rows, table_type: str,
+                                  batch_id: int = 0) -> bool:
+    """
+    Charge une page dans la table staging via `copy_records_to_table`.
+
+    Les lignes sont typées côté client puis copiées directement dans la
+    staging persistante, marquées de leur lot ; dédoublonnage et hash sont
+    faits à la fusion, comme pour `load_data_to_staging`.
+
+    Args:
+        pool (asyncpg.Pool): Pool de connexions asyncpg
+        rows (iterable): Tuples dans l'ordre des colonnes de staging
+        table_type (str): 'etablissement', 'unitelegale' ou 'adresse'
+        batch_id (int): Lot de fusion auquel rattacher les lignes
+
+    Returns:
+        bool: True si succès, False si échec
+    """
+    logger = DatabaseLogger()
+
+    config = MERGE_TABLE_CONFIG.get(table_type)
+    if not config:
+        logger.log_error("STAGING_INSERT", f"Type de table inconnu: {table_type}")
+        return False
+
+    try:
+        async with pool.acquire() as conn:
+            types = await _staging_column_types(conn, table_type)
+            status = await conn.copy_records_to_table(
+                config['staging_table'],
+                records=((*typed_record(row, types), batch_id) for row in rows),
+                columns=[*config['columns'], 'batch_id']
+            )
+
+        rows_affected = int(status.split()[-1])
+        logger.log_staging_operation(f"INSERT_{table_type.upper()}", rows_affected)
+        print(f"🗄️ Données {table_type} stockées dans staging ({rows_affected} lignes)")
+        return True
+
+    except (asyncpg.PostgresError, OSError, ValueError) as e:
+        logger.log_error(f"STAGING_INSERT_{table_type.upper()}", str(e))
+        return False
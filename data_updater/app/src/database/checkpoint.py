@@ -0,0 +1,104 @@
+"""Module de gestion des points de reprise du service de mise à jour."""
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from app.src.database.connection import DatabaseConnectionPool
+
+# Statuts d'un point de reprise
+STATUS_RUNNING = 'RUNNING'
+STATUS_DONE = 'DONE'
+
+
+def load_checkpoint(collection: str):
+    """
+    Récupère le point de reprise d'une collection.
+
+    Args:
+        collection (str): 'etablissement' ou 'unitelegale'
+
+    Returns:
+        dict: Point de reprise (dates au format 'YYYY-MM-DD') ou None
+    """
+    db_pool = DatabaseConnectionPool()
+
+    try:
+        with db_pool.get_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT collection, window_start, window_end, cursor_value,
+                           rows_merged, status
+                    FROM update_checkpoint
+                    WHERE collection = %s
+                """, (collection,))
+                row = cursor.fetchone()
+
+        if not row:
+            return None
+
+        checkpoint = dict(row)
+        checkpoint['window_start'] = row['window_start'].strftime("%Y-%m-%d")
+        checkpoint['window_end'] = row['window_end'].strftime("%Y-%m-%d")
+        return checkpoint
+
+    except psycopg2.Error as e:
+        print(f"❌ Erreur lors de la lecture du point de reprise: {e}")
+        return None
+
+
+def save_checkpoint(cursor, collection: str, window, cursor_value, rows_merged: int,
+                    status: str = STATUS_RUNNING):
+    """
+    Enregistre le point de reprise dans la transaction du curseur fourni.
+
+    Appelée juste avant le commit d'une fusion, elle garantit que le curseur
+    enregistré correspond exactement aux données fusionnées.
+
+    Args:
+        cursor: Curseur psycopg2 de la transaction de fusion
+        collection (str): 'etablissement' ou 'unitelegale'
+        window (tuple): (window_start, window_end) au format 'YYYY-MM-DD'
+        cursor_value (str): Curseur INSEE à partir duquel reprendre
+        rows_merged (int): Nombre cumulé de lignes fusionnées dans la fenêtre
+        status (str): STATUS_RUNNING ou STATUS_DONE ; seule la clôture
+            (`complete_checkpoint`, après la fin réelle du flux) marque la
+            fenêtre comme entièrement parcourue
+    """
+    window_start, window_end = window
+    cursor.execute("""
+        INSERT INTO update_checkpoint (
+            collection, window_start, window_end, cursor_value, rows_merged, status,
+            fully_walked, updated_at
+        )
+        VALUES (%s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT (collection) DO UPDATE SET
+            window_start = EXCLUDED.window_start,
+            window_end = EXCLUDED.window_end,
+            cursor_value = EXCLUDED.cursor_value,
+            rows_merged = EXCLUDED.rows_merged,
+            status = EXCLUDED.status,
+            fully_walked = EXCLUDED.fully_walked,
+            updated_at = EXCLUDED.updated_at
+    """, (collection, window_start, window_end, cursor_value, rows_merged, status,
+          status == STATUS_DONE))
+
+
+def complete_checkpoint(collection: str, window, rows_merged: int) -> bool:
+    """
+    Marque la fenêtre d'une collection comme entièrement traitée.
+
+    Returns:
+        bool: True si succès, False si échec
+    """
+    db_pool = DatabaseConnectionPool()
+
+    try:
+        with db_pool.get_connection() as conn:
+            with conn.cursor() as cursor:
+                save_checkpoint(cursor, collection, window, None, rows_merged, STATUS_DONE)
+            conn.commit()
+            return True
+    except psycopg2.Error as e:
+        print(f"❌ Erreur lors de la clôture du point de reprise: {e}")
+        if 'conn' in locals():
+            conn.rollback()
+        return False
@@ -1,38 +1,140 @@
 """Module de gestion du pool de connexions à la base de données."""
 
 import os
+import time
+import threading
 
 from contextlib import contextmanager
 
-from psycopg2.pool import SimpleConnectionPool
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool, PoolError
 from dotenv import load_dotenv
 
+from app.src.config.settings import (
+    DB_POOL_MIN,
+    DB_POOL_MAX,
+    DB_POOL_IDLE_TIMEOUT,
+    DB_POOL_WAIT_TIMEOUT
+)
+
 
 class DatabaseConnectionPool:
-    """Gestionnaire de pool de connexions à la base de données."""
+    """
+    Gestionnaire de pool de connexions à la base de données.
+
+    Le pool est partagé entre threads : au plus `DB_POOL_MAX` connexions sont
+    prêtées simultanément, les demandes suivantes attendent (jusqu'à
+    `DB_POOL_WAIT_TIMEOUT`). Les connexions rendues restent ouvertes pour les
+    emprunts suivants ; au-delà de `DB_POOL_MIN`, celles inactives depuis plus
+    de `DB_POOL_IDLE_TIMEOUT` sont fermées. Chaque connexion est validée à
+    l'emprunt ; celles qui sont fermées, en erreur ou trop anciennes sont
+    remplacées.
+    """
 
     _instance = None
+    _instance_lock = threading.Lock()
     _pool = None
 
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(DatabaseConnectionPool, cls).__new__(cls)
-            cls._instance._initialize_pool()
+        with cls._instance_lock:
+            if cls._instance is None:
+                instance = super(DatabaseConnectionPool, cls).__new__(cls)
+                instance._initialize_pool()
+                cls._instance = instance
         return cls._instance
 
     def _initialize_pool(self):
         """Initialise le pool de connexions."""
         load_dotenv()
 
-        self._pool = SimpleConnectionPool(
-            minconn=1,
-            maxconn=10,
+        self.minconn = max(0, DB_POOL_MIN)
+        self.maxconn = max(1, DB_POOL_MAX, self.minconn)
+        self.idle_timeout = DB_POOL_IDLE_TIMEOUT
+        self.wait_timeout = DB_POOL_WAIT_TIMEOUT
+
+        # Pool partagé par les flux exécutés en parallèle
+        self._pool = ThreadedConnectionPool(
+            minconn=self.minconn,
+            maxconn=self.maxconn,
             host=os.getenv("POSTGRES_HOST"),
             port=os.getenv("POSTGRES_PORT"),
             dbname=os.getenv("POSTGRES_DB"),
             user=os.getenv("POSTGRES_USER"),
             password=os.getenv("POSTGRES_PASSWORD"),
         )
+        # psycopg2 ferme toute connexion rendue dès que `minconn` connexions sont
+        # libres : le seuil est porté à maxconn, les connexions en trop ne sont
+        # fermées qu'après DB_POOL_IDLE_TIMEOUT (voir _close_idle)
+        self._pool.minconn = self.maxconn
+
+        # Un jeton par connexion prêtable : les demandes en trop attendent
+        self._slots = threading.BoundedSemaphore(self.maxconn)
+        self._lock = threading.Lock()
+        self._returned_at = {}
+        self._metrics = {
+            'checkouts': 0,
+            'in_use': 0,
+            'waits': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'recycled': 0,
+        }
+
+    def _is_usable(self, conn) -> bool:
+        """Vérifie qu'une connexion empruntée est ouverte et répond."""
+        if conn.closed:
+            return False
+
+        returned_at = self._returned_at.get(id(conn))
+        if returned_at is not None and time.monotonic() - returned_at > self.idle_timeout:
+            return False
+
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _checkout(self):
+        """Emprunte une connexion valide, en recyclant les connexions défectueuses."""
+        while True:
+            conn = self._pool.getconn()
+            if self._is_usable(conn):
+                return conn
+
+            with self._lock:
+                self._metrics['recycled'] += 1
+                self._returned_at.pop(id(conn), None)
+            self._pool.putconn(conn, close=True)
+
+    def _release(self, conn):
+        """Rend une connexion au pool (fermée si elle est inutilisable)."""
+        broken = conn.closed or conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN
+        with self._lock:
+            if broken:
+                self._returned_at.pop(id(conn), None)
+            else:
+                self._returned_at[id(conn)] = time.monotonic()
+        self._pool.putconn(conn, close=broken)
+        self._close_idle()
+
+    def _close_idle(self):
+        """Ferme les connexions libres inactives depuis DB_POOL_IDLE_TIMEOUT, au-delà de DB_POOL_MIN."""
+        now = time.monotonic()
+        with self._pool._lock, self._lock:
+            # Les connexions libres sont reprises par la fin : les plus anciennes sont en tête
+            idle = self._pool._pool
+            expired = [
+                conn for conn in idle
+                if now - self._returned_at.get(id(conn), now) > self.idle_timeout
+            ]
+            for conn in expired[:max(0, len(idle) - self.minconn)]:
+                idle.remove(conn)
+                self._returned_at.pop(id(conn), None)
+                conn.close()
+                self._metrics['recycled'] += 1
 
     @contextmanager
     def get_connection(self):
@@ -41,19 +143,59 @@ class DatabaseConnectionPool:
 
         Yields:
             psycopg2.extensions.connection: Une connexion à la base de données
+
+        Raises:
+            PoolError: Si aucune connexion ne se libère à temps
         """
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.wait_timeout):
+            raise PoolError(
+                f"Aucune connexion disponible après {self.wait_timeout}s "
+                f"({self.maxconn} connexions en cours d'utilisation)"
+            )
+        waited = time.monotonic() - started
+
         conn = None
         try:
-            conn = self._pool.getconn()
+            conn = self._checkout()
+            with self._lock:
+                metrics = self._metrics
+                metrics['checkouts'] += 1
+                metrics['in_use'] += 1
+                metrics['wait_time_total'] += waited
+                metrics['wait_time_max'] = max(metrics['wait_time_max'], waited)
+                if waited > 0.001:
+                    metrics['waits'] += 1
             yield conn
         finally:
             if conn:
-                self._pool.putconn(conn)
+                with self._lock:
+                    self._metrics['in_use'] -= 1
+                self._release(conn)
+            self._slots.release()
 
     def close_all(self):
         """Ferme toutes les connexions du pool."""
         if self._pool:
             self._pool.closeall()
+        with self._lock:
+            self._returned_at.clear()
+
+    def metrics(self) -> dict:
+        """
+        Retourne les mesures d'utilisation du pool.
+
+        Returns:
+            dict: Connexions prêtées et inactives, attentes et recyclages
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics['idle'] = len(self._pool._pool) if self._pool and not self._pool.closed else 0
+        metrics['max'] = self.maxconn
+        metrics['wait_time_avg'] = (
+            metrics['wait_time_total'] / metrics['checkouts'] if metrics['checkouts'] else 0.0
+        )
+        return metrics
 
     @property
     def pool_status(self) -> tuple:
@@ -65,4 +207,4 @@ class DatabaseConnectionPool:
         """
         if not self._pool:
             return (0, 0)
-        return (self._pool.closed, self._pool.maxconn)
+        return (self.metrics()['in_use'], self.maxconn)
@@ -0,0 +1,87 @@
+"""Module de sérialisation des enregistrements INSEE pour COPY."""
+
+# Caractères à échapper dans le format TEXT de COPY
+_COPY_ESCAPES = str.maketrans({
+    "\\": "\\\\",
+    "\t": "\\t",
+    "\n": "\\n",
+    "\r": "\\r",
+})
+
+# Représentation de NULL dans le format TEXT de COPY
+COPY_NULL = "\\N"
+
+
+def format_copy_value(value) -> str:
+    """
+    Sérialise une valeur au format TEXT de COPY.
+
+    Les valeurs absentes ou vides deviennent NULL, comme avec le CSV
+    précédemment généré.
+    """
+    if value is None or value == "":
+        return COPY_NULL
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def format_copy_row(row) -> str:
+    """Sérialise un tuple de valeurs en une ligne COPY TEXT."""
+    return "\t".join(format_copy_value(value) for value in row) + "\n"
+
+
+class CopyRowStream:
+    """
+    Objet fichier en lecture seule produisant des lignes COPY à la demande.
+
+    `cursor.copy_expert` lit le flux par blocs : seules les lignes
+    nécessaires au bloc courant sont sérialisées, sans jamais construire
+    le texte complet de la page.
+    """
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows (iterable): Tuples de valeurs dans l'ordre des colonnes COPY
+        """
+        self._rows = iter(rows)
+        self._buffer = ""
+        self._exhausted = False
+        self.rows_written = 0
+
+    def _fill(self, size: int):
+        """Sérialise des lignes jusqu'à disposer de `size` caractères."""
+        parts = [self._buffer]
+        length = len(self._buffer)
+
+        while not self._exhausted and (size < 0 or length < size):
+            row = next(self._rows, None)
+            if row is None:
+                self._exhausted = True
+                break
+            line = format_copy_row(row)
+            parts.append(line)
+            length += len(line)
+            self.rows_written += 1
+
+        self._buffer = "".join(parts)
+
+    def read(self, size: int = -1) -> str:
+        """Retourne jusqu'à `size` caractères du flux (tout le reste si négatif)."""
+        self._fill(size)
+        if size < 0:
+            data, self._buffer = self._buffer, ""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def readline(self, size: int = -1) -> str:
+        """Retourne la prochaine ligne COPY."""
+        if "\n" not in self._buffer:
+            self._fill(len(self._buffer) + 1)
+        end = self._buffer.find("\n") + 1 or len(self._buffer)
+        if 0 <= size < end:
+            end = size
+        data, self._buffer = self._buffer[:end], self._buffer[end:]
+        return data
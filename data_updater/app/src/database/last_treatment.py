@@ -1,6 +1,7 @@
 """Module pour récupérer la dernière date de traitement depuis la base de données."""
 
 import psycopg2
+from datetime import datetime
 from app.src.database.connection import DatabaseConnectionPool
 
 def get_latest_treatment_date(table_name: str):
@@ -41,9 +42,27 @@ def get_latest_treatment_date(table_name: str):
                 """
                 cursor.execute(query)
                 result = cursor.fetchone()
-                
-                if result and result[0]:
-                    return result[0].strftime("%Y-%m-%d")
+                latest = result[0] if result and result[0] else None
+                if isinstance(latest, datetime):
+                    latest = latest.date()
+
+                # Les lignes dont seule la date de traitement change ne sont
+                # pas réécrites : la fin de la dernière fenêtre fait aussi foi,
+                # mais seulement si elle a été parcourue jusqu'à la fin du flux.
+                # Sinon la date en base reste l'autorité et la fenêtre est
+                # reparcourue depuis celle-ci
+                cursor.execute("SELECT to_regclass('update_checkpoint')")
+                if cursor.fetchone()[0]:
+                    cursor.execute("""
+                        SELECT window_end FROM update_checkpoint
+                        WHERE collection = %s AND status = 'DONE' AND fully_walked
+                    """, (table_name,))
+                    checkpoint = cursor.fetchone()
+                    if checkpoint and (latest is None or checkpoint[0] > latest):
+                        latest = checkpoint[0]
+
+                if latest:
+                    return latest.strftime("%Y-%m-%d")
                 return None
                 
     except psycopg2.Error as e:
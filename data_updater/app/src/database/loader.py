@@ -1,120 +1,65 @@
 """Module pour charger et mettre à jour les données dans PostgreSQL."""
 import io
 import os
+import csv
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import psycopg2
 from app.src.database.connection import DatabaseConnectionPool
+from app.src.database.copy_stream import CopyRowStream
 from app.src.utils.logger import DatabaseLogger
 
 
+def _copy_to_staging(cursor, data, table_type, batch_id=0):
+    """
+    Copie une page dans la table staging, dans la transaction du curseur.
 
+    Les lignes sont écrites directement dans la staging (UNLOGGED), marquées
+    de leur lot ; le dédoublonnage et le hash de contenu sont faits à la
+    fusion.
 
-def create_log_table():
-    """Crée la table de log si elle n'existe pas."""
-    db_pool = DatabaseConnectionPool()
-    
-    try:
-        with db_pool.get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS updates_log (
-                        id SERIAL PRIMARY KEY,
-                        entity_type VARCHAR(20),  -- 'etablissement' ou 'unitelegale'
-                        entity_id VARCHAR(14),    -- siret ou siren
-                        update_type VARCHAR(10),  -- 'INSERT' ou 'UPDATE'
-                        update_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    );
-                    CREATE INDEX IF NOT EXISTS idx_log_entity ON updates_log(entity_type, entity_id);
-                    CREATE INDEX IF NOT EXISTS idx_log_date ON updates_log(update_date);
-                """)
-                conn.commit()
-    except psycopg2.Error as e:
-        print(f"❌ Erreur lors de la création de la table de log: {e}")
+    Returns:
+        int: Nombre de lignes copiées en staging
+    """
+    config = MERGE_TABLE_CONFIG[table_type]
+    columns = ", ".join(config['columns'])
+
+    if isinstance(data, str):
+        # CSV avec en-tête : valeurs vides = NULL, comme COPY ... CSV
+        data = csv.reader(io.StringIO(data))
+        next(data, None)
+
+    stream = CopyRowStream((*row, batch_id) for row in data)
+    cursor.copy_expert(
+        f"COPY {config['staging_table']} ({columns}, batch_id) FROM STDIN",
+        stream
+    )
+    return stream.rows_written
 
-def load_data_to_staging(csv_data, table_type):
+def load_data_to_staging(data, table_type, batch_id=0):
     """
-    Charge les données CSV dans la table staging appropriée.
+    Charge les données dans la table staging appropriée.
+
+    Les lignes sont sérialisées à la volée au format COPY TEXT pendant la
+    lecture par PostgreSQL ; une chaîne CSV (avec en-tête) reste acceptée.
     
     Args:
-        csv_data (str): Données CSV à charger
-        table_type (str): 'etablissement' ou 'unitelegale'
+        data (iterable | str): Tuples dans l'ordre des colonnes, ou CSV
+        table_type (str): 'etablissement', 'unitelegale' ou 'adresse'
+        batch_id (int): Lot de fusion auquel rattacher les lignes
     """
     db_pool = DatabaseConnectionPool()
     logger = DatabaseLogger()
     
-    # Configuration des tables et colonnes
-    table_config = {
-        'etablissement': {
-            'staging_table': 'staging_etablissement',
-            'key_field': 'siret',
-            'etat_administratif': 'etatAdministratifEtablissement',
-            'columns': """(
-                siret, nic, siren, datecreationetablissement,
-                trancheeffectifsetablissement, anneeeffectifsetablissement,
-                activiteprincipaleetablissement, datederniertraitementetablissement,
-                etatadministratifetablissement, etablissementsiege,
-                enseigne1etablissement, enseigne2etablissement, enseigne3etablissement,
-                denominationusuelleetablissement
-            )"""
-        },
-        'unitelegale': {
-            'staging_table': 'staging_unite_legale',
-            'key_field': 'siren',
-            'etat_administratif': 'etatAdministratifUniteLegale',
-            'columns': """(
-                siren, datecreationunitelegale, trancheeffectifsunitelegale,
-                anneeeffectifsunitelegale, datederniertraitementunitelegale,
-                categorieentreprise, anneecategorieentreprise,
-                etatadministratifunitelegale, nomunitelegale,
-                nomusageunitelegale, denominationunitelegale,
-                categoriejuridiqueunitelegale, activiteprincipaleunitelegale,
-                nicsiegeunitelegale
-            )"""
-        },
-        'adresse': {
-            'staging_table': 'staging_adresse',
-            'key_field': 'siret',
-            'columns': """(
-                siret, complementadresseetablissement, numerovoieetablissement,
-                indicerepetitionetablissement, typevoieetablissement,
-                libellevoieetablissement, codepostaletablissement,
-                libellecommuneetablissement, codecommuneetablissement
-            )"""
-        }
-    }
-    
-    config = table_config.get(table_type)
-    if not config:
+    if table_type not in MERGE_TABLE_CONFIG:
         logger.log_error("STAGING_INSERT", f"Type de table inconnu: {table_type}")
         return False
     
     try:
         with db_pool.get_connection() as conn:
             with conn.cursor() as cursor:
-                # Création table temporaire
-                cursor.execute(f"""
-                CREATE TEMP TABLE temp_staging (LIKE {config['staging_table']})
-                ON COMMIT DROP;
-                """)
-
-                # Copie des données
-                buffer = io.StringIO(csv_data)
-                cursor.copy_expert(
-                    f"""
-                    COPY temp_staging {config['columns']}
-                    FROM STDIN WITH (FORMAT CSV, HEADER)
-                    """,
-                    buffer
-                )
-
-                # Insertion données uniques dans la table staging
-                cursor.execute(f"""
-                INSERT INTO {config['staging_table']}
-                SELECT DISTINCT ON ({config['key_field']}) *
-                FROM temp_staging;
-                """)
-                
-                rows_affected = cursor.rowcount
+                rows_affected = _copy_to_staging(cursor, data, table_type, batch_id)
                 logger.log_staging_operation(f"INSERT_{table_type.upper()}", rows_affected)
             conn.commit()
             print(f"🗄️ Données {table_type} stockées dans staging ({rows_affected} lignes)")
@@ -126,6 +71,69 @@ def load_data_to_staging(csv_data, table_type):
             conn.rollback()
         return False
 
+def load_pages_to_staging(pages, batch_id=0):
+    """
+    Charge les tables d'une même page en parallèle, sur une connexion chacune.
+
+    Les COPY s'exécutent simultanément ; les transactions ne sont validées,
+    l'une après l'autre, qu'une fois toutes les copies réussies, sinon toutes
+    sont annulées. Si une validation échoue après une autre, les lignes déjà
+    validées restent en staging sous le `batch_id` du lot : l'appelant doit
+    alors abandonner le lot sans le fusionner (voir `StagingBatch.suspend`).
+
+    Args:
+        pages (dict): {table_type: lignes} (tables vides ignorées)
+        batch_id (int): Lot de fusion auquel rattacher les lignes
+
+    Returns:
+        bool: True si succès, False si échec
+    """
+    pages = {table_type: rows for table_type, rows in pages.items() if rows}
+    if len(pages) <= 1:
+        return all(
+            load_data_to_staging(rows, table_type, batch_id) for table_type, rows in pages.items()
+        )
+
+    db_pool = DatabaseConnectionPool()
+    logger = DatabaseLogger()
+
+    unknown = [table_type for table_type in pages if table_type not in MERGE_TABLE_CONFIG]
+    if unknown:
+        logger.log_error("STAGING_INSERT", f"Type de table inconnu: {', '.join(unknown)}")
+        return False
+
+    def copy_page(conn, rows, table_type):
+        with conn.cursor() as cursor:
+            return _copy_to_staging(cursor, rows, table_type, batch_id)
+
+    with ExitStack() as stack:
+        connections = {}
+        try:
+            # PoolError (pool épuisé ou fermé) hérite de psycopg2.Error
+            for table_type in pages:
+                connections[table_type] = stack.enter_context(db_pool.get_connection())
+
+            with ThreadPoolExecutor(max_workers=len(pages), thread_name_prefix="copy") as executor:
+                futures = {
+                    table_type: executor.submit(copy_page, connections[table_type], rows, table_type)
+                    for table_type, rows in pages.items()
+                }
+
+            counts = {table_type: future.result() for table_type, future in futures.items()}
+            for conn in connections.values():
+                conn.commit()
+        except (psycopg2.Error, IOError) as e:
+            logger.log_error(f"STAGING_INSERT_{'_'.join(pages).upper()}", str(e))
+            for conn in connections.values():
+                if not conn.closed:
+                    conn.rollback()
+            return False
+
+    for table_type, rows_affected in counts.items():
+        logger.log_staging_operation(f"INSERT_{table_type.upper()}", rows_affected)
+        print(f"🗄️ Données {table_type} stockées dans staging ({rows_affected} lignes)")
+    return True
+
 def dump_and_clear_staging(table_type):
     """
     Vide la table staging spécifiée.
@@ -163,238 +171,271 @@ def dump_and_clear_staging(table_type):
             conn.rollback()
         return False
 
-def update_from_staging(table_type):
+# Configuration de la fusion staging -> tables principales
+#   columns        : colonnes de la table, dans l'ordre de la staging
+#   update_columns : colonnes réécrites lorsqu'une ligne existante change
+#   hash_columns   : contenu métier haché dans `content_hash` ; une ligne dont
+#                    seule la date de dernier traitement change n'est pas réécrite
+#   source_filter  : condition sur la staging `s` (lignes rattachables)
+#   delete_when    : condition de suppression d'une ligne existante `t`
+#   skip_when      : lignes de la staging ignorées (ni mise à jour, ni insertion)
+MERGE_TABLE_CONFIG = {
+    'etablissement': {
+        'main_table': 'etablissement',
+        'staging_table': 'staging_etablissement',
+        'key_field': 'siret',
+        'columns': [
+            'siret', 'nic', 'siren', 'datecreationetablissement',
+            'trancheeffectifsetablissement', 'anneeeffectifsetablissement',
+            'activiteprincipaleetablissement', 'datederniertraitementetablissement',
+            'etatadministratifetablissement', 'etablissementsiege',
+            'enseigne1etablissement', 'enseigne2etablissement', 'enseigne3etablissement',
+            'denominationusuelleetablissement'
+        ],
+        'update_columns': [
+            'datecreationetablissement', 'trancheeffectifsetablissement',
+            'anneeeffectifsetablissement', 'datederniertraitementetablissement',
+            'etablissementsiege', 'etatadministratifetablissement',
+            'enseigne1etablissement', 'enseigne2etablissement', 'enseigne3etablissement',
+            'denominationusuelleetablissement', 'activiteprincipaleetablissement'
+        ],
+        'hash_columns': [
+            'datecreationetablissement', 'trancheeffectifsetablissement',
+            'anneeeffectifsetablissement', 'etablissementsiege',
+            'etatadministratifetablissement', 'enseigne1etablissement',
+            'enseigne2etablissement', 'enseigne3etablissement',
+            'denominationusuelleetablissement', 'activiteprincipaleetablissement'
+        ],
+        # Les établissements passant à l'état 'F' sont retirés de la base
+        'delete_when': "s.etatadministratifetablissement = 'F' "
+                       "AND t.etatadministratifetablissement = 'A'",
+        'skip_when': "s.etatadministratifetablissement IS NOT DISTINCT FROM 'F'"
+    },
+    'unitelegale': {
+        'main_table': 'unitelegale',
+        'staging_table': 'staging_unite_legale',
+        'key_field': 'siren',
+        'columns': [
+            'siren', 'datecreationunitelegale', 'trancheeffectifsunitelegale',
+            'anneeeffectifsunitelegale', 'datederniertraitementunitelegale',
+            'categorieentreprise', 'anneecategorieentreprise',
+            'etatadministratifunitelegale', 'nomunitelegale',
+            'nomusageunitelegale', 'denominationunitelegale',
+            'categoriejuridiqueunitelegale', 'activiteprincipaleunitelegale',
+            'nicsiegeunitelegale'
+        ],
+        'update_columns': [
+            'datecreationunitelegale', 'trancheeffectifsunitelegale',
+            'anneeeffectifsunitelegale', 'datederniertraitementunitelegale',
+            'categorieentreprise', 'anneecategorieentreprise',
+            'etatadministratifunitelegale', 'nomunitelegale',
+            'nomusageunitelegale', 'denominationunitelegale',
+            'categoriejuridiqueunitelegale', 'activiteprincipaleunitelegale',
+            'nicsiegeunitelegale'
+        ],
+        'hash_columns': [
+            'datecreationunitelegale', 'trancheeffectifsunitelegale',
+            'anneeeffectifsunitelegale', 'categorieentreprise', 'anneecategorieentreprise',
+            'etatadministratifunitelegale', 'nomunitelegale',
+            'nomusageunitelegale', 'denominationunitelegale',
+            'categoriejuridiqueunitelegale', 'activiteprincipaleunitelegale',
+            'nicsiegeunitelegale'
+        ],
+        # Uniquement les unités légales liées à des établissements existants
+        'source_filter': "EXISTS (SELECT 1 FROM etablissement e WHERE e.siren = s.siren)"
+    },
+    'adresse': {
+        'main_table': 'adresse',
+        'staging_table': 'staging_adresse',
+        'key_field': 'siret',
+        'columns': [
+            'siret', 'complementadresseetablissement', 'numerovoieetablissement',
+            'indicerepetitionetablissement', 'typevoieetablissement',
+            'libellevoieetablissement', 'codepostaletablissement',
+            'libellecommuneetablissement', 'codecommuneetablissement'
+        ],
+        'update_columns': [
+            'complementadresseetablissement', 'numerovoieetablissement',
+            'indicerepetitionetablissement', 'typevoieetablissement',
+            'libellevoieetablissement', 'codepostaletablissement',
+            'libellecommuneetablissement', 'codecommuneetablissement'
+        ],
+        'hash_columns': [
+            'complementadresseetablissement', 'numerovoieetablissement',
+            'indicerepetitionetablissement', 'typevoieetablissement',
+            'libellevoieetablissement', 'codepostaletablissement',
+            'libellecommuneetablissement', 'codecommuneetablissement'
+        ],
+        # Pour les adresses, on ne traite que les établissements non fermés
+        'source_filter': """EXISTS (
+            SELECT 1 FROM etablissement et
+            WHERE et.siret = s.siret
+            AND et.etatadministratifetablissement != 'F'
+        )"""
+    }
+}
+
+
+def content_hash_sql(table_type, alias):
     """
-    Met à jour la table principale depuis la staging.
-    
+    Expression SQL du hash de contenu d'une ligne.
+
     Args:
-        table_type (str): 'etablissement' ou 'unitelegale'
+        table_type (str): 'etablissement', 'unitelegale' ou 'adresse'
+        alias (str): Alias de la table dont les colonnes sont hachées
+
     Returns:
-        tuple: (success: bool, rows_affected: int)
+        str: Expression md5 sur les colonnes métier
     """
-    create_log_table()  # S'assure que la table de log existe
-    
+    columns = ", ".join(f"{alias}.{column}" for column in MERGE_TABLE_CONFIG[table_type]['hash_columns'])
+    return f"md5(ROW({columns})::text)"
+
+
+def build_merge_sql(table_type):
+    """
+    Construit l'instruction MERGE unique d'une table.
+
+    La source est le lot `%(batch_id)s` de la staging, dédoublonné (dernière
+    version chargée de chaque clé) et haché à la volée.
+    Suppressions, mises à jour et insertions sont appliquées en un seul
+    passage sur la table principale ; seules les lignes dont le
+    `content_hash` diffère sont réécrites (ni tuple mort, ni WAL pour les
+    autres). Chaque action est journalisée dans `updates_log` via RETURNING
+    et l'instruction renvoie le nombre de lignes par action, ainsi que le
+    nombre de lignes source ('SOURCE') pour en déduire les lignes ignorées.
+
+    Args:
+        table_type (str): 'etablissement', 'unitelegale' ou 'adresse'
+
+    Returns:
+        str: Requête SQL retournant des lignes (action, nombre)
+    """
+    config = MERGE_TABLE_CONFIG[table_type]
+    key = config['key_field']
+    columns = config['columns'] + ['content_hash']
+    update_columns = config['update_columns'] + ['content_hash']
+    source_filter = config.get('source_filter', 'TRUE')
+
+    source_columns = ", ".join(f"s.{column}" for column in config['columns'])
+    set_clause = ", ".join(f"{column} = s.{column}" for column in update_columns)
+    skip = f"AND NOT ({config['skip_when']})" if config.get('skip_when') else ""
+
+    clauses = []
+    if config.get('delete_when'):
+        clauses.append(f"WHEN MATCHED AND {config['delete_when']} THEN DELETE")
+    clauses.append(
+        f"WHEN MATCHED {skip} AND t.content_hash IS DISTINCT FROM s.content_hash\n"
+        f"                THEN UPDATE SET {set_clause}"
+    )
+    clauses.append(
+        f"WHEN NOT MATCHED {skip}\n"
+        f"                THEN INSERT ({', '.join(columns)})\n"
+        f"                VALUES ({', '.join(f's.{column}' for column in columns)})"
+    )
+    when_clauses = "\n            ".join(clauses)
+
+    return f"""
+        WITH source AS (
+            SELECT DISTINCT ON (s.{key})
+                {source_columns}, {content_hash_sql(table_type, 's')} AS content_hash
+            FROM {config['staging_table']} s
+            WHERE s.batch_id = %(batch_id)s
+            AND {source_filter}
+            ORDER BY s.{key}, s.load_seq DESC
+        ),
+        changes AS (
+            MERGE INTO {config['main_table']} t
+            USING source s
+            ON t.{key} = s.{key}
+            {when_clauses}
+            RETURNING merge_action() AS action, s.{key} AS entity_id
+        ),
+        logged AS (
+            INSERT INTO updates_log (entity_type, entity_id, update_type)
+            SELECT '{table_type}', entity_id, action
+            FROM changes
+            RETURNING update_type
+        )
+        SELECT update_type, count(*) FROM logged GROUP BY update_type
+        UNION ALL
+        SELECT 'SOURCE', count(*) FROM source;
+    """
+
+
+def _apply_staging(cursor, table_type, batch_id=0):
+    """
+    Applique un lot de la staging d'une table sur la table principale.
+
+    S'exécute dans la transaction du curseur fourni, sans commit.
+
+    Returns:
+        tuple: (deleted_rows, updated_rows, inserted_rows)
+    """
+    cursor.execute(build_merge_sql(table_type), {'batch_id': batch_id})
+    counts = dict(cursor.fetchall())
+    deleted_rows = counts.get('DELETE', 0)
+    updated_rows = counts.get('UPDATE', 0)
+    inserted_rows = counts.get('INSERT', 0)
+    # Lignes source sans effet : contenu inchangé (ou fermeture déjà connue)
+    skipped_rows = counts.get('SOURCE', 0) - deleted_rows - updated_rows - inserted_rows
+    DatabaseLogger().log_main_operation(f"SKIP_{table_type.upper()}", skipped_rows)
+
+    if table_type == 'etablissement':
+        print(f"✅ {table_type}: {deleted_rows} supprimés (passés à F), {updated_rows} mis à jour, {inserted_rows} insérés, {skipped_rows} inchangés")
+    else:
+        print(f"✅ {table_type}: {updated_rows} mis à jour, {inserted_rows} insérés, {skipped_rows} inchangés")
+    return (deleted_rows, updated_rows, inserted_rows)
+
+def merge_staging(table_types, before_commit=None, batch_id=0):
+    """
+    Fusionne plusieurs tables staging dans une seule transaction.
+
+    Args:
+        table_types (list): Tables à fusionner, dans l'ordre
+        before_commit (callable): Appelée avec (cursor, records) juste avant
+            le commit, pour écrire dans la même transaction (point de reprise)
+        batch_id (int): Lot de la staging à fusionner
+
+    Returns:
+        tuple: (success: bool, records: dict {table_type: lignes modifiées})
+    """
+    unknown = [table_type for table_type in table_types if table_type not in MERGE_TABLE_CONFIG]
+    if unknown:
+        print(f"❌ Type de table inconnu: {', '.join(unknown)}")
+        return (False, {})
+
     db_pool = DatabaseConnectionPool()
     logger = DatabaseLogger()
-    
-    table_config = {
-        'etablissement': {
-            'main_table': 'etablissement',
-            'staging_table': 'staging_etablissement',
-            'key_field': 'siret',
-            'update_champs': """
-                datecreationetablissement = s.datecreationetablissement,
-                trancheeffectifsetablissement = s.trancheeffectifsetablissement,
-                anneeeffectifsetablissement = s.anneeeffectifsetablissement,
-                datederniertraitementetablissement = s.datederniertraitementetablissement,
-                etablissementsiege = s.etablissementsiege,
-                etatadministratifetablissement = s.etatadministratifetablissement,
-                enseigne1etablissement = s.enseigne1etablissement,
-                enseigne2etablissement = s.enseigne2etablissement,
-                enseigne3etablissement = s.enseigne3etablissement,
-                denominationusuelleetablissement = s.denominationusuelleetablissement,
-                activiteprincipaleetablissement = s.activiteprincipaleetablissement
-            """
-        },
-        'unitelegale': {
-            'main_table': 'unitelegale',
-            'staging_table': 'staging_unite_legale',
-            'key_field': 'siren',
-            'update_champs': """
-                datecreationunitelegale = s.datecreationunitelegale,
-                trancheeffectifsunitelegale = s.trancheeffectifsunitelegale,
-                anneeeffectifsunitelegale = s.anneeeffectifsunitelegale,
-                datederniertraitementunitelegale = s.datederniertraitementunitelegale,
-                categorieentreprise = s.categorieentreprise,
-                anneecategorieentreprise = s.anneecategorieentreprise,
-                etatadministratifunitelegale = s.etatadministratifunitelegale,
-                nomunitelegale = s.nomunitelegale,
-                nomusageunitelegale = s.nomusageunitelegale,
-                denominationunitelegale = s.denominationunitelegale,
-                categoriejuridiqueunitelegale = s.categoriejuridiqueunitelegale,
-                activiteprincipaleunitelegale = s.activiteprincipaleunitelegale,
-                nicsiegeunitelegale = s.nicsiegeunitelegale
-            """
-        },
-        'adresse': {
-            'main_table': 'adresse',
-            'staging_table': 'staging_adresse',
-            'key_field': 'siret',
-            'update_champs': """
-                complementadresseetablissement = s.complementadresseetablissement,
-                numerovoieetablissement = s.numerovoieetablissement,
-                indicerepetitionetablissement = s.indicerepetitionetablissement,
-                typevoieetablissement = s.typevoieetablissement,
-                libellevoieetablissement = s.libellevoieetablissement,
-                codepostaletablissement = s.codepostaletablissement,
-                libellecommuneetablissement = s.libellecommuneetablissement,
-                codecommuneetablissement = s.codecommuneetablissement
-            """
-        }
-    }
-    
-    config = table_config.get(table_type)
-    if not config:
-        return (False, 0)
-    
+    operation = "_".join(table_type.upper() for table_type in table_types)
+
     try:
         with db_pool.get_connection() as conn:
+            records = {}
             with conn.cursor() as cursor:
-                # Initialiser les compteurs
-                deleted_rows = 0
-                updated_rows = 0
-                inserted_rows = 0
-                
-                if table_type == 'etablissement':
-                    # Identifier et supprimer les établissements qui passent à l'état 'F'
-                    cursor.execute("""
-                        WITH to_delete AS (
-                            DELETE FROM etablissement e
-                            USING staging_etablissement s
-                            WHERE e.siret = s.siret 
-                            AND s.etatadministratifetablissement = 'F'
-                            AND e.etatadministratifetablissement = 'A'
-                            RETURNING e.siret
-                        )
-                        INSERT INTO updates_log (entity_type, entity_id, update_type)
-                        SELECT 'etablissement', siret, 'DELETE' 
-                        FROM to_delete;
-                    """)
-                    deleted_rows = cursor.rowcount
-                elif table_type == 'unitelegale':
-                    # Mise à jour uniquement pour les unités légales liées à des établissements existants
-                    cursor.execute(f"""
-                        WITH updated AS (
-                            UPDATE {config['main_table']} u
-                            SET {config['update_champs']}
-                            FROM {config['staging_table']} s
-                            WHERE u.{config['key_field']} = s.{config['key_field']}
-                            AND EXISTS (
-                                SELECT 1 FROM etablissement e 
-                                WHERE e.siren = s.siren
-                            )
-                            RETURNING u.{config['key_field']}
-                        )
-                        INSERT INTO updates_log (entity_type, entity_id, update_type)
-                        SELECT '{table_type}', {config['key_field']}, 'UPDATE' 
-                        FROM updated;
-                    """)
-                    
-                    updated_rows = cursor.rowcount
-                    
-                    # Insertion uniquement pour les nouvelles unités légales liées à des établissements existants
-                    cursor.execute(f"""
-                        WITH inserted AS (
-                            INSERT INTO {config['main_table']}
-                            SELECT s.*
-                            FROM {config['staging_table']} s
-                            WHERE NOT EXISTS (
-                                SELECT 1 
-                                FROM {config['main_table']} u 
-                                WHERE u.{config['key_field']} = s.{config['key_field']}
-                            )
-                            AND EXISTS (
-                                SELECT 1 FROM etablissement e 
-                                WHERE e.siren = s.siren
-                            )
-                            RETURNING {config['key_field']}
-                        )
-                        INSERT INTO updates_log (entity_type, entity_id, update_type)
-                        SELECT '{table_type}', {config['key_field']}, 'INSERT' 
-                        FROM inserted;
-                    """)
-                    
-                    inserted_rows = cursor.rowcount
-                elif table_type == 'adresse':
-                    # Pour les adresses, on ne traite que les établissements non fermés
-                    cursor.execute(f"""
-                        WITH updated AS (
-                            UPDATE {config['main_table']} e
-                            SET {config['update_champs']}
-                            FROM {config['staging_table']} s
-                            WHERE e.{config['key_field']} = s.{config['key_field']}
-                            AND EXISTS (
-                                SELECT 1 FROM etablissement et
-                                WHERE et.siret = s.siret
-                                AND et.etatadministratifetablissement != 'F'
-                            )
-                            RETURNING e.{config['key_field']}
-                        )
-                        INSERT INTO updates_log (entity_type, entity_id, update_type)
-                        SELECT '{table_type}', {config['key_field']}, 'UPDATE' 
-                        FROM updated;
-                    """)
-                    
-                    updated_rows = cursor.rowcount
-                    
-                    cursor.execute(f"""
-                        WITH inserted AS (
-                            INSERT INTO {config['main_table']}
-                            SELECT s.*
-                            FROM {config['staging_table']} s
-                            WHERE NOT EXISTS (
-                                SELECT 1 
-                                FROM {config['main_table']} e 
-                                WHERE e.{config['key_field']} = s.{config['key_field']}
-                            )
-                            AND EXISTS (
-                                SELECT 1 FROM etablissement et
-                                WHERE et.siret = s.siret
-                                AND et.etatadministratifetablissement != 'F'
-                            )
-                            RETURNING {config['key_field']}
-                        )
-                        INSERT INTO updates_log (entity_type, entity_id, update_type)
-                        SELECT '{table_type}', {config['key_field']}, 'INSERT' 
-                        FROM inserted;
-                    """)
-                    
-                    inserted_rows = cursor.rowcount
-                else:
-                    # Pour les autres types (comme adresse)
-                    cursor.execute(f"""
-                        WITH updated AS (
-                            UPDATE {config['main_table']} e
-                            SET {config['update_champs']}
-                            FROM {config['staging_table']} s
-                            WHERE e.{config['key_field']} = s.{config['key_field']}
-                            RETURNING e.{config['key_field']}
-                        )
-                        INSERT INTO updates_log (entity_type, entity_id, update_type)
-                        SELECT '{table_type}', {config['key_field']}, 'UPDATE' 
-                        FROM updated;
-                    """)
-                    
-                    updated_rows = cursor.rowcount
-                    
-                    cursor.execute(f"""
-                        WITH inserted AS (
-                            INSERT INTO {config['main_table']}
-                            SELECT s.*
-                            FROM {config['staging_table']} s
-                            WHERE NOT EXISTS (
-                                SELECT 1 
-                                FROM {config['main_table']} e 
-                                WHERE e.{config['key_field']} = s.{config['key_field']}
-                            )
-                            RETURNING {config['key_field']}
-                        )
-                        INSERT INTO updates_log (entity_type, entity_id, update_type)
-                        SELECT '{table_type}', {config['key_field']}, 'INSERT' 
-                        FROM inserted;
-                    """)
-                    
-                    inserted_rows = cursor.rowcount
-                
+                for table_type in table_types:
+                    _, updated_rows, inserted_rows = _apply_staging(cursor, table_type, batch_id)
+                    records[table_type] = updated_rows + inserted_rows
+
+                if before_commit is not None:
+                    before_commit(cursor, records)
+
             conn.commit()
-            if table_type == 'etablissement':
-                print(f"✅ {table_type}: {deleted_rows} supprimés (passés à F), {updated_rows} mis à jour, {inserted_rows} insérés")
-            else:
-                print(f"✅ {table_type}: {updated_rows} mis à jour, {inserted_rows} insérés")
-            return (True, updated_rows + inserted_rows)
+            return (True, records)
 
     except Exception as e:
-        logger.log_error(f"MAIN_UPDATE_{table_type.upper()}", str(e))
+        logger.log_error(f"MAIN_UPDATE_{operation}", str(e))
         if 'conn' in locals():
             conn.rollback()
-        return (False, 0)
\ No newline at end of file
+        return (False, {})
+
+def update_from_staging(table_type):
+    """
+    Met à jour la table principale depuis la staging.
+    
+    Args:
+        table_type (str): 'etablissement', 'unitelegale' ou 'adresse'
+    Returns:
+        tuple: (success: bool, rows_affected: int)
+    """
+    success, records = merge_staging([table_type])
+    return (success, records.get(table_type, 0))
@@ -0,0 +1,631 @@
+"""Module de gestion du schéma PostgreSQL (tables, staging, index)."""
+
+import os
+import gzip
+from datetime import date
+
+import psycopg2
+
+from app.src.config.settings import (
+    INDEX_MAINTENANCE_WORKERS,
+    INDEX_MAINTENANCE_WORK_MEM,
+    LOG_RETENTION_MONTHS,
+    LOG_ARCHIVE,
+    DUMPS_DIR
+)
+from app.src.database.connection import DatabaseConnectionPool
+from app.src.database.loader import MERGE_TABLE_CONFIG
+from app.src.database.stock_loader import STOCK_TABLE_CONFIG
+from app.src.utils.logger import DatabaseLogger
+
+
+# Tables principales, créées sans index secondaire (voir SECONDARY_INDEXES)
+TABLE_DDL = {
+    'etablissement': """
+        CREATE TABLE IF NOT EXISTS etablissement (
+            siret VARCHAR(14) NOT NULL,
+            nic VARCHAR(5) NOT NULL,
+            siren VARCHAR(9) NOT NULL,
+            dateCreationEtablissement DATE,
+            trancheEffectifsEtablissement VARCHAR(10),
+            anneeEffectifsEtablissement VARCHAR(10),
+            activitePrincipaleEtablissement VARCHAR(12),
+            dateDernierTraitementEtablissement TIMESTAMP,
+            etatAdministratifEtablissement VARCHAR(1),
+            etablissementSiege BOOLEAN,
+            enseigne1Etablissement VARCHAR(50),
+            enseigne2Etablissement VARCHAR(50),
+            enseigne3Etablissement VARCHAR(50),
+            denominationUsuelleEtablissement VARCHAR(100),
+            content_hash CHAR(32),
+            PRIMARY KEY (siret)
+        )
+    """,
+    'adresse': """
+        CREATE TABLE IF NOT EXISTS adresse (
+            siret VARCHAR(14) NOT NULL,
+            complementAdresseEtablissement VARCHAR(255),
+            numeroVoieEtablissement VARCHAR(50),
+            indiceRepetitionEtablissement VARCHAR(10),
+            typeVoieEtablissement VARCHAR(50),
+            libelleVoieEtablissement VARCHAR(255),
+            codePostalEtablissement VARCHAR(10),
+            libelleCommuneEtablissement VARCHAR(100),
+            codeCommuneEtablissement VARCHAR(50),
+            content_hash CHAR(32)
+        )
+    """,
+    'unitelegale': """
+        CREATE TABLE IF NOT EXISTS unitelegale (
+            siren VARCHAR(9),
+            dateCreationUniteLegale DATE,
+            trancheEffectifsUniteLegale VARCHAR(255),
+            anneeEffectifsUniteLegale VARCHAR(255),
+            dateDernierTraitementUniteLegale TIMESTAMP,
+            categorieEntreprise VARCHAR(255),
+            anneeCategorieEntreprise VARCHAR(255),
+            etatAdministratifUniteLegale VARCHAR(255),
+            nomUniteLegale VARCHAR(255),
+            nomUsageUniteLegale VARCHAR(255),
+            denominationUniteLegale VARCHAR(255),
+            categorieJuridiqueUniteLegale VARCHAR(25),
+            activitePrincipaleUniteLegale VARCHAR(12),
+            nicSiegeUniteLegale VARCHAR(5),
+            content_hash CHAR(32),
+            PRIMARY KEY (siren)
+        )
+    """,
+    'geolocalisation': """
+        CREATE TABLE IF NOT EXISTS geolocalisation (
+            siret VARCHAR(14),
+            x NUMERIC,
+            y NUMERIC,
+            qualite_xy VARCHAR(25),
+            y_latitude NUMERIC,
+            x_longitude NUMERIC,
+            geog geography(Point, 4326) GENERATED ALWAYS AS (
+                ST_SetSRID(ST_MakePoint(x_longitude::float8, y_latitude::float8), 4326)::geography
+            ) STORED,
+            PRIMARY KEY (siret)
+        )
+    """,
+    'nafv2': """
+        CREATE TABLE IF NOT EXISTS nafv2 (
+            codenaf VARCHAR(9),
+            nafvfinale VARCHAR(255),
+            PRIMARY KEY (codenaf)
+        )
+    """,
+    'categorie_juridique': """
+        CREATE TABLE IF NOT EXISTS categorie_juridique (
+            codecj VARCHAR(4),
+            designationcj VARCHAR(150),
+            PRIMARY KEY (codecj)
+        )
+    """,
+    # Journal en ajout seul, partitionné par mois (voir ensure_log_partitions) ;
+    # les index définis ici sont hérités par chaque partition
+    'updates_log': """
+        CREATE TABLE IF NOT EXISTS updates_log (
+            id BIGINT GENERATED BY DEFAULT AS IDENTITY,
+            entity_type VARCHAR(20),  -- 'etablissement', 'unitelegale' ou 'adresse'
+            entity_id VARCHAR(14),    -- siret ou siren
+            update_type VARCHAR(10),  -- 'INSERT', 'UPDATE' ou 'DELETE'
+            update_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) PARTITION BY RANGE (update_date);
+        CREATE INDEX IF NOT EXISTS idx_log_date ON updates_log USING brin (update_date);
+        CREATE INDEX IF NOT EXISTS idx_log_entity ON updates_log (entity_type, entity_id);
+        CREATE INDEX IF NOT EXISTS idx_log_date_id ON updates_log (update_date, id);
+    """,
+    'update_checkpoint': """
+        CREATE TABLE IF NOT EXISTS update_checkpoint (
+            collection VARCHAR(20) PRIMARY KEY,  -- 'etablissement' ou 'unitelegale'
+            window_start DATE NOT NULL,          -- borne basse (date en base)
+            window_end DATE NOT NULL,            -- borne haute (date API)
+            cursor_value TEXT,                   -- dernier curseur fusionné
+            rows_merged BIGINT DEFAULT 0,
+            status VARCHAR(10) NOT NULL,         -- 'RUNNING' ou 'DONE'
+            fully_walked BOOLEAN NOT NULL DEFAULT FALSE,  -- fenêtre parcourue jusqu'à la fin du flux
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+}
+
+# Colonnes ajoutées aux tables créées par les anciens jobs de chargement
+ADDED_COLUMNS = {
+    **{
+        config['main_table']: {'content_hash': 'CHAR(32)'}
+        for config in MERGE_TABLE_CONFIG.values()
+    },
+    # Les fenêtres DONE antérieures restent à FALSE : leur fin n'est pas fiable
+    'update_checkpoint': {'fully_walked': 'BOOLEAN NOT NULL DEFAULT FALSE'},
+    # Point des recherches par rayon et des regroupements de l'API, calculé à l'écriture
+    'geolocalisation': {
+        'geog': "geography(Point, 4326) GENERATED ALWAYS AS "
+                "(ST_SetSRID(ST_MakePoint(x_longitude::float8, y_latitude::float8), 4326)::geography) STORED"
+    },
+}
+
+# Extensions requises par les tables : créées avant leur DDL ou leurs colonnes ajoutées
+REQUIRED_EXTENSIONS = {
+    'geolocalisation': 'postgis',
+}
+
+# Index ajoutés aux tables créées par les versions précédentes : {table: {nom: colonnes}}
+#   idx_log_date_id : parcours ordonné du journal par (update_date, id) pour
+#   la pagination par clé de /changes et de la synchronisation MongoDB, que
+#   l'index BRIN ne sait pas fournir
+ADDED_INDEXES = {
+    'updates_log': {'idx_log_date_id': 'update_date, id'},
+}
+
+# Colonnes propres aux tables staging (lot et ordre de chargement)
+STAGING_COLUMNS = {
+    'batch_id': 'BIGINT NOT NULL DEFAULT 0',
+    'load_seq': 'BIGINT GENERATED BY DEFAULT AS IDENTITY',
+}
+
+# Tables staging UNLOGGED et table principale dont elles reprennent la structure
+STAGING_TABLES = {
+    config['staging_table']: config['main_table'] for config in STOCK_TABLE_CONFIG.values()
+}
+
+# Index secondaires par table : {nom (minuscules): colonnes indexées ou 'USING méthode (colonnes)'}
+SECONDARY_INDEXES = {
+    'etablissement': {
+        'etabl_siren_idx': 'siren',
+        'etabl_nic_idx': 'nic',
+        'etabl_etablissementsiege_idx': 'etablissementSiege',
+        'etabl_datederniertraitementetablissement_idx': 'dateDernierTraitementEtablissement',
+    },
+    'adresse': {
+        'adr_codepostaletablissement_idx': 'codePostalEtablissement',
+        'adr_siret_idx': 'siret',
+        'adr_libellecommuneetablissement_idx': 'libelleCommuneEtablissement',
+    },
+    'unitelegale': {
+        'datederniertraitementunitelegale_idx': 'dateDernierTraitementUniteLegale',
+        'nicsiegeunitelegale_idx': 'nicSiegeUniteLegale',
+        'categoriejuridiqueunitelegale_idx': 'categorieJuridiqueUniteLegale',
+        'activiteprincipaleunitelegale_idx': 'activitePrincipaleUniteLegale',
+    },
+    'geolocalisation': {
+        'geo_geog_idx': 'USING gist (geog)',
+    },
+}
+
+# Journal non partitionné des versions précédentes, migré par ensure_schema
+LEGACY_LOG_TABLE = 'updates_log_legacy'
+
+
+def pending_ddl(cursor) -> list:
+    """
+    Liste les instructions DDL nécessaires pour compléter le schéma.
+
+    Seuls les objets absents du catalogue donnent lieu à une instruction :
+    sur un schéma complet, la liste est vide et aucun verrou n'est pris.
+
+    Returns:
+        list: Instructions à exécuter, dans l'ordre
+    """
+    relations = list(TABLE_DDL) + list(STAGING_TABLES)
+    cursor.execute("""
+        SELECT c.relname, c.relpersistence, c.relkind
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = current_schema()
+        AND c.relkind IN ('r', 'p')
+        AND c.relname = ANY(%s)
+    """, (relations,))
+    catalog = cursor.fetchall()
+    persistence = {relname: relpersistence for relname, relpersistence, _ in catalog}
+    kinds = {relname: relkind for relname, _, relkind in catalog}
+
+    cursor.execute("""
+        SELECT table_name, column_name
+        FROM information_schema.columns
+        WHERE table_schema = current_schema()
+        AND table_name = ANY(%s)
+    """, (relations,))
+    columns = set(cursor.fetchall())
+
+    cursor.execute("""
+        SELECT c.relname
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = current_schema()
+        AND c.relkind IN ('i', 'I')
+        AND c.relname = ANY(%s)
+    """, ([name for added in ADDED_INDEXES.values() for name in added],))
+    indexes = {row[0] for row in cursor.fetchall()}
+
+    statements = []
+    if kinds.get('updates_log') == 'r':
+        # Ancien journal non partitionné : renommé, ses lignes sont recopiées
+        # dans le journal partitionné (voir _migrate_legacy_log)
+        statements += [
+            f"ALTER TABLE updates_log RENAME TO {LEGACY_LOG_TABLE}",
+            "DROP INDEX IF EXISTS idx_log_entity",
+            "DROP INDEX IF EXISTS idx_log_date",
+        ]
+        del persistence['updates_log']
+
+    extensions = {
+        extension for table, extension in REQUIRED_EXTENSIONS.items()
+        if table not in persistence
+        or any((table, column) not in columns for column in ADDED_COLUMNS.get(table, {}))
+    }
+    statements += [f"CREATE EXTENSION IF NOT EXISTS {extension}" for extension in sorted(extensions)]
+
+    statements += [ddl for table, ddl in TABLE_DDL.items() if table not in persistence]
+
+    for table, added in ADDED_COLUMNS.items():
+        if table not in persistence:
+            continue
+        statements += [
+            f"ALTER TABLE {table} ADD COLUMN {column} {definition}"
+            for column, definition in added.items()
+            if (table, column) not in columns
+        ]
+
+    for table, added in ADDED_INDEXES.items():
+        if table not in persistence:
+            continue
+        # Sur une table partitionnée, l'index est créé sur chaque partition
+        statements += [
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({indexed})"
+            for name, indexed in added.items()
+            if name not in indexes
+        ]
+
+    for staging, main in STAGING_TABLES.items():
+        if staging not in persistence:
+            statements.append(
+                f"CREATE UNLOGGED TABLE {staging} (LIKE {main} INCLUDING DEFAULTS)"
+            )
+            missing = STAGING_COLUMNS
+        else:
+            if persistence[staging] != 'u':
+                statements.append(f"ALTER TABLE {staging} SET UNLOGGED")
+            missing = {
+                column: definition for column, definition in STAGING_COLUMNS.items()
+                if (staging, column) not in columns
+            }
+        statements += [
+            f"ALTER TABLE {staging} ADD COLUMN {column} {definition}"
+            for column, definition in missing.items()
+        ]
+
+    return statements
+
+
+def ensure_schema(with_indexes: bool = True) -> bool:
+    """
+    Crée les tables, colonnes et tables staging manquantes.
+
+    Idempotent : appelé au début de chaque cycle, il n'émet aucun DDL sur un
+    schéma déjà complet. Les fusions n'exécutent jamais de DDL.
+
+    Args:
+        with_indexes (bool): Construit aussi les index secondaires manquants
+
+    Returns:
+        bool: True si le schéma est complet
+    """
+    db_pool = DatabaseConnectionPool()
+    logger = DatabaseLogger()
+
+    try:
+        with db_pool.get_connection() as conn:
+            with conn.cursor() as cursor:
+                statements = pending_ddl(cursor)
+                for statement in statements:
+                    cursor.execute(statement)
+                migrated = _migrate_legacy_log(cursor)
+                partitions = ensure_log_partitions(cursor, date.today())
+            conn.commit()
+        if statements:
+            print(f"🧱 Schéma complété ({len(statements)} instructions DDL)")
+        if migrated:
+            print(f"🧱 Journal des mises à jour migré ({migrated} lignes)")
+        if partitions:
+            print(f"🧱 Partitions créées : {', '.join(partitions)}")
+    except psycopg2.Error as e:
+        logger.log_error("SCHEMA", str(e))
+        if 'conn' in locals():
+            conn.rollback()
+        return False
+
+    return build_indexes() if with_indexes else True
+
+
+def _add_months(month: date, months: int) -> date:
+    """Premier jour du mois décalé de `months` mois."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def log_partition_name(month: date) -> str:
+    """Nom de la partition mensuelle du journal (updates_log_AAAAMM)."""
+    return f"updates_log_{month:%Y%m}"
+
+
+def create_log_partitions(cursor, first: date, last: date) -> list:
+    """
+    Crée les partitions mensuelles manquantes du journal, sans commit.
+
+    Args:
+        first (date): Premier mois couvert
+        last (date): Dernier mois couvert (inclus)
+
+    Returns:
+        list: Noms des partitions créées
+    """
+    created = []
+    month = first.replace(day=1)
+    while month <= last:
+        name = log_partition_name(month)
+        cursor.execute("SELECT to_regclass(%s)", (name,))
+        if cursor.fetchone()[0] is None:
+            cursor.execute(
+                f"CREATE TABLE {name} PARTITION OF updates_log "
+                f"FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}')"
+            )
+            created.append(name)
+        month = _add_months(month, 1)
+    return created
+
+
+def ensure_log_partitions(cursor, today: date) -> list:
+    """
+    Crée à l'avance les partitions du mois courant et du mois suivant.
+
+    Appelée en début de cycle : les fusions écrivent toujours dans une
+    partition existante.
+
+    Returns:
+        list: Noms des partitions créées
+    """
+    month = today.replace(day=1)
+    return create_log_partitions(cursor, month, _add_months(month, 1))
+
+
+def _migrate_legacy_log(cursor) -> int:
+    """
+    Recopie l'ancien journal non partitionné puis le supprime, sans commit.
+
+    Returns:
+        int: Nombre de lignes migrées
+    """
+    cursor.execute("SELECT to_regclass(%s)", (LEGACY_LOG_TABLE,))
+    if cursor.fetchone()[0] is None:
+        return 0
+
+    cursor.execute(f"SELECT min(update_date)::date FROM {LEGACY_LOG_TABLE}")
+    first = cursor.fetchone()[0] or date.today()
+    create_log_partitions(cursor, first, date.today())
+
+    cursor.execute(f"""
+        INSERT INTO updates_log (id, entity_type, entity_id, update_type, update_date)
+        SELECT id, entity_type, entity_id, update_type,
+               coalesce(update_date, CURRENT_TIMESTAMP)
+        FROM {LEGACY_LOG_TABLE}
+    """)
+    migrated = cursor.rowcount
+    cursor.execute(f"""
+        SELECT setval(pg_get_serial_sequence('updates_log', 'id'), max(id))
+        FROM {LEGACY_LOG_TABLE}
+        HAVING max(id) IS NOT NULL
+    """)
+    cursor.execute(f"DROP TABLE {LEGACY_LOG_TABLE}")
+    return migrated
+
+
+def expired_log_partitions(partitions, today: date, retention_months: int) -> list:
+    """
+    Sélectionne les partitions entièrement antérieures à la rétention.
+
+    Args:
+        partitions (list): Noms des partitions (updates_log_AAAAMM)
+        today (date): Date de référence
+        retention_months (int): Nombre de mois conservés, mois courant compris
+
+    Returns:
+        list: Partitions à archiver ou supprimer, de la plus ancienne à la plus récente
+    """
+    cutoff = f"updates_log_{_add_months(today.replace(day=1), 1 - retention_months):%Y%m}"
+    return sorted(
+        name for name in partitions
+        if len(name) == len(cutoff) and name[-6:].isdigit() and name < cutoff
+    )
+
+
+def apply_log_retention(retention_months: int = LOG_RETENTION_MONTHS,
+                        archive: bool = LOG_ARCHIVE) -> int:
+    """
+    Détache et supprime les partitions du journal sorties de la rétention.
+
+    Avec `archive`, chaque partition est d'abord exportée en CSV compressé
+    dans `dumps/updates_log/`. Supprimer une partition entière ne laisse ni
+    tuple mort ni VACUUM à faire, contrairement à un DELETE.
+
+    Args:
+        retention_months (int): Nombre de mois conservés (0 : aucune purge)
+        archive (bool): Exporte les partitions avant suppression
+
+    Returns:
+        int: Nombre de partitions supprimées
+    """
+    if retention_months <= 0:
+        return 0
+
+    db_pool = DatabaseConnectionPool()
+    logger = DatabaseLogger()
+    archive_dir = os.path.join(DUMPS_DIR, 'updates_log')
+    dropped = 0
+
+    try:
+        with db_pool.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT c.relname
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = 'updates_log'::regclass
+                """)
+                partitions = [row[0] for row in cursor.fetchall()]
+
+            for name in expired_log_partitions(partitions, date.today(), retention_months):
+                with conn.cursor() as cursor:
+                    cursor.execute(f"ALTER TABLE updates_log DETACH PARTITION {name}")
+                    if archive:
+                        os.makedirs(archive_dir, exist_ok=True)
+                        with gzip.open(os.path.join(archive_dir, f"{name}.csv.gz"), 'wt',
+                                       encoding='utf-8') as f:
+                            cursor.copy_expert(f"COPY {name} TO STDOUT WITH CSV HEADER", f)
+                    cursor.execute(f"DROP TABLE {name}")
+                conn.commit()
+                dropped += 1
+                logger.log_main_operation(f"LOG_RETENTION_{name.upper()}", 0)
+                print(f"🧹 Partition {name} {'archivée et ' if archive else ''}supprimée")
+        return dropped
+
+    except (psycopg2.Error, OSError) as e:
+        logger.log_error("LOG_RETENTION", str(e))
+        if 'conn' in locals():
+            conn.rollback()
+        return dropped
+
+
+def _index_names(tables) -> dict:
+    """Index secondaires des tables demandées : {nom: (table, colonnes)}."""
+    return {
+        name: (table, columns)
+        for table in (tables or SECONDARY_INDEXES)
+        for name, columns in SECONDARY_INDEXES.get(table, {}).items()
+    }
+
+
+def _index_target(table, columns) -> str:
+    """Table et colonnes d'un index secondaire, méthode d'accès comprise (btree par défaut)."""
+    if columns.upper().startswith('USING '):
+        return f"{table} {columns}"
+    return f"{table} ({columns})"
+
+
+def drop_secondary_indexes(tables=None) -> bool:
+    """
+    Supprime les index secondaires avant un chargement massif.
+
+    Les clés primaires sont conservées ; les index sont reconstruits par
+    `build_indexes` une fois les données chargées.
+
+    Args:
+        tables (list): Tables concernées (toutes par défaut)
+
+    Returns:
+        bool: True si succès, False si échec
+    """
+    db_pool = DatabaseConnectionPool()
+    logger = DatabaseLogger()
+    indexes = _index_names(tables)
+
+    try:
+        with db_pool.get_connection() as conn:
+            with conn.cursor() as cursor:
+                for name in indexes:
+                    cursor.execute(f"DROP INDEX IF EXISTS {name}")
+            conn.commit()
+        print(f"🗑️ {len(indexes)} index secondaires supprimés avant chargement")
+        return True
+    except psycopg2.Error as e:
+        logger.log_error("SCHEMA_DROP_INDEXES", str(e))
+        if 'conn' in locals():
+            conn.rollback()
+        return False
+
+
+def build_indexes(tables=None) -> bool:
+    """
+    Construit les index secondaires manquants sans bloquer les écritures.
+
+    Les index sont créés avec CREATE INDEX CONCURRENTLY (hors transaction) et
+    `max_parallel_maintenance_workers` processus par construction. Un index
+    laissé invalide par une construction interrompue est reconstruit.
+
+    Args:
+        tables (list): Tables concernées (toutes par défaut)
+
+    Returns:
+        bool: True si tous les index sont valides
+    """
+    db_pool = DatabaseConnectionPool()
+    logger = DatabaseLogger()
+    indexes = _index_names(tables)
+
+    try:
+        with db_pool.get_connection() as conn:
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("""
+                        SELECT c.relname, i.indisvalid
+                        FROM pg_index i
+                        JOIN pg_class c ON c.oid = i.indexrelid
+                        JOIN pg_namespace n ON n.oid = c.relnamespace
+                        WHERE n.nspname = current_schema()
+                        AND c.relname = ANY(%s)
+                    """, (list(indexes),))
+                    valid = dict(cursor.fetchall())
+                    missing = [name for name in indexes if not valid.get(name)]
+                    if not missing:
+                        return True
+
+                    cursor.execute(
+                        "SET max_parallel_maintenance_workers = %s", (INDEX_MAINTENANCE_WORKERS,)
+                    )
+                    cursor.execute("SET maintenance_work_mem = %s", (INDEX_MAINTENANCE_WORK_MEM,))
+                    for name in missing:
+                        table, columns = indexes[name]
+                        if name in valid:
+                            cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+                        cursor.execute(
+                            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {_index_target(table, columns)}"
+                        )
+                        print(f"🗂️ Index {name} construit")
+                    cursor.execute("RESET max_parallel_maintenance_workers")
+                    cursor.execute("RESET maintenance_work_mem")
+            finally:
+                conn.autocommit = False
+        return True
+    except psycopg2.Error as e:
+        logger.log_error("SCHEMA_INDEXES", str(e))
+        return False
+
+
+def analyze_tables(tables) -> bool:
+    """
+    Met à jour les statistiques du planificateur après un chargement.
+
+    Args:
+        tables (list): Tables à analyser
+
+    Returns:
+        bool: True si succès, False si échec
+    """
+    db_pool = DatabaseConnectionPool()
+    logger = DatabaseLogger()
+
+    try:
+        with db_pool.get_connection() as conn:
+            with conn.cursor() as cursor:
+                for table in tables:
+                    cursor.execute(f"ANALYZE {table}")
+            conn.commit()
+        print(f"📈 Statistiques mises à jour : {', '.join(tables)}")
+        return True
+    except psycopg2.Error as e:
+        logger.log_error("SCHEMA_ANALYZE", str(e))
+        if 'conn' in locals():
+            conn.rollback()
+        return False
@@ -0,0 +1,384 @@
+"""Module de chargement des fichiers stock INSEE par COPY parallèles."""
+
+import os
+import csv
+import shutil
+import zipfile
+from contextlib import contextmanager
+
+import psycopg2
+
+from app.src.config.settings import IDF_DEPARTEMENTS
+from app.src.database.connection import DatabaseConnectionPool
+from app.src.database.copy_stream import CopyRowStream
+from app.src.database.loader import MERGE_TABLE_CONFIG, content_hash_sql
+from app.src.utils.logger import DatabaseLogger
+
+# Taille des blocs lus d'un trait lors de la recherche des bornes de plages
+SCAN_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+def _is_active_idf_etablissement(record, index) -> bool:
+    """Établissement diffusible, actif et situé en Île-de-France."""
+    return (
+        record[index['statutdiffusionetablissement']] == 'O'
+        and record[index['etatadministratifetablissement']] == 'A'
+        and record[index['codepostaletablissement']][:2] in IDF_DEPARTEMENTS
+    )
+
+
+# Configuration des tables alimentées par les fichiers stock
+#   columns : colonnes chargées, identiques (en minuscules) aux en-têtes CSV
+STOCK_TABLE_CONFIG = {
+    **{
+        table_type: {
+            'main_table': config['main_table'],
+            'staging_table': config['staging_table'],
+            'key_field': config['key_field'],
+            'columns': config['columns']
+        }
+        for table_type, config in MERGE_TABLE_CONFIG.items()
+    },
+    'geolocalisation': {
+        'main_table': 'geolocalisation',
+        'staging_table': 'staging_geolocalisation',
+        'key_field': 'siret',
+        'columns': ['siret', 'x', 'y', 'qualite_xy', 'y_latitude', 'x_longitude']
+    },
+    'nafv2': {
+        'main_table': 'nafv2',
+        'staging_table': 'staging_nafv2',
+        'key_field': 'codenaf',
+        'columns': ['codenaf', 'nafvfinale']
+    },
+    'categorie_juridique': {
+        'main_table': 'categorie_juridique',
+        'staging_table': 'staging_categorie_juridique',
+        'key_field': 'codecj',
+        'columns': ['codecj', 'designationcj']
+    }
+}
+
+# Fichiers stock : archive data.gouv.fr (ou CSV seul), séparateur, tables alimentées
+STOCK_SOURCES = {
+    'etablissement': {
+        'archive': 'StockEtablissement_utf8.zip',
+        'file': 'StockEtablissement_utf8.csv',
+        'delimiter': ',',
+        'tables': ['etablissement', 'adresse'],
+        'row_filter': _is_active_idf_etablissement
+    },
+    'unitelegale': {
+        'archive': 'StockUniteLegale_utf8.zip',
+        'file': 'StockUniteLegale_utf8.csv',
+        'delimiter': ',',
+        'tables': ['unitelegale']
+    },
+    'geolocalisation': {
+        'archive': 'GeolocalisationEtablissement_Sirene_pour_etudes_statistiques_utf8.zip',
+        'file': 'GeolocalisationEtablissement_Sirene_pour_etudes_statistiques_utf8.csv',
+        'delimiter': ';',
+        'tables': ['geolocalisation']
+    },
+    'nafv2': {
+        'archive': None,
+        'file': 'naf_rev_2.csv',
+        'delimiter': ';',
+        'tables': ['nafv2']
+    },
+    'categorie_juridique': {
+        'archive': None,
+        'file': 'cj_sept2022.csv',
+        'delimiter': ';',
+        'tables': ['categorie_juridique']
+    }
+}
+
+def extract_stock_file(stock_dir, source_name) -> str:
+    """
+    Extrait le CSV d'une archive stock à côté de celle-ci.
+
+    Le membre de l'archive est décompressé en flux ; une extraction déjà
+    présente et complète est réutilisée.
+
+    Returns:
+        str: Chemin du fichier CSV
+    """
+    source = STOCK_SOURCES[source_name]
+    path = os.path.join(stock_dir, source['file'])
+    if source['archive'] is None:
+        return path
+
+    with zipfile.ZipFile(os.path.join(stock_dir, source['archive'])) as archive:
+        member = archive.getinfo(source['file'])
+        if os.path.exists(path) and os.path.getsize(path) == member.file_size:
+            return path
+
+        print(f"📦 Extraction de {source['archive']}")
+        with archive.open(member) as compressed, open(path, 'wb') as extracted:
+            shutil.copyfileobj(compressed, extracted, 1024 * 1024)
+    return path
+
+
+@contextmanager
+def open_stock_stream(stock_dir, source_name):
+    """
+    Ouvre un fichier stock en lecture binaire séquentielle.
+
+    Les archives sont lues directement via `zipfile` : le CSV est décompressé
+    au fil de la lecture, sans jamais être écrit sur disque.
+
+    Yields:
+        io.BufferedIOBase: Flux des lignes CSV (en-tête compris)
+    """
+    source = STOCK_SOURCES[source_name]
+    if source['archive'] is None:
+        with open(os.path.join(stock_dir, source['file']), 'rb') as stream:
+            yield stream
+        return
+
+    with zipfile.ZipFile(os.path.join(stock_dir, source['archive'])) as archive:
+        with archive.open(source['file']) as stream:
+            yield stream
+
+
+def parse_header(line, delimiter):
+    """Décode la ligne d'en-tête d'un fichier stock (BOM éventuel ignoré)."""
+    return next(csv.reader([line.decode('utf-8-sig')], delimiter=delimiter))
+
+
+def read_header(path, delimiter):
+    """
+    Lit l'en-tête d'un fichier stock.
+
+    Returns:
+        tuple: (noms de colonnes, position du début des données en octets)
+    """
+    with open(path, 'rb') as f:
+        line = f.readline()
+    return parse_header(line, delimiter), len(line)
+
+
+def _odd_quotes(data):
+    """Indique si un morceau de CSV ouvre ou ferme un champ entre guillemets."""
+    return data.count(b'"') % 2 == 1
+
+
+def stream_blocks(stream, block_size):
+    """
+    Découpe un flux stock en blocs d'enregistrements complets.
+
+    Un champ entre guillemets peut contenir des retours à la ligne : un bloc
+    est prolongé tant qu'un guillemet reste ouvert (les guillemets doublés
+    s'annulent).
+
+    Yields:
+        list: Lignes brutes (bytes) totalisant environ `block_size` octets
+    """
+    while lines := stream.readlines(max(1, block_size)):
+        in_quotes = _odd_quotes(b''.join(lines))
+        while in_quotes and (line := stream.readline()):
+            lines.append(line)
+            in_quotes ^= _odd_quotes(line)
+        yield lines
+
+
+def plan_chunks(path, data_start, chunk_size):
+    """
+    Découpe un fichier en plages d'octets [start, end) à copier en parallèle.
+
+    Chaque borne est un début d'enregistrement : le fichier est parcouru une
+    fois en comptant les guillemets, pour ne pas couper un champ qui contient
+    un retour à la ligne. Les octets situés avant une borne visée sont lus par
+    blocs de SCAN_BLOCK_SIZE, seules les lignes qui suivent sont examinées.
+    """
+    chunk_size = max(1, chunk_size)
+    size = os.path.getsize(path)
+    bounds = [data_start]
+
+    with open(path, 'rb') as f:
+        f.seek(data_start)
+        position, in_quotes = data_start, False
+        while bounds[-1] + chunk_size < size:
+            target = bounds[-1] + chunk_size
+            while position + SCAN_BLOCK_SIZE <= target:
+                block = f.read(SCAN_BLOCK_SIZE)
+                position += len(block)
+                in_quotes ^= _odd_quotes(block)
+            # Avance jusqu'à la première fin d'enregistrement après la cible
+            while line := f.readline():
+                position += len(line)
+                in_quotes ^= _odd_quotes(line)
+                if not in_quotes and position >= target:
+                    break
+            if not line or position >= size:
+                break
+            bounds.append(position)
+
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def read_chunk(path, start, end):
+    """
+    Itère sur les lignes de la plage [start, end), bornée par `plan_chunks`
+    sur des débuts d'enregistrement.
+
+    Yields:
+        str: Ligne décodée (avec son retour à la ligne)
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        position = start
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line.decode('utf-8')
+
+
+def stock_rows(lines, header, delimiter, columns, row_filter=None):
+    """
+    Convertit des lignes CSV stock en tuples dans l'ordre des colonnes.
+
+    Args:
+        lines (iterable): Lignes CSV sans en-tête
+        header (list): En-tête du fichier
+        delimiter (str): Séparateur CSV
+        columns (list): Colonnes de la table cible (en-têtes en minuscules)
+        row_filter (callable): Prédicat (enregistrement, index des colonnes)
+
+    Yields:
+        tuple: Valeurs (NULL si vides ou absentes du fichier)
+    """
+    index = {name.strip().lower(): position for position, name in enumerate(header)}
+    positions = [index.get(column) for column in columns]
+
+    for record in csv.reader(lines, delimiter=delimiter):
+        if not record or (row_filter and not row_filter(record, index)):
+            continue
+        yield tuple(
+            record[position].strip() if position is not None and position < len(record) else None
+            for position in positions
+        )
+
+
+def _copy_lines(source_name, read_lines, header, batch_id, label):
+    """
+    Copie des lignes d'un fichier stock dans les tables staging de la source.
+
+    Exécutée dans un processus de travail : chaque processus ouvre son propre
+    pool de connexions. Toutes les tables de la source sont chargées dans
+    une seule transaction.
+
+    Args:
+        source_name (str): Fichier stock (clé de `STOCK_SOURCES`)
+        read_lines (callable): Retourne un nouvel itérable des lignes décodées
+            (relu pour chaque table de la source)
+        header (list): En-tête du fichier
+        batch_id (int): Lot de staging du chargement
+        label (str): Désignation des lignes dans les logs
+
+    Returns:
+        tuple: (success: bool, rows: dict {table_type: lignes copiées})
+    """
+    db_pool = DatabaseConnectionPool()
+    logger = DatabaseLogger()
+    source = STOCK_SOURCES[source_name]
+    copied = {}
+
+    try:
+        with db_pool.get_connection() as conn:
+            with conn.cursor() as cursor:
+                for table_type in source['tables']:
+                    config = STOCK_TABLE_CONFIG[table_type]
+                    rows = stock_rows(
+                        read_lines(), header, source['delimiter'],
+                        config['columns'], source.get('row_filter')
+                    )
+                    stream = CopyRowStream((*row, batch_id) for row in rows)
+                    cursor.copy_expert(
+                        f"COPY {config['staging_table']} "
+                        f"({', '.join(config['columns'])}, batch_id) FROM STDIN",
+                        stream
+                    )
+                    copied[table_type] = stream.rows_written
+            conn.commit()
+        return (True, copied)
+
+    except (psycopg2.Error, OSError, csv.Error, UnicodeDecodeError, IndexError) as e:
+        logger.log_error(f"STOCK_COPY_{source_name.upper()}", f"[{label}] {e}")
+        if 'conn' in locals():
+            conn.rollback()
+        return (False, copied)
+
+
+def copy_chunk(source_name, path, start, end, header, batch_id):
+    """
+    Copie une plage d'octets d'un fichier stock extrait.
+
+    Returns:
+        tuple: (success: bool, rows: dict {table_type: lignes copiées})
+    """
+    return _copy_lines(
+        source_name, lambda: read_chunk(path, start, end), header, batch_id, f"{start}-{end}"
+    )
+
+
+def copy_block(source_name, lines, header, batch_id):
+    """
+    Copie un bloc de lignes lu en flux depuis une archive stock.
+
+    Le filtre de la source (Île-de-France pour les établissements) est
+    appliqué à la volée, avant le COPY.
+
+    Returns:
+        tuple: (success: bool, rows: dict {table_type: lignes copiées})
+    """
+    return _copy_lines(
+        source_name, lambda: (line.decode('utf-8') for line in lines),
+        header, batch_id, f"{len(lines)} lignes"
+    )
+
+
+def publish_stock_table(table_type, batch_id):
+    """
+    Remplace le contenu d'une table principale par le lot chargé en staging.
+
+    Returns:
+        tuple: (success: bool, rows_affected: int)
+    """
+    db_pool = DatabaseConnectionPool()
+    logger = DatabaseLogger()
+    config = STOCK_TABLE_CONFIG[table_type]
+    key = config['key_field']
+    columns = ", ".join(config['columns'])
+    source_columns = ", ".join(f"s.{column}" for column in config['columns'])
+    if table_type in MERGE_TABLE_CONFIG:
+        columns += ", content_hash"
+        source_columns += f", {content_hash_sql(table_type, 's')}"
+
+    try:
+        with db_pool.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"TRUNCATE {config['main_table']}")
+                cursor.execute(f"""
+                    INSERT INTO {config['main_table']} ({columns})
+                    SELECT DISTINCT ON (s.{key}) {source_columns}
+                    FROM {config['staging_table']} s
+                    WHERE s.batch_id = %(batch_id)s
+                    ORDER BY s.{key}, s.load_seq DESC
+                """, {'batch_id': batch_id})
+                rows_affected = cursor.rowcount
+                cursor.execute(f"TRUNCATE {config['staging_table']}")
+            conn.commit()
+        logger.log_main_operation(f"STOCK_{table_type.upper()}", rows_affected)
+        print(f"✅ Table {config['main_table']} chargée ({rows_affected} lignes)")
+        return (True, rows_affected)
+
+    except psycopg2.Error as e:
+        logger.log_error(f"STOCK_PUBLISH_{table_type.upper()}", str(e))
+        if 'conn' in locals():
+            conn.rollback()
+        return (False, 0)
@@ -0,0 +1,310 @@
+"""Service de mise à jour asynchrone (asyncio, httpx, asyncpg)."""
+
+import time
+import asyncio
+
+from app.src.config.settings import (
+    API_CALLS_PER_MINUTE,
+    API_BURST,
+    PIPELINE_QUEUE_SIZE,
+    ASYNC_DB_CONCURRENCY
+)
+from app.src.api.async_client import AsyncInseeClient
+from app.src.api.base_client import InseeFetchError
+from app.src.api.rate_limiter import AsyncTokenBucket
+from app.src.api.siret import (
+    ETABLISSEMENT_URL,
+    etablissement_query_params,
+    parse_etablissement_page
+)
+from app.src.api.siren import (
+    UNITELEGALE_URL,
+    unitelegale_query_params,
+    parse_unitelegale_page
+)
+from app.src.database.async_loader import create_async_pool, copy_records_to_staging
+from app.src.service.batcher import StagingBatch
+from app.src.service.updater import UpdateService
+
+
+class AsyncStagingBatch(StagingBatch):
+    """
+    Lot d'accumulation alimenté par des COPY asyncpg concurrents.
+
+    Jusqu'à `copy_concurrency` pages sont copiées en même temps ; toutes les
+    copies en cours sont attendues avant une fusion, si bien que le point de
+    reprise ne dépasse jamais une page non chargée. La fusion elle-même
+    (MERGE + point de reprise) est exécutée dans un thread.
+    """
+
+    def __init__(self, pool, name: str, table_types, window=None, rows_merged: int = 0,
+                 merge_after: asyncio.Event = None,
+                 copy_concurrency: int = ASYNC_DB_CONCURRENCY):
+        """
+        Args:
+            pool (asyncpg.Pool): Pool de connexions asyncpg
+            name (str): Collection traitée ('etablissement' ou 'unitelegale')
+            table_types (list): Tables staging alimentées par le flux
+            window (tuple): Fenêtre de dates (db_date, api_date) du cycle
+            rows_merged (int): Lignes déjà fusionnées (reprise d'un cycle)
+            merge_after (asyncio.Event): Dépendance à lever avant toute fusion
+            copy_concurrency (int): Nombre maximal de COPY simultanés
+        """
+        super().__init__(name, table_types, window=window, rows_merged=rows_merged)
+        self.pool = pool
+        self.async_merge_after = merge_after
+        self.failed = False
+        self._slots = asyncio.Semaphore(max(1, copy_concurrency))
+        self._copies = set()
+
+    def should_flush(self) -> bool:
+        """Indique si le lot en attente doit être fusionné."""
+        if self.async_merge_after is not None and not self.async_merge_after.is_set():
+            return False
+        return super().should_flush()
+
+    async def _copy_page(self, pages: dict, batch_id: int):
+        """Copie une page dans ses tables staging puis libère son créneau."""
+        try:
+            for table_type in self.table_types:
+                rows = pages.get(table_type)
+                if rows and not await copy_records_to_staging(self.pool, rows, table_type, batch_id):
+                    self.failed = True
+        finally:
+            self._slots.release()
+
+    async def _drain(self) -> bool:
+        """Attend la fin des copies en cours."""
+        if self._copies:
+            await asyncio.gather(*self._copies)
+        return not self.failed
+
+    async def add_async(self, pages: dict, next_cursor=None) -> bool:
+        """
+        Lance la copie d'une page et fusionne si le seuil est atteint.
+
+        Args:
+            pages (dict): {table_type: lignes} pour chaque table du flux
+            next_cursor (str): Curseur INSEE suivant cette page
+
+        Returns:
+            bool: False si un chargement ou la fusion a échoué
+        """
+        await self._slots.acquire()
+        task = asyncio.create_task(self._copy_page(pages, self.batch_id))
+        self._copies.add(task)
+        task.add_done_callback(self._copies.discard)
+
+        if self._first_pending_at is None:
+            self._first_pending_at = time.monotonic()
+        self.pending_rows += len(pages.get(self.table_types[0]) or [])
+        self.pending_cursor = next_cursor
+
+        if self.failed:
+            return False
+        if self.should_flush():
+            return await self.flush_async()
+        return True
+
+    async def flush_async(self) -> bool:
+        """Fusionne le lot en attente une fois toutes ses pages copiées."""
+        if not await self._drain():
+            return False
+        return await asyncio.to_thread(self.flush)
+
+    async def complete_async(self) -> bool:
+        """Fusionne le dernier lot puis clôture la fenêtre du cycle."""
+        if self.async_merge_after is not None and not self.async_merge_after.is_set():
+            print(f"⏳ [{self.name}] Attente de la fusion des dépendances")
+            await self.async_merge_after.wait()
+        if not await self._drain():
+            return False
+        return await asyncio.to_thread(self.complete)
+
+    async def suspend_async(self) -> bool:
+        """Fusionne les pages déjà copiées sans clôturer la fenêtre du cycle."""
+        if self.async_merge_after is not None and not self.async_merge_after.is_set():
+            await self.async_merge_after.wait()
+        if not await self._drain():
+            return False
+        return await asyncio.to_thread(self.flush)
+
+
+class AsyncUpdateService(UpdateService):
+    """
+    Variante asynchrone du service de mise à jour.
+
+    Récupération, conversion et COPY s'entrelacent sur une seule boucle
+    d'événements : pendant qu'une page est copiée en staging, la suivante est
+    déjà demandée à l'API. La préparation du cycle (dates, points de reprise)
+    et les fusions restent celles du service synchrone.
+    """
+
+    def __init__(self, copy_concurrency: int = ASYNC_DB_CONCURRENCY):
+        super().__init__(pipelined=False)
+        self.copy_concurrency = copy_concurrency
+
+    @staticmethod
+    def _window_open(window, label) -> bool:
+        """Indique si la fenêtre (db_date, api_date) contient des données à traiter."""
+        db_date, api_date = window
+        if db_date is None or api_date is None:
+            return False
+        if api_date <= db_date:
+            print(f"✨ Données {label} à jour")
+            return False
+        print(f"🔄 Traitement {label} : DB({db_date}) -> API({api_date})")
+        return True
+
+    async def _walk_cursors_async(self, name, client, base_url, query_params, parse_page,
+                                  to_pages, batch, start_cursor) -> int:
+        """
+        Suit les curseurs INSEE dans une tâche productrice pendant que les
+        pages reçues sont copiées en staging.
+
+        Returns:
+            int: Nombre d'appels API effectués
+        """
+        pages = asyncio.Queue(maxsize=max(1, PIPELINE_QUEUE_SIZE))
+        api_calls = 0
+        error = None
+
+        async def produce():
+            nonlocal api_calls, error
+            cursor = start_cursor
+            try:
+                while True:
+                    api_calls += 1
+                    data, next_cursor = await client.fetch_page(
+                        base_url, query_params(cursor), parse_page
+                    )
+                    if not data or not any(to_pages(data).values()):
+                        break
+
+                    await pages.put((data, next_cursor))
+
+                    # L'API renvoie le même curseur lorsque la pagination est terminée
+                    if next_cursor is None or next_cursor == cursor:
+                        break
+                    cursor = next_cursor
+            except Exception as e:
+                error = e
+            await pages.put(None)
+
+        producer = asyncio.create_task(produce())
+        success = True
+        try:
+            while (item := await pages.get()) is not None:
+                data, next_cursor = item
+                if not await batch.add_async(to_pages(data), next_cursor):
+                    print(f"❌ [{name}] Erreur lors de la mise à jour des données")
+                    success = False
+                    break
+        finally:
+            if not success:
+                producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
+
+        if isinstance(error, InseeFetchError):
+            print(f"❌ [{name}] Page non récupérée : {error}")
+            success = False
+        elif error:
+            raise error
+
+        if not success:
+            # Parcours interrompu : la fenêtre reste ouverte, reprise au dernier curseur fusionné
+            await batch.suspend_async()
+        elif not await batch.complete_async():
+            print(f"❌ [{name}] Erreur lors de la fusion")
+        return api_calls
+
+    async def process_etablissements_async(self, pool, client) -> int:
+        """Met à jour les établissements et adresses."""
+        print("\n📦 Traitement des établissements et adresses (async)")
+        if not self._window_open(self.etab_window, "établissements"):
+            return 0
+
+        db_date, api_date = self.etab_window
+        batch = AsyncStagingBatch(
+            pool, "etablissement", ["etablissement", "adresse"],
+            window=self._checkpoint_window(self.etab_window),
+            rows_merged=self.etab_start[1],
+            copy_concurrency=self.copy_concurrency
+        )
+        await asyncio.to_thread(batch.reset)
+        return await self._walk_cursors_async(
+            "etablissement", client, ETABLISSEMENT_URL,
+            lambda cursor: etablissement_query_params(cursor, db_date, api_date),
+            parse_etablissement_page, self._etablissement_pages,
+            batch, self.etab_start[0]
+        )
+
+    async def process_unitelegales_async(self, pool, client, etab_merged=None) -> int:
+        """Met à jour les unités légales (fusions après celle des établissements)."""
+        print("\n📦 Traitement des unités légales (async)")
+        if not self._window_open(self.ul_window, "unités légales"):
+            return 0
+
+        db_date, api_date = self.ul_window
+        batch = AsyncStagingBatch(
+            pool, "unitelegale", ["unitelegale"],
+            window=self._checkpoint_window(self.ul_window),
+            rows_merged=self.ul_start[1],
+            merge_after=etab_merged,
+            copy_concurrency=self.copy_concurrency
+        )
+        await asyncio.to_thread(batch.reset)
+        return await self._walk_cursors_async(
+            "unitelegale", client, UNITELEGALE_URL,
+            lambda cursor: unitelegale_query_params(cursor, db_date, api_date),
+            parse_unitelegale_page, self._unitelegale_pages,
+            batch, self.ul_start[0]
+        )
+
+    async def process_updates_async(self):
+        """Exécute un cycle de mise à jour asynchrone pour les deux collections."""
+        pool = None
+        clients = []
+        try:
+            await asyncio.to_thread(self.start_cycle)
+
+            pool = await create_async_pool(self.copy_concurrency)
+            # Un seul limiteur pour les deux flux : le quota INSEE est global
+            limiter = AsyncTokenBucket(API_CALLS_PER_MINUTE, API_BURST)
+            etab_client = AsyncInseeClient("etablissement", limiter)
+            ul_client = AsyncInseeClient("unitelegale", limiter)
+            clients = [etab_client, ul_client]
+            etab_merged = asyncio.Event()
+
+            async def run_etablissements():
+                try:
+                    return await self.process_etablissements_async(pool, etab_client)
+                finally:
+                    etab_merged.set()
+
+            async with asyncio.TaskGroup() as group:
+                etab_task = group.create_task(run_etablissements())
+                ul_task = group.create_task(
+                    self.process_unitelegales_async(pool, ul_client, etab_merged)
+                )
+
+            api_calls = etab_task.result() + ul_task.result()
+            print(f"\n📊 Nombre total d'appels API : {api_calls}")
+
+        except Exception as e:
+            self.logger.log_error("SERVICE", f"Erreur : {str(e)}")
+            raise
+        finally:
+            for client in clients:
+                client.log_request_stats()
+                await client.aclose()
+            if pool is not None:
+                await pool.close()
+            self.end_cycle()
+
+    def process_updates(self):
+        """Exécute un cycle de mise à jour sur une boucle d'événements dédiée."""
+        asyncio.run(self.process_updates_async())
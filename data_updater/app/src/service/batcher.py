@@ -0,0 +1,178 @@
+"""Accumulation des pages INSEE en staging avant fusion par lots."""
+
+import time
+
+from app.src.config.settings import DB_BATCH_SIZE, DB_FLUSH_INTERVAL
+from app.src.utils.logger import DatabaseLogger
+from app.src.database.loader import (
+    load_pages_to_staging,
+    dump_and_clear_staging,
+    merge_staging
+)
+from app.src.database.checkpoint import save_checkpoint, complete_checkpoint
+
+
+class StagingBatch:
+    """
+    Charge chaque page en staging et ne déclenche la fusion vers les tables
+    principales qu'une fois `max_rows` lignes accumulées ou `max_seconds`
+    écoulées depuis la première page en attente.
+
+    Le curseur suivant la dernière page fusionnée est enregistré dans
+    `update_checkpoint`, dans la transaction même de la fusion : après un
+    arrêt, le service reprend exactement après les données déjà fusionnées.
+
+    Les lignes d'un lot portent son identifiant (`batch_id`) : seule la
+    fusion de ce lot les lit, un reliquat éventuel en staging est ignoré.
+    """
+
+    def __init__(self, name: str, table_types, window=None, rows_merged: int = 0,
+                 max_rows: int = DB_BATCH_SIZE, max_seconds: float = DB_FLUSH_INTERVAL,
+                 merge_after=None):
+        """
+        Args:
+            name (str): Collection traitée ('etablissement' ou 'unitelegale')
+            table_types (list): Tables staging alimentées par le flux
+            window (tuple): Fenêtre de dates (db_date, api_date) du cycle
+            rows_merged (int): Lignes déjà fusionnées (reprise d'un cycle)
+            max_rows (int): Nombre de lignes déclenchant la fusion
+            max_seconds (float): Ancienneté maximale d'une page en attente
+            merge_after (threading.Event): Dépendance à lever avant toute
+                fusion ; en attendant, les pages s'accumulent en staging
+        """
+        self.name = name
+        self.table_types = list(table_types)
+        self.window = window
+        self.max_rows = max_rows
+        self.max_seconds = max_seconds
+        self.merge_after = merge_after
+        self.logger = DatabaseLogger()
+
+        self.pending_rows = 0
+        self.pending_cursor = None
+        self.checkpoint_cursor = None
+        self.merged_records = rows_merged
+        self.batch_id = time.time_ns()
+        self.load_failed = False
+        self._first_pending_at = None
+
+    def reset(self) -> bool:
+        """Vide les tables staging du flux (reliquat d'une exécution interrompue)."""
+        return all(dump_and_clear_staging(table_type) for table_type in self.table_types)
+
+    def should_flush(self) -> bool:
+        """Indique si le lot en attente doit être fusionné."""
+        if self.pending_rows == 0:
+            return False
+        if self.merge_after is not None and not self.merge_after.is_set():
+            return False
+        if self.pending_rows >= self.max_rows:
+            return True
+        return time.monotonic() - self._first_pending_at >= self.max_seconds
+
+    def add(self, pages: dict, next_cursor=None) -> bool:
+        """
+        Charge une page en staging et fusionne si le seuil est atteint.
+
+        Args:
+            pages (dict): {table_type: lignes} pour chaque table du flux
+            next_cursor (str): Curseur INSEE suivant cette page
+
+        Returns:
+            bool: False si le chargement ou la fusion a échoué
+        """
+        if not load_pages_to_staging({
+            table_type: pages.get(table_type) for table_type in self.table_types
+        }, self.batch_id):
+            # La page a pu être validée dans une table et pas dans l'autre
+            self.load_failed = True
+            return False
+
+        if self._first_pending_at is None:
+            self._first_pending_at = time.monotonic()
+        self.pending_rows += len(pages.get(self.table_types[0]) or [])
+        self.pending_cursor = next_cursor
+
+        if self.should_flush():
+            return self.flush()
+        return True
+
+    def flush(self) -> bool:
+        """
+        Fusionne le lot en attente puis vide la staging.
+
+        Returns:
+            bool: True si la fusion a réussi (ou s'il n'y avait rien à fusionner)
+        """
+        if self.pending_rows == 0:
+            return True
+
+        print(f"🔀 [{self.name}] Fusion de {self.pending_rows} lignes en attente")
+        success, records = merge_staging(
+            self.table_types, before_commit=self._write_checkpoint, batch_id=self.batch_id
+        )
+        if not success:
+            return False
+
+        records = sum(records.values())
+        self.reset()
+        self.batch_id = time.time_ns()
+        self.merged_records += records
+        self.checkpoint_cursor = self.pending_cursor
+        self.logger.log_main_operation(f"BATCH_{self.name.upper()}", records)
+        print(f"📍 [{self.name}] Point de reprise : curseur {self.checkpoint_cursor}")
+
+        self.pending_rows = 0
+        self._first_pending_at = None
+        return True
+
+    def _write_checkpoint(self, cursor, records: dict):
+        """Enregistre le curseur du lot dans la transaction de fusion."""
+        if self.window is None:
+            return
+        save_checkpoint(
+            cursor, self.name, self.window, self.pending_cursor,
+            self.merged_records + sum(records.values())
+        )
+
+    def suspend(self) -> bool:
+        """
+        Fusionne les pages déjà chargées sans clôturer la fenêtre.
+
+        Appelé lorsque le parcours des curseurs s'interrompt sur une erreur :
+        le point de reprise reste RUNNING et le cycle suivant repart de son
+        curseur au lieu d'ouvrir une nouvelle fenêtre. Après un échec de
+        chargement, le lot n'est pas fusionné : une page a pu n'être validée
+        que dans une partie des tables.
+
+        Returns:
+            bool: True si les pages chargées ont été fusionnées
+        """
+        if self.load_failed:
+            # Lot abandonné : ses lignes sont effacées, les pages seront relues
+            # depuis le dernier point de reprise
+            print(f"🗑️ [{self.name}] Lot abandonné après un échec de chargement")
+            self.reset()
+            return False
+        if self.merge_after is not None and not self.merge_after.is_set():
+            self.merge_after.wait()
+        return self.flush()
+
+    def complete(self) -> bool:
+        """
+        Fusionne le dernier lot puis clôture la fenêtre du cycle.
+
+        À n'appeler qu'après la fin réelle du flux (page vide ou curseur
+        inchangé), jamais après une page en erreur.
+
+        Returns:
+            bool: True si la collection est entièrement à jour
+        """
+        if self.merge_after is not None and not self.merge_after.is_set():
+            print(f"⏳ [{self.name}] Attente de la fusion des dépendances")
+            self.merge_after.wait()
+        if not self.flush():
+            return False
+        if self.window is None:
+            return True
+        return complete_checkpoint(self.name, self.window, self.merged_records)
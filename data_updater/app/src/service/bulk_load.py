@@ -0,0 +1,174 @@
+"""Service de chargement initial des fichiers stock INSEE."""
+
+import time
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from app.src.config.settings import STOCK_DIR, BULK_LOAD_WORKERS, BULK_CHUNK_SIZE, BULK_STREAM
+from app.src.utils.logger import DatabaseLogger
+from app.src.database.stock_loader import (
+    STOCK_SOURCES,
+    extract_stock_file,
+    open_stock_stream,
+    parse_header,
+    read_header,
+    plan_chunks,
+    stream_blocks,
+    copy_chunk,
+    copy_block,
+    publish_stock_table
+)
+from app.src.database.schema import (
+    ensure_schema,
+    drop_secondary_indexes,
+    build_indexes,
+    analyze_tables
+)
+
+
+def _collect(future, copied) -> bool:
+    """Ajoute les lignes copiées par une tâche au total de la source."""
+    success, rows = future.result()
+    for table_type, count in rows.items():
+        copied[table_type] += count
+    return success
+
+
+def _copy_extracted(executor, source_name, stock_dir, chunk_size, batch_id, copied) -> bool:
+    """Extrait le CSV sur disque puis en copie les plages en parallèle."""
+    source = STOCK_SOURCES[source_name]
+    path = extract_stock_file(stock_dir, source_name)
+    header, data_start = read_header(path, source['delimiter'])
+    chunks = plan_chunks(path, data_start, chunk_size)
+    print(f"🚚 {source_name} : {len(chunks)} plages à copier")
+
+    futures = [
+        executor.submit(copy_chunk, source_name, path, start, end, header, batch_id)
+        for start, end in chunks
+    ]
+    return all([_collect(future, copied) for future in futures])
+
+
+def _copy_streamed(executor, workers, source_name, stock_dir, chunk_size, batch_id, copied) -> bool:
+    """
+    Décompresse l'archive en flux et répartit les blocs de lignes entre
+    les processus, sans écrire le CSV sur disque.
+
+    Au plus deux blocs par processus sont en attente : la lecture de
+    l'archive suit le rythme des COPY.
+    """
+    source = STOCK_SOURCES[source_name]
+    pending = deque()
+    success = True
+    blocks = 0
+
+    with open_stock_stream(stock_dir, source_name) as stream:
+        header = parse_header(stream.readline(), source['delimiter'])
+        for lines in stream_blocks(stream, chunk_size):
+            if len(pending) >= 2 * max(1, workers):
+                success = _collect(pending.popleft(), copied) and success
+            pending.append(executor.submit(copy_block, source_name, lines, header, batch_id))
+            blocks += 1
+
+    while pending:
+        success = _collect(pending.popleft(), copied) and success
+    print(f"🚚 {source_name} : {blocks} blocs copiés en flux")
+    return success
+
+
+def load_stock_source(executor, source_name, stock_dir, chunk_size, batch_id,
+                      stream=BULK_STREAM, workers=BULK_LOAD_WORKERS) -> bool:
+    """
+    Charge un fichier stock : COPY parallèles en staging, puis publication.
+
+    Args:
+        executor (ProcessPoolExecutor): Processus de travail
+        source_name (str): Fichier stock (clé de `STOCK_SOURCES`)
+        stock_dir (str): Dossier des archives
+        chunk_size (int): Taille des plages ou blocs copiés par processus (octets)
+        batch_id (int): Lot de staging du chargement
+        stream (bool): Lit l'archive en flux au lieu d'extraire le CSV
+        workers (int): Nombre de processus de copie
+
+    Returns:
+        bool: True si toutes les tables de la source ont été chargées
+    """
+    source = STOCK_SOURCES[source_name]
+    started = time.monotonic()
+    copied = {table_type: 0 for table_type in source['tables']}
+
+    if stream:
+        success = _copy_streamed(
+            executor, workers, source_name, stock_dir, chunk_size, batch_id, copied
+        )
+    else:
+        success = _copy_extracted(executor, source_name, stock_dir, chunk_size, batch_id, copied)
+
+    if not success:
+        print(f"❌ {source_name} : échec de la copie en staging")
+        return False
+
+    for table_type in source['tables']:
+        print(f"🗄️ {table_type} : {copied[table_type]} lignes en staging")
+        if not publish_stock_table(table_type, batch_id)[0]:
+            return False
+
+    print(f"⏱️ {source_name} chargé en {time.monotonic() - started:.0f}s")
+    return True
+
+
+def bulk_load(stock_dir=STOCK_DIR, sources=None, workers=BULK_LOAD_WORKERS,
+              chunk_size=BULK_CHUNK_SIZE, stream=BULK_STREAM) -> bool:
+    """
+    Charge les fichiers stock INSEE dans PostgreSQL.
+
+    Chaque fichier est découpé en plages copiées en parallèle (un processus
+    et une connexion par plage) dans les tables staging UNLOGGED ; les
+    tables principales sont ensuite remplacées en une requête chacune. Les
+    index secondaires des tables chargées sont supprimés au préalable puis
+    reconstruits (en parallèle, sans bloquer les lectures) et les
+    statistiques mises à jour une fois le chargement terminé.
+
+    En mode flux, les archives ne sont jamais extraites : le processus
+    principal les décompresse et distribue des blocs de lignes, filtrés puis
+    copiés par les processus de travail.
+
+    Args:
+        stock_dir (str): Dossier des archives ZIP et CSV de référence
+        sources (list): Fichiers stock à charger (tous par défaut)
+        workers (int): Nombre de processus de copie
+        chunk_size (int): Taille des plages ou blocs copiés par processus (octets)
+        stream (bool): Lit les archives en flux au lieu d'extraire les CSV
+
+    Returns:
+        bool: True si tous les fichiers ont été chargés
+    """
+    logger = DatabaseLogger()
+    sources = list(sources or STOCK_SOURCES)
+    print(f"🚀 Chargement stock ({', '.join(sources)}) avec {workers} processus")
+
+    tables = [table_type for name in sources for table_type in STOCK_SOURCES[name]['tables']]
+    if not ensure_schema(with_indexes=False) or not drop_secondary_indexes(tables):
+        return False
+
+    batch_id = time.time_ns()
+    success = True
+    # spawn : chaque processus crée son propre pool, sans hériter des connexions
+    with ProcessPoolExecutor(
+        max_workers=max(1, workers),
+        mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        for source_name in sources:
+            try:
+                if not load_stock_source(
+                    executor, source_name, stock_dir, chunk_size, batch_id, stream, workers
+                ):
+                    success = False
+            except OSError as e:
+                logger.log_error(f"STOCK_{source_name.upper()}", str(e))
+                print(f"❌ {source_name} : {e}")
+                success = False
+
+    indexed = build_indexes(tables)
+    return analyze_tables(tables) and indexed and success
@@ -0,0 +1,121 @@
+"""Pipeline producteur/consommateur pour la pagination par curseur INSEE."""
+
+import queue
+import threading
+
+from app.src.config.settings import PIPELINE_QUEUE_SIZE
+from app.src.api.base_client import InseeFetchError
+
+# Marqueur de fin de flux déposé par le producteur
+_END_OF_STREAM = object()
+
+
+class CursorPipeline:
+    """
+    Parcourt une chaîne de curseurs INSEE dans un thread producteur pendant
+    que le thread appelant charge les pages déjà récupérées.
+
+    Les appels réseau et les opérations PostgreSQL se recouvrent au lieu
+    d'alterner ; la file bornée limite le nombre de pages en mémoire. Le débit
+    des appels est réglé par le limiteur partagé (voir `api.retry.insee_get`).
+    """
+
+    def __init__(self, fetch_page, consume_page,
+                 queue_size: int = PIPELINE_QUEUE_SIZE, name: str = "pipeline",
+                 start_cursor: str = "*"):
+        """
+        Args:
+            fetch_page (callable): cursor -> (données, curseur suivant)
+            consume_page (callable): (données, curseur suivant) -> bool
+                (False pour interrompre)
+            queue_size (int): Nombre maximal de pages en attente
+            name (str): Nom du pipeline (pour les logs)
+            start_cursor (str): Curseur de départ ('*' ou point de reprise)
+        """
+        self.fetch_page = fetch_page
+        self.consume_page = consume_page
+        self.name = name
+        self.start_cursor = start_cursor
+        self.api_calls = 0
+        self.failed = False
+
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._stop = threading.Event()
+        self._error = None
+
+    def _put(self, item) -> bool:
+        """Dépose un élément dans la file tant que le pipeline n'est pas arrêté."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        """Suit les curseurs successifs et dépose chaque page dans la file."""
+        cursor = self.start_cursor
+        try:
+            while not self._stop.is_set():
+                self.api_calls += 1
+                try:
+                    data, next_cursor = self.fetch_page(cursor)
+                except InseeFetchError as e:
+                    # Page en erreur : le flux n'est pas terminé, la fenêtre reste ouverte
+                    print(f"❌ [{self.name}] Page non récupérée : {e}")
+                    self.failed = True
+                    break
+
+                if not data:
+                    break
+
+                if not self._put((data, next_cursor)):
+                    break
+
+                # L'API renvoie le même curseur lorsque la pagination est terminée
+                if next_cursor is None or next_cursor == cursor:
+                    break
+                cursor = next_cursor
+        except Exception as e:
+            self._error = e
+        finally:
+            self._put(_END_OF_STREAM)
+
+    def run(self) -> int:
+        """
+        Exécute le pipeline jusqu'à épuisement des curseurs.
+
+        Returns:
+            int: Nombre de pages consommées
+
+        Raises:
+            Exception: L'erreur éventuellement levée par le producteur
+        """
+        producer = threading.Thread(
+            target=self._produce, name=f"{self.name}-producer", daemon=True
+        )
+        producer.start()
+
+        pages = 0
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _END_OF_STREAM:
+                    break
+
+                data, next_cursor = item
+                if not self.consume_page(data, next_cursor):
+                    self.failed = True
+                    print(f"❌ [{self.name}] Arrêt du pipeline après une erreur de chargement")
+                    break
+                pages += 1
+        finally:
+            self._stop.set()
+            producer.join()
+
+        if self._error:
+            raise self._error
+
+        print(f"📬 [{self.name}] {pages} pages traitées ({self.api_calls} appels API)")
+        return pages
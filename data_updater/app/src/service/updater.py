@@ -1,129 +1,295 @@
 """Service principal de mise à jour des établissements et unités légales."""
 
 import time
+import threading
 import requests
 import psycopg2
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-from app.src.config.settings import UPDATE_INTERVAL
+from app.src.config.settings import UPDATE_INTERVAL, PIPELINE_MODE, PARALLEL_STREAMS
 from app.src.utils.logger import DatabaseLogger
 from app.src.api.siret import fetch_etablissement_data
 from app.src.api.siren import fetch_unitelegale_data
-from app.src.database.loader import (
-    load_data_to_staging,
-    update_from_staging,
-    dump_and_clear_staging
+from app.src.api.last_treatment import (
+    fetch_last_treatment_date_siret_api,
+    clear_last_treatment_cache
 )
+from app.src.database.connection import DatabaseConnectionPool
+from app.src.database.checkpoint import load_checkpoint, STATUS_RUNNING
+from app.src.database.schema import ensure_schema, apply_log_retention
+from app.src.service.batcher import StagingBatch
+from app.src.service.pipeline import CursorPipeline
 
-from app.src.api.base_client import BaseInseeClient
+from app.src.api.base_client import BaseInseeClient, InseeFetchError
 
 class UpdateService:
     """Service de mise à jour des établissements et unités légales."""
 
-    def __init__(self):
+    def __init__(self, pipelined=PIPELINE_MODE):
         self.logger = DatabaseLogger()
+        self.pipelined = pipelined
         # Initialiser les clients à None
         self.etab_client = None
         self.ul_client = None
+        # Fenêtres de dates (db_date, api_date) fixées en début de cycle
+        self.etab_window = (None, None)
+        self.ul_window = (None, None)
+        # Points de départ (curseur, lignes déjà fusionnées) de chaque flux
+        self.etab_start = ("*", 0)
+        self.ul_start = ("*", 0)
 
     def init_clients(self):
         """Initialise les clients INSEE."""
         self.etab_client = BaseInseeClient("etablissement", "Établissements")
         self.ul_client = BaseInseeClient("unitelegale", "Unités Légales")
 
+    def start_cycle(self):
+        """
+        Prépare un cycle : clients, puis fenêtres de dates DB -> API.
+
+        La date /informations est interrogée une seule fois par collection
+        et réutilisée pour toutes les pages du cycle. Un cycle interrompu
+        reprend sa fenêtre et son curseur depuis `update_checkpoint`.
+        Le schéma n'est complété qu'ici, jamais pendant les fusions.
+        """
+        ensure_schema()
+        apply_log_retention()
+        self.init_clients()
+        clear_last_treatment_cache()
+
+        self.etab_window, self.etab_start = self._resume_or_open(
+            "etablissement", "Établissements", self.etab_client
+        )
+        self.ul_window, self.ul_start = self._resume_or_open(
+            "unitelegale", "Unités Légales", self.ul_client
+        )
+
+    @staticmethod
+    def _resume_or_open(collection, collection_type, client):
+        """
+        Reprend la fenêtre d'un cycle interrompu ou en ouvre une nouvelle.
+
+        Args:
+            collection (str): 'etablissement' ou 'unitelegale'
+            collection_type (str): Libellé /informations de la collection
+            client (BaseInseeClient): Client INSEE de la collection
+
+        Returns:
+            tuple: ((db_date, api_date), (curseur de départ, lignes déjà fusionnées))
+        """
+        checkpoint = load_checkpoint(collection)
+        if checkpoint and checkpoint['status'] == STATUS_RUNNING and checkpoint['cursor_value']:
+            print(
+                f"⏯️ Reprise {collection_type} : fenêtre {checkpoint['window_start']} -> "
+                f"{checkpoint['window_end']}, curseur {checkpoint['cursor_value']}"
+            )
+            window = (checkpoint['window_start'], checkpoint['window_end'])
+            return window, (checkpoint['cursor_value'], checkpoint['rows_merged'] or 0)
+
+        window = (
+            client.get_initial_db_date(),
+            fetch_last_treatment_date_siret_api(collection_type, client=client)
+        )
+        return window, ("*", 0)
+
+    def end_cycle(self):
+        """Exporte les temps de requête et l'usage du pool, puis ferme les sessions HTTP."""
+        for client in (self.etab_client, self.ul_client):
+            if client is not None:
+                client.log_request_stats()
+                client.close()
+        try:
+            self.logger.log_pool_metrics(DatabaseConnectionPool().metrics())
+        except psycopg2.Error as e:
+            self.logger.log_error("POOL", str(e))
+
+    @staticmethod
+    def _checkpoint_window(window):
+        """Fenêtre à enregistrer, None si l'une des dates est inconnue."""
+        return window if all(window) else None
+
+    def _etablissement_batch(self):
+        """Crée le lot d'accumulation établissements + adresses."""
+        batch = StagingBatch(
+            "etablissement", ["etablissement", "adresse"],
+            window=self._checkpoint_window(self.etab_window),
+            rows_merged=self.etab_start[1]
+        )
+        # Les lignes non fusionnées seront relues depuis le point de reprise
+        batch.reset()
+        return batch
+
+    def _unitelegale_batch(self, merge_after=None):
+        """Crée le lot d'accumulation des unités légales."""
+        batch = StagingBatch(
+            "unitelegale", ["unitelegale"],
+            window=self._checkpoint_window(self.ul_window),
+            rows_merged=self.ul_start[1],
+            merge_after=merge_after
+        )
+        batch.reset()
+        return batch
+
+    @staticmethod
+    def _etablissement_pages(data_tuple):
+        """Associe les lignes d'une page établissements à leurs tables staging."""
+        etab_data, adresse_data = data_tuple
+        return {"etablissement": etab_data, "adresse": adresse_data}
+
+    @staticmethod
+    def _unitelegale_pages(ul_data):
+        """Associe les lignes d'une page unités légales à leur table staging."""
+        return {"unitelegale": ul_data}
+
+    @staticmethod
+    def _walk_cursors(name, fetch_page, to_pages, batch, start_cursor):
+        """
+        Suit les curseurs INSEE page par page et charge chaque page en staging.
+
+        Returns:
+            tuple: (success: bool, api_calls: int) ; success est False si une
+            page n'a pas pu être récupérée ou chargée
+        """
+        cursor_value = start_cursor
+        api_calls = 0
+
+        while cursor_value is not None:
+            api_calls += 1
+            try:
+                data, next_cursor = fetch_page(cursor_value)
+            except InseeFetchError as e:
+                print(f"❌ [{name}] Page non récupérée : {e}")
+                return (False, api_calls)
+
+            if not data or not any(to_pages(data).values()):
+                print(f"ℹ️ [{name}] Plus de données à traiter")
+                break
+
+            if not batch.add(to_pages(data), next_cursor):
+                print(f"❌ [{name}] Erreur lors de la mise à jour des données")
+                return (False, api_calls)
+
+            # L'API renvoie le même curseur lorsque la pagination est terminée
+            if next_cursor == cursor_value:
+                break
+            cursor_value = next_cursor
+
+        return (True, api_calls)
+
+    def _run_stream(self, name, fetch_page, to_pages, batch, start_cursor):
+        """
+        Parcourt une collection INSEE (en pipeline ou page par page) puis
+        fusionne son dernier lot.
+
+        Returns:
+            int: Nombre d'appels API effectués
+        """
+        if self.pipelined:
+            pipeline = CursorPipeline(
+                fetch_page=fetch_page,
+                consume_page=lambda data, next_cursor: batch.add(to_pages(data), next_cursor),
+                name=name,
+                start_cursor=start_cursor
+            )
+            pipeline.run()
+            success, api_calls = not pipeline.failed, pipeline.api_calls
+        else:
+            success, api_calls = self._walk_cursors(
+                name, fetch_page, to_pages, batch, start_cursor
+            )
+
+        if not success:
+            # Parcours interrompu : la fenêtre reste ouverte, reprise au dernier curseur fusionné
+            batch.suspend()
+        elif not batch.complete():
+            print(f"❌ [{name}] Erreur lors de la fusion")
+        return api_calls
+
+    def process_etablissements(self):
+        """
+        Met à jour les établissements et adresses.
+
+        Returns:
+            int: Nombre d'appels API effectués
+        """
+        print("\n📦 Traitement des établissements et adresses")
+        db_date, api_date = self.etab_window
+        return self._run_stream(
+            "etablissement",
+            lambda cursor: fetch_etablissement_data(
+                cursor, client=self.etab_client, db_date=db_date, api_date=api_date
+            ),
+            self._etablissement_pages,
+            self._etablissement_batch(),
+            self.etab_start[0]
+        )
+
+    def process_unitelegales(self, etab_merged=None):
+        """
+        Met à jour les unités légales.
+
+        Args:
+            etab_merged (threading.Event): Levé une fois les établissements
+                fusionnés ; les fusions d'unités légales l'attendent
+
+        Returns:
+            int: Nombre d'appels API effectués
+        """
+        print("\n📦 Traitement des unités légales")
+        db_date, api_date = self.ul_window
+        return self._run_stream(
+            "unitelegale",
+            lambda cursor: fetch_unitelegale_data(
+                cursor, client=self.ul_client, db_date=db_date, api_date=api_date
+            ),
+            self._unitelegale_pages,
+            self._unitelegale_batch(merge_after=etab_merged),
+            self.ul_start[0]
+        )
+
+    def process_streams_parallel(self):
+        """
+        Parcourt les deux collections en parallèle.
+
+        Les appels des deux flux se partagent le limiteur global ; seule la
+        fusion des unités légales, qui ne retient que celles rattachées à un
+        établissement, attend la fin du flux établissements.
+
+        Returns:
+            int: Nombre d'appels API effectués
+        """
+        etab_merged = threading.Event()
+
+        def run_etablissements():
+            try:
+                return self.process_etablissements()
+            finally:
+                etab_merged.set()
+
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="stream") as executor:
+            etab_future = executor.submit(run_etablissements)
+            ul_future = executor.submit(self.process_unitelegales, etab_merged)
+            return etab_future.result() + ul_future.result()
+
     def process_updates(self):
         """Exécute un cycle de mise à jour pour les deux types de données."""
         try:
-            self.init_clients()
-            api_calls = 0
-
-            # 2. Mise à jour des établissements et adresses
-            print("\n📦 Traitement des établissements et adresses")
-            cursor_value = "*"
-            cursor_suivant = ""
-            initial_db_date = self.etab_client.get_initial_db_date()
-
-            while cursor_value != cursor_suivant and cursor_value is not None:
-                api_calls += 1
-                data_tuple, next_cursor = fetch_etablissement_data(
-                    cursor_value, 
-                    client=self.etab_client,
-                    db_date=initial_db_date
-                )
-            
-                if not data_tuple or (not data_tuple[0] and not data_tuple[1]):
-                    print("ℹ️ Plus de données à traiter")
-                    break
-
-                etab_data, adresse_data = data_tuple
-                if etab_data and adresse_data:
-                    success_etab = load_data_to_staging(etab_data, "etablissement")
-                    success_addr = load_data_to_staging(adresse_data, "adresse")
-                    
-                    if success_etab and success_addr:
-                        success_etab, records_etab = update_from_staging("etablissement")
-                        success_addr, records_addr = update_from_staging("adresse")
-                        
-                        if success_etab and success_addr:
-                            print(f"✅ Établissements traités : {records_etab} enregistrements")
-                            print(f"✅ Adresses traitées : {records_addr} enregistrements")
-                            
-                            # Si aucune donnée n'a été traitée, on sort de la boucle
-                            if records_etab == 0 and records_addr == 0:
-                                print("ℹ️ Plus de nouvelles données à traiter")
-                                break
-                            
-                            # Vider les tables staging après traitement réussi
-                            dump_and_clear_staging("etablissement")
-                            dump_and_clear_staging("adresse")
-                    else:
-                        print("❌ Erreur lors de la mise à jour des données")
-                        break
-
-                cursor_value = next_cursor
-                time.sleep(4)
-                
-            # 1. Mise à jour des unités légales
-            print("\n📦 Traitement des unités légales")
-            cursor_value = "*"
-            cursor_suivant = ""
-            initial_db_date = self.ul_client.get_initial_db_date()
-
-            while cursor_value != cursor_suivant and cursor_value is not None:
-                api_calls += 1
-                ul_data, next_cursor = fetch_unitelegale_data(
-                    cursor_value, 
-                    client=self.ul_client,
-                    db_date=initial_db_date
-                )
-            
-                if not ul_data:
-                    print("ℹ️ Plus de données à traiter")
-                    break
-
-                success = load_data_to_staging(ul_data, "unitelegale")
-                if success:
-                    success, records = update_from_staging("unitelegale")
-                    if success:
-                        print(f"✅ Unités légales traitées : {records} enregistrements")
-                        
-                        if records == 0:
-                            print("ℹ️ Plus de nouvelles données à traiter")
-                            break
-                            
-                        # Dump et vide la table staging
-                        dump_and_clear_staging("unitelegale")
-
-                cursor_value = next_cursor
-                time.sleep(4)
-
-            
+            self.start_cycle()
+
+            if PARALLEL_STREAMS:
+                api_calls = self.process_streams_parallel()
+            else:
+                api_calls = self.process_etablissements()
+                api_calls += self.process_unitelegales()
 
             print(f"\n📊 Nombre total d'appels API : {api_calls}")
-                
+
         except Exception as e:
             self.logger.log_error("SERVICE", f"Erreur : {str(e)}")
             raise
+        finally:
+            self.end_cycle()
 
     def run(self):
         """Démarre le service"""
@@ -136,4 +302,4 @@ class UpdateService:
             print("\n🛑 Arrêt du service")
         except (requests.RequestException, psycopg2.Error) as e:
             self.logger.log_error("SERVICE", f"Erreur critique: {str(e)}")
-            time.sleep(60)  # Attendre avant de réessayer 
+            time.sleep(60)  # Attendre avant de réessayer
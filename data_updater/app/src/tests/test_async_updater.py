@@ -0,0 +1,70 @@
+"""Tests du mode de mise à jour asynchrone."""
+
+import asyncio
+from unittest.mock import patch, Mock
+
+import pytest
+
+from app.src.api.rate_limiter import AsyncTokenBucket
+from datetime import date
+
+from app.src.database.async_loader import typed_record
+from app.src.service.async_updater import AsyncStagingBatch
+
+
+@pytest.fixture
+def staging():
+    """Neutralise les accès PostgreSQL du lot asynchrone."""
+    with patch('app.src.service.async_updater.copy_records_to_staging') as copy, \
+         patch('app.src.service.batcher.dump_and_clear_staging', return_value=True), \
+         patch('app.src.service.batcher.merge_staging') as merge, \
+         patch('app.src.service.batcher.DatabaseLogger'):
+        yield copy, merge
+
+
+def test_async_token_bucket_burst():
+    """Le seau asynchrone délivre sa capacité puis refuse sans attente."""
+    async def scenario():
+        bucket = AsyncTokenBucket(calls_per_minute=60, burst=2)
+        return [await bucket.acquire(timeout=0) for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [True, True, False]
+
+
+def test_typed_record_converts_to_column_types():
+    """Les valeurs vides deviennent NULL, les autres prennent le type de la colonne."""
+    types = ['character varying', 'date', 'boolean', 'date', 'boolean']
+    assert typed_record(("123", "2024-01-02", "true", "", None), types) == (
+        "123", date(2024, 1, 2), True, None, None
+    )
+
+
+def test_flush_waits_for_pending_copies(staging):
+    """La fusion n'a lieu qu'une fois toutes les pages copiées en staging."""
+    copy, merge = staging
+    copied = []
+
+    async def slow_copy(pool, rows, table_type, batch_id):
+        await asyncio.sleep(0.01)
+        copied.extend(rows)
+        return True
+
+    def check_merge(table_types, before_commit=None, batch_id=0):
+        assert copied == [("1",), ("2",)]
+        return (True, {"unitelegale": 2})
+
+    copy.side_effect = slow_copy
+    merge.side_effect = check_merge
+
+    async def scenario():
+        batch = AsyncStagingBatch(
+            Mock(), "unitelegale", ["unitelegale"], copy_concurrency=2
+        )
+        batch.max_rows = 2
+        assert await batch.add_async({"unitelegale": [("1",)]}, "c1")
+        assert await batch.add_async({"unitelegale": [("2",)]}, "c2")
+        return batch
+
+    batch = asyncio.run(scenario())
+    merge.assert_called_once()
+    assert batch.checkpoint_cursor == "c2"
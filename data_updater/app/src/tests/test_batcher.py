@@ -0,0 +1,151 @@
+"""Tests de l'accumulation des pages en staging."""
+
+import threading
+from unittest.mock import patch, Mock
+
+import pytest
+
+from app.src.api.base_client import InseeFetchError
+from app.src.service.batcher import StagingBatch
+from app.src.service.updater import UpdateService
+
+
+@pytest.fixture
+def staging():
+    """Simule le chargement et le vidage de la staging."""
+    with patch('app.src.service.batcher.load_pages_to_staging', return_value=True), \
+         patch('app.src.service.batcher.dump_and_clear_staging', return_value=True), \
+         patch('app.src.service.batcher.merge_staging') as merge, \
+         patch('app.src.service.batcher.DatabaseLogger'):
+        yield merge
+
+
+def test_merge_once_per_batch(staging):
+    """La fusion n'a lieu qu'une fois le seuil de lignes atteint."""
+    merge = staging
+    merge.return_value = (True, {"unitelegale": 4})
+    batch = StagingBatch("unitelegale", ["unitelegale"], max_rows=4, max_seconds=3600)
+
+    assert batch.add({"unitelegale": [("1",), ("2",)]}, "c1")
+    merge.assert_not_called()
+
+    assert batch.add({"unitelegale": [("3",), ("4",)]}, "c2")
+    merge.assert_called_once()
+    assert batch.checkpoint_cursor == "c2"
+    assert batch.pending_rows == 0
+
+
+def test_flush_merges_remaining_rows(staging):
+    """Le dernier lot partiel est fusionné par flush()."""
+    merge = staging
+    merge.return_value = (True, {"unitelegale": 1})
+    batch = StagingBatch("unitelegale", ["unitelegale"], max_rows=1000, max_seconds=3600)
+
+    batch.add({"unitelegale": [("1",)]}, "c1")
+    assert batch.flush()
+    merge.assert_called_once()
+    assert batch.merged_records == 1
+
+
+def test_failed_merge_keeps_checkpoint(staging):
+    """Un échec de fusion ne fait pas avancer le point de reprise."""
+    staging.return_value = (False, {})
+    batch = StagingBatch("unitelegale", ["unitelegale"], max_rows=1, max_seconds=3600)
+
+    assert not batch.add({"unitelegale": [("1",)]}, "c1")
+    assert batch.checkpoint_cursor is None
+
+
+def test_checkpoint_written_in_merge_transaction(staging):
+    """Le curseur est enregistré via le hook appelé avant le commit."""
+    def fake_merge(table_types, before_commit=None, batch_id=0):
+        before_commit(cursor, {"unitelegale": 2})
+        return (True, {"unitelegale": 2})
+
+    cursor = Mock()
+    staging.side_effect = fake_merge
+    batch = StagingBatch(
+        "unitelegale", ["unitelegale"], window=("2025-02-20", "2025-02-26"),
+        max_rows=2, max_seconds=3600
+    )
+
+    with patch('app.src.service.batcher.save_checkpoint') as save:
+        assert batch.add({"unitelegale": [("1",), ("2",)]}, "c1")
+
+    save.assert_called_once_with(cursor, "unitelegale", ("2025-02-20", "2025-02-26"), "c1", 2)
+
+
+def test_merge_waits_for_dependency(staging):
+    """Tant que la dépendance n'est pas levée, les pages restent en staging."""
+    staging.return_value = (True, {"unitelegale": 2})
+    etab_merged = threading.Event()
+    batch = StagingBatch(
+        "unitelegale", ["unitelegale"], max_rows=1, max_seconds=3600,
+        merge_after=etab_merged
+    )
+
+    assert batch.add({"unitelegale": [("1",), ("2",)]}, "c1")
+    staging.assert_not_called()
+    assert batch.pending_rows == 2
+
+    etab_merged.set()
+    assert batch.complete()
+    staging.assert_called_once()
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_fetch_error_keeps_window_running(staging, pipelined):
+    """Une page en erreur au milieu du flux ne clôture pas la fenêtre."""
+    def fake_merge(table_types, before_commit=None, batch_id=0):
+        before_commit(cursor, {"unitelegale": 1})
+        return (True, {"unitelegale": 1})
+
+    def fetch_page(cursor_value):
+        if cursor_value == "*":
+            return [("1",)], "c1"
+        raise InseeFetchError("statut 500")
+
+    cursor = Mock()
+    staging.side_effect = fake_merge
+    window = ("2025-02-20", "2025-02-26")
+    batch = StagingBatch("unitelegale", ["unitelegale"], window=window, max_rows=1000, max_seconds=3600)
+    with patch('app.src.service.updater.DatabaseLogger'):
+        service = UpdateService(pipelined=pipelined)
+
+    with patch('app.src.service.batcher.save_checkpoint') as save, \
+         patch('app.src.service.batcher.complete_checkpoint') as complete:
+        service._run_stream("unitelegale", fetch_page, service._unitelegale_pages, batch, "*")
+
+    # La page chargée est fusionnée et son curseur enregistré, statut RUNNING par défaut
+    save.assert_called_once_with(cursor, "unitelegale", window, "c1", 1)
+    complete.assert_not_called()
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_end_of_stream_completes_window(staging, pipelined):
+    """Une page vide termine le flux et clôture la fenêtre."""
+    staging.return_value = (True, {"unitelegale": 1})
+    pages = {"*": ([("1",)], "c1"), "c1": ([], "c2")}
+    window = ("2025-02-20", "2025-02-26")
+    batch = StagingBatch("unitelegale", ["unitelegale"], window=window, max_rows=1000, max_seconds=3600)
+    with patch('app.src.service.updater.DatabaseLogger'):
+        service = UpdateService(pipelined=pipelined)
+
+    with patch('app.src.service.batcher.complete_checkpoint', return_value=True) as complete:
+        service._run_stream("unitelegale", pages.__getitem__, service._unitelegale_pages, batch, "*")
+
+    complete.assert_called_once_with("unitelegale", window, 1)
+
+
+def test_failed_load_discards_the_batch(staging):
+    """Après un échec de chargement, le lot est effacé sans être fusionné."""
+    with patch('app.src.service.batcher.load_pages_to_staging', side_effect=[True, False]), \
+         patch('app.src.service.batcher.dump_and_clear_staging', return_value=True) as clear:
+        batch = StagingBatch("etablissement", ["etablissement", "adresse"], max_rows=1000, max_seconds=3600)
+        assert batch.add({"etablissement": [("1",)], "adresse": [("1",)]}, "c1")
+        assert not batch.add({"etablissement": [("2",)], "adresse": [("2",)]}, "c2")
+
+        assert not batch.suspend()
+
+    staging.assert_not_called()
+    assert clear.call_count == 2
@@ -0,0 +1,101 @@
+"""Tests du pool de connexions PostgreSQL."""
+
+from unittest.mock import patch, Mock
+
+import pytest
+from psycopg2.pool import PoolError
+
+from app.src.database.connection import DatabaseConnectionPool
+
+
+def make_connection(closed=0):
+    """Crée une fausse connexion psycopg2."""
+    conn = Mock()
+    conn.closed = closed
+    conn.info.transaction_status = 0
+    conn.cursor.return_value.__enter__ = Mock(return_value=Mock())
+    conn.cursor.return_value.__exit__ = Mock(return_value=None)
+    return conn
+
+
+@pytest.fixture
+def pool():
+    """Pool de test sur un ThreadedConnectionPool simulé."""
+    DatabaseConnectionPool._instance = None
+    with patch('app.src.database.connection.ThreadedConnectionPool') as threaded, \
+         patch('app.src.database.connection.DB_POOL_MAX', 1), \
+         patch('app.src.database.connection.DB_POOL_WAIT_TIMEOUT', 0):
+        threaded.return_value._pool = []
+        threaded.return_value.closed = False
+        db_pool = DatabaseConnectionPool()
+        yield db_pool, threaded.return_value
+    DatabaseConnectionPool._instance = None
+
+
+def test_closed_connection_is_recycled(pool):
+    """Une connexion fermée est remplacée à l'emprunt."""
+    db_pool, threaded = pool
+    broken, healthy = make_connection(closed=1), make_connection()
+    threaded.getconn.side_effect = [broken, healthy]
+
+    with db_pool.get_connection() as conn:
+        assert conn is healthy
+        assert db_pool.pool_status == (1, 1)
+
+    threaded.putconn.assert_any_call(broken, close=True)
+    assert db_pool.metrics()['recycled'] == 1
+    assert db_pool.pool_status == (0, 1)
+
+
+def test_exhausted_pool_times_out(pool):
+    """Au-delà de DB_POOL_MAX, l'emprunt échoue après le délai d'attente."""
+    db_pool, threaded = pool
+    threaded.getconn.return_value = make_connection()
+
+    with db_pool.get_connection():
+        with pytest.raises(PoolError):
+            with db_pool.get_connection():
+                pass
+
+
+@pytest.fixture
+def real_pool():
+    """Pool de test sur un vrai ThreadedConnectionPool aux connexions simulées."""
+    DatabaseConnectionPool._instance = None
+    with patch('psycopg2.pool.psycopg2.connect', side_effect=lambda *a, **k: make_connection()) as connect, \
+         patch('app.src.database.connection.DB_POOL_MIN', 1), \
+         patch('app.src.database.connection.DB_POOL_MAX', 3):
+        yield DatabaseConnectionPool(), connect
+    DatabaseConnectionPool._instance = None
+
+
+def test_connection_returned_above_minconn_is_reused(real_pool):
+    """Les connexions rendues au-delà de DB_POOL_MIN restent ouvertes pour les emprunts suivants."""
+    db_pool, connect = real_pool
+
+    with db_pool.get_connection() as first, db_pool.get_connection() as second:
+        pass
+    with db_pool.get_connection() as again, db_pool.get_connection() as again_too:
+        reused = {again, again_too}
+
+    assert reused == {first, second}
+    assert connect.call_count == 2
+    assert not first.close.called and not second.close.called
+    assert db_pool.metrics()['idle'] == 2
+
+
+def test_idle_connections_above_minconn_are_closed_after_timeout(real_pool):
+    """Au-delà de DB_POOL_MIN, une connexion libre trop ancienne est fermée et oubliée."""
+    db_pool, _ = real_pool
+    with db_pool.get_connection(), db_pool.get_connection():
+        pass
+    oldest = db_pool._pool._pool[0]
+    db_pool._returned_at[id(oldest)] -= db_pool.idle_timeout + 1
+
+    with db_pool.get_connection() as conn:
+        assert conn is not oldest
+
+    oldest.close.assert_called_once()
+    assert db_pool._pool._pool == [conn]
+    assert id(oldest) not in db_pool._returned_at
+    assert db_pool.metrics()['recycled'] == 1
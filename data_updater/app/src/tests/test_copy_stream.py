@@ -0,0 +1,36 @@
+"""Tests de la sérialisation COPY des enregistrements INSEE."""
+
+from app.src.database.copy_stream import CopyRowStream, format_copy_row
+
+
+def test_format_copy_row_escapes_and_nulls():
+    """Les valeurs vides deviennent NULL et les caractères spéciaux sont échappés."""
+    row = ("12345678901234", None, "", "a\tb", "ligne\nsuivante", "c:\\dir", True)
+
+    assert format_copy_row(row) == (
+        "12345678901234\t\\N\t\\N\ta\\tb\tligne\\nsuivante\tc:\\\\dir\tTrue\n"
+    )
+
+
+def test_stream_reads_in_small_blocks():
+    """La lecture par blocs restitue exactement toutes les lignes."""
+    rows = [(str(i), f"nom {i}") for i in range(100)]
+    stream = CopyRowStream(rows)
+
+    chunks = []
+    while True:
+        chunk = stream.read(7)
+        if not chunk:
+            break
+        chunks.append(chunk)
+
+    assert "".join(chunks) == "".join(format_copy_row(row) for row in rows)
+    assert stream.rows_written == 100
+
+
+def test_stream_is_lazy():
+    """Seules les lignes nécessaires au bloc demandé sont sérialisées."""
+    stream = CopyRowStream(iter([("a",), ("b",), ("c",)]))
+
+    assert stream.readline() == "a\n"
+    assert stream.rows_written == 1
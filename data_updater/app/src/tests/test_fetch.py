@@ -0,0 +1,41 @@
+"""Tests de la récupération des pages INSEE."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from app.src.api.base_client import InseeFetchError
+from app.src.api.siren import fetch_unitelegale_data
+from app.src.api.siret import fetch_etablissement_data
+
+
+def _client(status_code, json_data=None):
+    """Client INSEE simulé renvoyant une réponse de statut donné."""
+    response = Mock(status_code=status_code)
+    response.json.return_value = json_data
+    client = Mock(headers={})
+    client.get.return_value = response
+    return client
+
+
+def test_error_status_raises():
+    """Un statut d'erreur après relances n'est pas confondu avec la fin du flux."""
+    with pytest.raises(InseeFetchError):
+        fetch_unitelegale_data("c1", client=_client(500), db_date="2025-02-20", api_date="2025-02-26")
+
+
+def test_invalid_json_raises():
+    """Une réponse JSON illisible lève InseeFetchError."""
+    client = _client(200)
+    client.get.return_value.json.side_effect = ValueError("JSON invalide")
+    with pytest.raises(InseeFetchError):
+        fetch_etablissement_data("c1", client=client, db_date="2025-02-20", api_date="2025-02-26")
+
+
+def test_no_result_is_an_empty_page():
+    """Le 404 « aucun élément trouvé » de l'API termine normalement le flux."""
+    data, next_cursor = fetch_etablissement_data(
+        "*", client=_client(404), db_date="2025-02-20", api_date="2025-02-26"
+    )
+    assert data == ([], [])
+    assert next_cursor is None
@@ -0,0 +1,92 @@
+"""Tests du cache des dates de dernier traitement INSEE."""
+
+from contextlib import contextmanager
+from datetime import date
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from app.src.api.last_treatment import (
+    fetch_last_treatment_date_siret_api,
+    clear_last_treatment_cache
+)
+from app.src.database.checkpoint import save_checkpoint, STATUS_DONE
+from app.src.database.last_treatment import get_latest_treatment_date
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    """Part d'un cache vide avec une clé API factice."""
+    monkeypatch.setenv("api_key", "test")
+    clear_last_treatment_cache()
+    yield
+    clear_last_treatment_cache()
+
+
+@patch('app.src.api.last_treatment.insee_get')
+def test_date_is_fetched_once_per_cycle(mock_get):
+    """Un seul appel /informations par collection tant que le cache est valide."""
+    mock_get.return_value.json.return_value = {
+        "datesDernieresMisesAJourDesDonnees": [{
+            "collection": "Établissements",
+            "dateDernierTraitementMaximum": "2025-02-26T10:15:00.000"
+        }]
+    }
+
+    assert fetch_last_treatment_date_siret_api("Établissements") == "2025-02-26"
+    assert fetch_last_treatment_date_siret_api("Établissements") == "2025-02-26"
+    assert mock_get.call_count == 1
+
+    clear_last_treatment_cache()
+    fetch_last_treatment_date_siret_api("Établissements")
+    assert mock_get.call_count == 2
+
+
+@patch('app.src.api.last_treatment.insee_get')
+def test_missing_collection_is_not_cached(mock_get):
+    """Une réponse sans la collection demandée n'est pas mise en cache."""
+    mock_get.return_value.json.return_value = {"datesDernieresMisesAJourDesDonnees": []}
+
+    assert fetch_last_treatment_date_siret_api("Unités Légales") is None
+    assert fetch_last_treatment_date_siret_api("Unités Légales") is None
+    assert mock_get.call_count == 2
+
+
+def _treatment_date(db_max, checkpoint_end):
+    """Date de départ calculée pour un maximum en base et une fenêtre donnés."""
+    cursor = MagicMock()
+    cursor.fetchone.side_effect = [(db_max,), ("update_checkpoint",), checkpoint_end and (checkpoint_end,)]
+    conn = MagicMock()
+    conn.cursor.return_value.__enter__.return_value = cursor
+
+    @contextmanager
+    def get_connection():
+        yield conn
+
+    with patch('app.src.database.last_treatment.DatabaseConnectionPool') as pool:
+        pool.return_value.get_connection = get_connection
+        latest = get_latest_treatment_date("etablissement")
+    return latest, cursor.execute.call_args_list[-1][0][0]
+
+
+def test_only_fully_walked_window_moves_start_date():
+    """Seule une fenêtre parcourue jusqu'à la fin du flux avance la date de départ."""
+    latest, query = _treatment_date(date(2025, 2, 20), date(2025, 2, 26))
+    assert latest == "2025-02-26"
+    assert "fully_walked" in query
+
+    # Aucune fenêtre fiable : la date en base fait foi
+    latest, _ = _treatment_date(date(2025, 2, 20), None)
+    assert latest == "2025-02-20"
+
+
+def test_only_completion_marks_window_fully_walked():
+    """Un point de reprise RUNNING n'est jamais marqué comme parcouru."""
+    cursor = MagicMock()
+    window = ("2025-02-20", "2025-02-26")
+
+    save_checkpoint(cursor, "etablissement", window, "c1", 10)
+    assert cursor.execute.call_args[0][1][-1] is False
+
+    save_checkpoint(cursor, "etablissement", window, None, 10, STATUS_DONE)
+    assert cursor.execute.call_args[0][1][-1] is True
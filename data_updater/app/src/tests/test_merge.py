@@ -0,0 +1,56 @@
+"""Tests du moteur de fusion staging -> tables principales."""
+
+from unittest.mock import Mock, patch
+
+from app.src.database.loader import build_merge_sql, content_hash_sql, _apply_staging
+
+
+def test_merge_sql_skips_unchanged_rows():
+    """Les lignes identiques ne déclenchent pas de mise à jour."""
+    sql = build_merge_sql("unitelegale")
+
+    assert "MERGE INTO unitelegale t" in sql
+    assert "t.content_hash IS DISTINCT FROM s.content_hash" in sql
+    assert "WHEN NOT MATCHED" in sql
+    assert "DELETE" not in sql
+    assert "e.siren = s.siren" in sql
+
+
+def test_merge_sql_deletes_closed_etablissements():
+    """Les établissements passés à l'état 'F' sont supprimés, jamais insérés."""
+    sql = build_merge_sql("etablissement")
+
+    assert "THEN DELETE" in sql
+    assert "WHEN NOT MATCHED AND NOT (s.etatadministratifetablissement IS NOT DISTINCT FROM 'F')" in sql
+    assert "RETURNING merge_action()" in sql
+
+
+def test_apply_staging_counts_actions():
+    """Les compteurs sont lus depuis le résultat groupé par action."""
+    cursor = Mock()
+    cursor.fetchall.return_value = [("UPDATE", 3), ("INSERT", 2), ("DELETE", 1), ("SOURCE", 10)]
+
+    with patch('app.src.database.loader.DatabaseLogger') as logger:
+        assert _apply_staging(cursor, "etablissement", batch_id=7) == (1, 3, 2)
+
+    cursor.execute.assert_called_once()
+    assert cursor.execute.call_args.args[1] == {'batch_id': 7}
+    logger.return_value.log_main_operation.assert_called_once_with("SKIP_ETABLISSEMENT", 4)
+
+
+def test_merge_source_deduplicates_the_batch():
+    """La source ne lit que le lot fusionné et garde la dernière version de chaque clé."""
+    sql = build_merge_sql("adresse")
+
+    assert "SELECT DISTINCT ON (s.siret)" in sql
+    assert "WHERE s.batch_id = %(batch_id)s" in sql
+    assert "ORDER BY s.siret, s.load_seq DESC" in sql
+    assert "USING source s" in sql
+
+
+def test_content_hash_ignores_treatment_date():
+    """La date de dernier traitement n'entre pas dans le hash de contenu."""
+    expression = content_hash_sql("unitelegale", "s")
+
+    assert expression.startswith("md5(ROW(s.datecreationunitelegale")
+    assert "datederniertraitement" not in expression
@@ -0,0 +1,91 @@
+"""Tests du pipeline de pagination par curseur."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from app.src.api.base_client import InseeFetchError
+from app.src.api.rate_limiter import TokenBucket
+from app.src.service.pipeline import CursorPipeline
+
+
+def test_pipeline_follows_cursor_chain():
+    """Le producteur suit les curseurs jusqu'à ce que l'API renvoie le même."""
+    pages = {"*": ("page1", "c1"), "c1": ("page2", "c2"), "c2": ("page3", "c2")}
+    consumed = []
+
+    pipeline = CursorPipeline(
+        fetch_page=lambda cursor: pages[cursor],
+        consume_page=lambda data, next_cursor: consumed.append(data) or True,
+        queue_size=1
+    )
+
+    assert pipeline.run() == 3
+    assert consumed == ["page1", "page2", "page3"]
+    assert pipeline.api_calls == 3
+
+
+def test_pipeline_resumes_from_start_cursor():
+    """Un pipeline repris démarre au curseur du point de reprise."""
+    pages = {"c1": ("page2", "c2"), "c2": ("page3", "c2")}
+    consumed = []
+
+    pipeline = CursorPipeline(
+        fetch_page=lambda cursor: pages[cursor],
+        consume_page=lambda data, next_cursor: consumed.append(data) or True,
+        start_cursor="c1"
+    )
+
+    assert pipeline.run() == 2
+    assert consumed == ["page2", "page3"]
+
+
+def test_pipeline_stops_on_consumer_failure():
+    """Un échec de chargement arrête le producteur."""
+    fetch_page = Mock(side_effect=lambda cursor: ("page", cursor + "x"))
+
+    pipeline = CursorPipeline(
+        fetch_page=fetch_page,
+        consume_page=lambda data, next_cursor: False,
+        queue_size=1
+    )
+
+    assert pipeline.run() == 0
+
+
+def test_pipeline_fails_on_fetch_error():
+    """Une page en erreur arrête le flux sans le considérer comme terminé."""
+    def fetch_page(cursor):
+        if cursor == "*":
+            return "page1", "c1"
+        raise InseeFetchError("statut 503")
+
+    consumed = []
+    pipeline = CursorPipeline(
+        fetch_page=fetch_page,
+        consume_page=lambda data, next_cursor: consumed.append(data) or True
+    )
+
+    assert pipeline.run() == 1
+    assert consumed == ["page1"]
+    assert pipeline.failed
+
+
+def test_pipeline_propagates_producer_error():
+    """Une erreur réseau du producteur est relevée par run()."""
+    pipeline = CursorPipeline(
+        fetch_page=Mock(side_effect=RuntimeError("API indisponible")),
+        consume_page=lambda data, next_cursor: True
+    )
+
+    with pytest.raises(RuntimeError):
+        pipeline.run()
+
+
+def test_token_bucket_burst():
+    """Le seau délivre immédiatement sa capacité puis refuse sans attente."""
+    bucket = TokenBucket(calls_per_minute=60, burst=2)
+
+    assert bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=0)
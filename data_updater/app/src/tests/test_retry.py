@@ -0,0 +1,79 @@
+"""Tests du limiteur partagé et des nouvelles tentatives INSEE."""
+
+from unittest.mock import patch, Mock
+
+import pytest
+
+from app.src.api.metrics import RequestStats
+from app.src.api.retry import RetryPolicy, insee_get, parse_retry_after
+
+
+@pytest.fixture(autouse=True)
+def mock_rate_limiter():
+    """Neutralise le limiteur partagé pour ne pas ralentir les tests."""
+    with patch('app.src.api.retry.get_rate_limiter') as mock:
+        yield mock.return_value
+
+
+def _response(status, headers=None):
+    response = Mock()
+    response.status_code = status
+    response.headers = headers or {}
+    return response
+
+
+def test_parse_retry_after_seconds():
+    """L'en-tête Retry-After en secondes est respecté."""
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("n'importe quoi") is None
+
+
+@patch('app.src.api.retry.time.sleep')
+@patch('app.src.api.retry.requests.get')
+def test_insee_get_retries_on_429(mock_get, mock_sleep):
+    """Une réponse 429 est retentée après le délai Retry-After."""
+    mock_get.side_effect = [_response(429, {"Retry-After": "3"}), _response(200)]
+
+    response = insee_get("https://api.insee.fr/test", {}, policy=RetryPolicy(attempts=3))
+
+    assert response.status_code == 200
+    assert mock_get.call_count == 2
+    mock_sleep.assert_called_once_with(3.0)
+
+
+@patch('app.src.api.retry.time.sleep')
+@patch('app.src.api.retry.requests.get')
+def test_insee_get_returns_last_error(mock_get, mock_sleep):
+    """Après la dernière tentative, la réponse en erreur est renvoyée."""
+    mock_get.return_value = _response(503)
+
+    response = insee_get("https://api.insee.fr/test", {}, policy=RetryPolicy(attempts=2))
+
+    assert response.status_code == 503
+    assert mock_get.call_count == 2
+
+
+@patch('app.src.api.retry.requests.get')
+def test_insee_get_does_not_retry_client_errors(mock_get):
+    """Les erreurs 4xx autres que 429 ne sont pas retentées."""
+    mock_get.return_value = _response(404)
+
+    assert insee_get("https://api.insee.fr/test", {}).status_code == 404
+    assert mock_get.call_count == 1
+
+
+def test_insee_get_uses_session_and_records_timing():
+    """La session fournie est réutilisée et chaque tentative est mesurée."""
+    session = Mock()
+    session.get.return_value = _response(200)
+    stats = RequestStats("etablissement")
+
+    insee_get("https://api.insee.fr/test", {}, session=session, stats=stats)
+    insee_get("https://api.insee.fr/test", {}, session=session, stats=stats)
+
+    assert session.get.call_count == 2
+    summary = stats.summary(connections_opened=1)
+    assert summary["requests"] == 2
+    assert summary["errors"] == 0
+    assert summary["connections_opened"] == 1
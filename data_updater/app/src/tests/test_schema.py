@@ -0,0 +1,181 @@
+"""Tests du gestionnaire de schéma."""
+
+from contextlib import contextmanager
+from datetime import date
+from unittest.mock import patch, MagicMock
+
+from app.src.database.schema import (
+    TABLE_DDL,
+    ADDED_COLUMNS,
+    ADDED_INDEXES,
+    STAGING_COLUMNS,
+    STAGING_TABLES,
+    SECONDARY_INDEXES,
+    pending_ddl,
+    build_indexes,
+    create_log_partitions,
+    expired_log_partitions
+)
+
+
+def catalog_cursor(persistence, columns, indexes=None):
+    """Curseur simulé renvoyant l'état du catalogue."""
+    cursor = MagicMock()
+    kinds = {'updates_log': 'p'}
+    if indexes is None:
+        indexes = [name for added in ADDED_INDEXES.values() for name in added]
+    cursor.fetchall.side_effect = [
+        [(table, value, kinds.get(table, 'r')) for table, value in persistence.items()],
+        list(columns),
+        [(name,) for name in indexes]
+    ]
+    return cursor
+
+
+def complete_catalog():
+    """Catalogue d'un schéma déjà complet."""
+    persistence = {table: 'p' for table in TABLE_DDL}
+    persistence.update({staging: 'u' for staging in STAGING_TABLES})
+    columns = {(table, column) for table, added in ADDED_COLUMNS.items() for column in added}
+    columns |= {(staging, column) for staging in STAGING_TABLES for column in STAGING_COLUMNS}
+    return persistence, columns
+
+
+def test_complete_schema_needs_no_ddl():
+    """Sur un schéma complet, aucune instruction DDL n'est émise."""
+    assert pending_ddl(catalog_cursor(*complete_catalog())) == []
+
+
+def test_missing_objects_are_created():
+    """Tables, colonnes et staging manquantes donnent lieu à leur seule instruction."""
+    persistence, columns = complete_catalog()
+    del persistence['updates_log']
+    persistence['staging_adresse'] = 'p'
+    columns.discard(('etablissement', 'content_hash'))
+    columns.discard(('staging_nafv2', 'load_seq'))
+    columns.discard(('update_checkpoint', 'fully_walked'))
+
+    statements = pending_ddl(catalog_cursor(persistence, columns))
+
+    assert statements == [
+        TABLE_DDL['updates_log'],
+        "ALTER TABLE etablissement ADD COLUMN content_hash CHAR(32)",
+        "ALTER TABLE update_checkpoint ADD COLUMN fully_walked BOOLEAN NOT NULL DEFAULT FALSE",
+        "ALTER TABLE staging_adresse SET UNLOGGED",
+        f"ALTER TABLE staging_nafv2 ADD COLUMN load_seq {STAGING_COLUMNS['load_seq']}",
+    ]
+
+
+def test_log_keyset_index_is_added_to_existing_log():
+    """Un journal déjà partitionné reçoit l'index (update_date, id) de la pagination par clé."""
+    statements = pending_ddl(catalog_cursor(*complete_catalog(), indexes=[]))
+
+    assert statements == ["CREATE INDEX IF NOT EXISTS idx_log_date_id ON updates_log (update_date, id)"]
+    assert "idx_log_date_id ON updates_log (update_date, id)" in TABLE_DDL['updates_log']
+
+
+def test_geolocalisation_gets_its_geography_column():
+    """La colonne geog des recherches de l'API est créée avec l'extension PostGIS."""
+    persistence, columns = complete_catalog()
+    columns.discard(('geolocalisation', 'geog'))
+
+    statements = pending_ddl(catalog_cursor(persistence, columns))
+
+    assert statements == [
+        "CREATE EXTENSION IF NOT EXISTS postgis",
+        f"ALTER TABLE geolocalisation ADD COLUMN geog {ADDED_COLUMNS['geolocalisation']['geog']}",
+    ]
+
+    del persistence['geolocalisation']
+    statements = pending_ddl(catalog_cursor(persistence, columns))
+
+    assert statements == ["CREATE EXTENSION IF NOT EXISTS postgis", TABLE_DDL['geolocalisation']]
+    assert "geog geography(Point, 4326) GENERATED ALWAYS AS" in TABLE_DDL['geolocalisation']
+
+
+def test_geography_index_is_built_with_gist():
+    """L'index spatial est un index secondaire GiST, reconstruit après chargement."""
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = []
+
+    @contextmanager
+    def get_connection():
+        yield conn
+
+    with patch('app.src.database.schema.DatabaseConnectionPool') as pool, \
+         patch('app.src.database.schema.DatabaseLogger'):
+        pool.return_value.get_connection = get_connection
+        assert build_indexes(['geolocalisation'])
+
+    statements = [call.args[0] for call in cursor.execute.call_args_list]
+    assert "CREATE INDEX CONCURRENTLY IF NOT EXISTS geo_geog_idx ON geolocalisation USING gist (geog)" in statements
+
+
+def test_build_indexes_rebuilds_only_missing_or_invalid():
+    """Les index valides sont conservés, les index invalides reconstruits."""
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = [('adr_siret_idx', True), ('adr_codepostaletablissement_idx', False),
+                                    ('adr_libellecommuneetablissement_idx', True)]
+
+    @contextmanager
+    def get_connection():
+        yield conn
+
+    with patch('app.src.database.schema.DatabaseConnectionPool') as pool, \
+         patch('app.src.database.schema.DatabaseLogger'):
+        pool.return_value.get_connection = get_connection
+        assert build_indexes(['adresse'])
+
+    statements = [call.args[0] for call in cursor.execute.call_args_list]
+    assert "DROP INDEX CONCURRENTLY IF EXISTS adr_codepostaletablissement_idx" in statements
+    assert (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS adr_codepostaletablissement_idx "
+        f"ON adresse ({SECONDARY_INDEXES['adresse']['adr_codepostaletablissement_idx']})"
+    ) in statements
+    assert not any("adr_siret_idx ON" in statement for statement in statements)
+    assert conn.autocommit is False
+
+
+def test_legacy_log_is_renamed_before_partitioning():
+    """Un journal non partitionné est renommé puis recréé partitionné."""
+    persistence, columns = complete_catalog()
+    cursor = MagicMock()
+    cursor.fetchall.side_effect = [
+        [(table, value, 'r') for table, value in persistence.items()],
+        list(columns),
+        []
+    ]
+
+    statements = pending_ddl(cursor)
+
+    assert statements[0] == "ALTER TABLE updates_log RENAME TO updates_log_legacy"
+    assert not any(statement.startswith("CREATE INDEX") for statement in statements)
+    assert TABLE_DDL['updates_log'] in statements
+    assert "PARTITION BY RANGE (update_date)" in TABLE_DDL['updates_log']
+    assert "USING brin (update_date)" in TABLE_DDL['updates_log']
+
+
+def test_log_partitions_are_monthly_and_created_once():
+    """Une partition par mois, créée seulement si elle n'existe pas."""
+    cursor = MagicMock()
+    cursor.fetchone.side_effect = [("updates_log_202412",), (None,), (None,)]
+
+    created = create_log_partitions(cursor, date(2024, 12, 15), date(2025, 2, 1))
+
+    assert created == ["updates_log_202501", "updates_log_202502"]
+    assert cursor.execute.call_args_list[-1].args[0] == (
+        "CREATE TABLE updates_log_202502 PARTITION OF updates_log "
+        "FOR VALUES FROM ('2025-02-01') TO ('2025-03-01')"
+    )
+
+
+def test_expired_partitions_respect_retention():
+    """Seules les partitions antérieures à la rétention sont purgées."""
+    partitions = ["updates_log_202501", "updates_log_202409", "updates_log_202410",
+                  "updates_log_202412", "updates_log_legacy"]
+
+    assert expired_log_partitions(partitions, date(2025, 1, 20), 3) == [
+        "updates_log_202409", "updates_log_202410"
+    ]
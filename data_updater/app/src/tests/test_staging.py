@@ -0,0 +1,75 @@
+"""Tests du chargement des pages en staging."""
+
+from contextlib import contextmanager
+from unittest.mock import patch, MagicMock
+
+import psycopg2
+import psycopg2.pool
+import pytest
+
+from app.src.database.loader import load_pages_to_staging, _copy_to_staging
+
+
+@pytest.fixture
+def connections():
+    """Pool simulé prêtant une connexion distincte à chaque emprunt."""
+    lent = []
+
+    @contextmanager
+    def get_connection():
+        conn = MagicMock()
+        conn.closed = 0
+        lent.append(conn)
+        yield conn
+
+    with patch('app.src.database.loader.DatabaseConnectionPool') as pool, \
+         patch('app.src.database.loader.DatabaseLogger'):
+        pool.return_value.get_connection = get_connection
+        yield lent
+
+
+def test_pages_are_copied_on_separate_connections(connections):
+    """Établissements et adresses sont copiés sur deux connexions, puis validés."""
+    with patch('app.src.database.loader._copy_to_staging', return_value=1) as copy:
+        assert load_pages_to_staging({"etablissement": [("1",)], "adresse": [("1",)]})
+
+    assert copy.call_count == 2
+    assert len(connections) == 2
+    for conn in connections:
+        conn.commit.assert_called_once()
+
+
+def test_failed_copy_rolls_back_the_whole_page(connections):
+    """Si une copie échoue, aucune des deux tables n'est validée."""
+    def copy(cursor, rows, table_type, batch_id):
+        if table_type == "adresse":
+            raise psycopg2.DataError("ligne invalide")
+        return 1
+
+    with patch('app.src.database.loader._copy_to_staging', side_effect=copy):
+        assert not load_pages_to_staging({"etablissement": [("1",)], "adresse": [("1",)]})
+
+    for conn in connections:
+        conn.commit.assert_not_called()
+        conn.rollback.assert_called_once()
+
+
+def test_copy_tags_rows_with_their_batch():
+    """Les lignes sont copiées directement en staging avec leur lot."""
+    cursor = MagicMock()
+    cursor.copy_expert.side_effect = lambda sql, stream: stream.read()
+
+    assert _copy_to_staging(cursor, [("1", "2")], "adresse", batch_id=42) == 1
+
+    sql, _ = cursor.copy_expert.call_args.args
+    assert sql.startswith("COPY staging_adresse (")
+    assert sql.endswith(", batch_id) FROM STDIN")
+    cursor.execute.assert_not_called()
+
+
+def test_pool_error_is_reported():
+    """Un pool épuisé fait échouer la page au lieu de lever l'erreur."""
+    with patch('app.src.database.loader.DatabaseConnectionPool') as pool, \
+         patch('app.src.database.loader.DatabaseLogger'):
+        pool.return_value.get_connection.side_effect = psycopg2.pool.PoolError("pool épuisé")
+        assert not load_pages_to_staging({"etablissement": [("1",)], "adresse": [("1",)]})
@@ -0,0 +1,125 @@
+"""Tests du chargement des fichiers stock."""
+
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
+from app.src.database.stock_loader import (
+    STOCK_SOURCES,
+    open_stock_stream,
+    parse_header,
+    read_header,
+    plan_chunks,
+    read_chunk,
+    stream_blocks,
+    stock_rows
+)
+
+
+def test_chunks_cover_every_line_once(tmp_path):
+    """Chaque ligne est lue par une seule plage, quelles que soient les bornes."""
+    lines = [f"{n},{'x' * (n % 7)}\n" for n in range(200)]
+    path = tmp_path / "stock.csv"
+    path.write_text("id,valeur\n" + "".join(lines), encoding="utf-8")
+
+    header, data_start = read_header(str(path), ",")
+    chunks = plan_chunks(str(path), data_start, chunk_size=37)
+    read = [line for start, end in chunks for line in read_chunk(str(path), start, end)]
+
+    assert header == ["id", "valeur"]
+    assert read == lines
+
+
+MULTILINE_RECORDS = [
+    [str(n), f'complément {n}\nsuite "{n}"' if n % 3 == 0 else f"valeur {n}"]
+    for n in range(60)
+]
+
+
+def _write_multiline_stock(path):
+    """Écrit un CSV dont un enregistrement sur trois a un champ sur deux lignes."""
+    rows = []
+    for n, value in MULTILINE_RECORDS:
+        quoted = value.replace('"', '""')
+        rows.append(f'{n},"{quoted}"\n')
+    data = ("id,valeur\n" + "".join(rows)).encode()
+    path.write_bytes(data)
+    return data
+
+
+@pytest.mark.parametrize("scan_block_size", [16 * 1024 * 1024, 50])
+def test_chunks_never_split_a_quoted_field(tmp_path, scan_block_size):
+    """Une borne visée au milieu d'un champ multiligne est repoussée à la fin de l'enregistrement."""
+    path = tmp_path / "stock.csv"
+    data = _write_multiline_stock(path)
+    header, data_start = read_header(str(path), ",")
+
+    with patch("app.src.database.stock_loader.SCAN_BLOCK_SIZE", scan_block_size):
+        chunks = plan_chunks(str(path), data_start, chunk_size=29)
+
+    records = [
+        list(row)
+        for start, end in chunks
+        for row in stock_rows(read_chunk(str(path), start, end), header, ",", ["id", "valeur"])
+    ]
+    # Le retour à la ligne suivant une borne visée est parfois celui d'un champ
+    inner_newlines = {data.index(b"\nsuite", start) for start, _ in chunks if b"\nsuite" in data[start:]}
+    assert any(data.index(b"\n", start + 29) in inner_newlines for start, _ in chunks[:-1])
+    assert records == MULTILINE_RECORDS
+
+
+def test_stream_blocks_keep_quoted_fields_whole(tmp_path):
+    """Un bloc lu en flux se termine toujours sur une fin d'enregistrement."""
+    path = tmp_path / "stock.csv"
+    _write_multiline_stock(path)
+
+    with open(path, "rb") as stream:
+        header = parse_header(stream.readline(), ",")
+        blocks = list(stream_blocks(stream, 16))
+
+    records = [
+        list(row)
+        for block in blocks
+        for row in stock_rows([line.decode() for line in block], header, ",", ["id", "valeur"])
+    ]
+    assert len(blocks) > 10
+    assert records == MULTILINE_RECORDS
+
+
+def test_stock_rows_maps_headers_to_columns():
+    """Les en-têtes CSV sont associés aux colonnes en minuscules, dans l'ordre de la table."""
+    header = ["codeNaf", "nafVFinale", "naf40caract"]
+    rows = list(stock_rows(["01;Culture ;Cult.\n", "02;;x\n"], header, ";", ["codenaf", "nafvfinale"]))
+
+    assert rows == [("01", "Culture"), ("02", "")]
+
+
+def test_etablissement_filter_keeps_active_idf_rows():
+    """Seuls les établissements diffusibles, actifs et franciliens sont chargés."""
+    source = STOCK_SOURCES["etablissement"]
+    header = ["siret", "statutDiffusionEtablissement", "etatAdministratifEtablissement",
+              "codePostalEtablissement"]
+    lines = ["1,O,A,75011\n", "2,O,F,75011\n", "3,P,A,92100\n", "4,O,A,69001\n", "5,O,A,93200\n"]
+
+    rows = stock_rows(lines, header, ",", ["siret"], source["row_filter"])
+
+    assert [row[0] for row in rows] == ["1", "5"]
+
+
+def test_stream_reads_archive_in_line_blocks(tmp_path):
+    """L'archive est lue en flux, par blocs de lignes complètes."""
+    lines = [f"{n};libellé {n}\n".encode() for n in range(50)]
+    with zipfile.ZipFile(tmp_path / "archive.zip", "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("naf.csv", b"codenaf;nafvfinale\n" + b"".join(lines))
+
+    sources = {"nafv2": {**STOCK_SOURCES["nafv2"], "archive": "archive.zip", "file": "naf.csv"}}
+    with patch.dict("app.src.database.stock_loader.STOCK_SOURCES", sources), \
+         open_stock_stream(str(tmp_path), "nafv2") as stream:
+        header = parse_header(stream.readline(), ";")
+        blocks = list(stream_blocks(stream, 64))
+
+    assert header == ["codenaf", "nafvfinale"]
+    assert len(blocks) > 1
+    assert [line for block in blocks for line in block] == lines
+    assert not (tmp_path / "naf.csv").exists()
@@ -61,6 +61,26 @@ class DatabaseLogger:
             operation_type, rows_affected
         )
     
+    def log_api_timing(self, summary: dict):
+        """Log les temps de requête d'un client API."""
+        self._logger.info(
+            "API | %s | Requêtes: %d | Erreurs: %d | Total: %.1f ms | "
+            "Moyenne: %.1f ms | Min: %.1f ms | Max: %.1f ms | Connexions: %s",
+            summary["client"], summary["requests"], summary["errors"],
+            summary["total_ms"], summary["avg_ms"], summary["min_ms"],
+            summary["max_ms"], summary["connections_opened"]
+        )
+
+    def log_pool_metrics(self, metrics: dict):
+        """Log l'utilisation du pool de connexions PostgreSQL."""
+        self._logger.info(
+            "POOL | Emprunts: %d | En cours: %d | Inactives: %d | Max: %d | "
+            "Attentes: %d | Attente moyenne: %.1f ms | Attente max: %.1f ms | Recyclées: %d",
+            metrics["checkouts"], metrics["in_use"], metrics["idle"], metrics["max"],
+            metrics["waits"], metrics["wait_time_avg"] * 1000,
+            metrics["wait_time_max"] * 1000, metrics["recycled"]
+        )
+
     def log_error(self, operation: str, error: str):
         """Log une erreur."""
         self._logger.error("ERREUR | %s | %s", operation, error) 
\ No newline at end of file
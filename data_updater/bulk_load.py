@@ -0,0 +1,55 @@
+"""Point d'entrée du chargement initial des fichiers stock INSEE."""
+import sys
+import argparse
+from dotenv import load_dotenv
+from app.src.config.settings import STOCK_DIR, BULK_LOAD_WORKERS, BULK_CHUNK_SIZE, BULK_STREAM
+from app.src.database.stock_loader import STOCK_SOURCES
+from app.src.service.bulk_load import bulk_load
+
+def parse_args():
+    """Analyse les options de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Chargement des fichiers stock INSEE")
+    parser.add_argument(
+        "--dir",
+        default=STOCK_DIR,
+        help="Dossier des archives ZIP et CSV de référence"
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=list(STOCK_SOURCES),
+        help="Fichiers stock à charger (tous par défaut)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=BULK_LOAD_WORKERS,
+        help="Nombre de processus de copie"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=BULK_CHUNK_SIZE,
+        help="Taille des plages copiées par processus (octets)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        default=BULK_STREAM,
+        help="Lit les archives ZIP en flux, sans extraire les CSV sur disque"
+    )
+    return parser.parse_args()
+
+def main():
+    """Charge les fichiers stock."""
+    args = parse_args()
+    load_dotenv()
+    if not bulk_load(args.dir, args.only, args.workers, args.chunk_size, args.stream):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n👋 Au revoir!")
+        sys.exit(0)
@@ -1,18 +1,40 @@
 """Point d'entrée de l'application."""
 import sys
+import argparse
 from pathlib import Path
 from dotenv import load_dotenv
 from app.src.service.updater import UpdateService
+from app.src.service.async_updater import AsyncUpdateService
 
 app_path = Path(__file__).resolve().parent / "app"
 sys.path.append(str(app_path))
 
+def parse_args():
+    """Analyse les options de la ligne de commande."""
+    parser = argparse.ArgumentParser(description="Service de mise à jour INSEE")
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Récupère les pages INSEE en parallèle du chargement en base"
+    )
+    parser.add_argument(
+        "--async",
+        dest="async_mode",
+        action="store_true",
+        help="Utilise le service asynchrone (httpx + asyncpg)"
+    )
+    return parser.parse_args()
+
 def main():
     """Démarre le service de mise à jour."""
+    args = parse_args()
     # Charger les variables d'environnement
     load_dotenv()    
     # Démarrer le service
-    service = UpdateService()
+    if args.async_mode:
+        service = AsyncUpdateService()
+    else:
+        service = UpdateService(pipelined=True) if args.pipeline else UpdateService()
     service.run()
 
 if __name__ == "__main__":
@@ -1,5 +1,5 @@
 from fastapi import FastAPI
-from app.routes import nafv2,auth,siren,siret,compagny
+from app.routes import nafv2,auth,siren,siret,compagny,changes,cache
 from fastapi.middleware.cors import CORSMiddleware
 
 app = FastAPI(title="Siren API")
@@ -11,6 +11,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all HTTP methods, including OPTIONS
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["X-Next-Cursor"],  # Pagination of /api/companies/search
 )
 
 
@@ -19,4 +20,6 @@ app.include_router(auth.router, prefix="/auth", tags=["Admin Auth"])
 app.include_router(siren.router, prefix="/api", tags=["SIREN Search"])
 app.include_router(siret.router, prefix="/api", tags=["SIRET Search"])
 app.include_router(compagny.router, prefix="/api", tags=["SIRET Search"])
+app.include_router(changes.router, prefix="/api", tags=["Changes"])
+app.include_router(cache.router, prefix="/api", tags=["Cache"])
 
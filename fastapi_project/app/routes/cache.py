@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from app.utils.cache import siren_cache, siret_cache
+
+router = APIRouter()
+
+@router.get("/cache/stats")
+def cache_stats():
+    """ Size and hit/miss/eviction counters of the identifier lookup caches """
+    return {"siren": siren_cache.stats(), "siret": siret_cache.stats()}
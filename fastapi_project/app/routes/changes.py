@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Literal
+from app.database import SirenSessionLocal
+from app.utils.changes import decode_cursor, iter_changes
+from app.utils.ndjson import to_ndjson
+
+router = APIRouter()
+
+@router.get("/changes")
+def stream_changes(
+    since: str | None = Query(None, description="Cursor of the last entry received, or an ISO date"),
+    entity_type: Literal["etablissement", "adresse", "unitelegale"] | None = None,
+    limit: int = Query(10000, ge=1, le=100000),
+):
+    """
+    Stream the entries of the updater change log as NDJSON.
+
+    Each line carries the change (INSERT, UPDATE or DELETE), the current row of the
+    entity and a `cursor`: pass the cursor of the last line as `since` to resume.
+
+    Raises:
+        HTTPException: If the cursor is invalid.
+    """
+    try:
+        decode_cursor(since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def stream():
+        # The session lives as long as the response body is being streamed
+        db = SirenSessionLocal()
+        try:
+            yield from to_ndjson(iter_changes(db, since, entity_type, limit))
+        finally:
+            db.close()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -1,44 +1,118 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import text
 from typing import List
-from app.schemas.compagny import CompanySchema, SearchFilters
-from app.database import get_siren_db 
+from app.schemas.compagny import ClusterFilters, ClusterSchema, CompanySchema, SearchFilters
+from app.database import get_siren_db, SirenSessionLocal
+from app.utils.result_cache import cached_candidates, geo_cache, geo_search_key
+from app.utils.geo_search import (
+    GEO_SEARCH_MAX_PAGE,
+    GEO_SEARCH_STREAM_MAX_ROWS,
+    cluster_cell_size,
+    cluster_rows,
+    decode_search_cursor,
+    encode_search_cursor,
+    iter_search,
+    keyset_page,
+    search_clusters,
+    search_page,
+    within_radius,
+)
+from app.utils.ndjson import to_ndjson
 
 router = APIRouter()
 
 @router.post("/companies/search", response_model=List[CompanySchema])
 def search_companies_in_radius(
     filters: SearchFilters,
+    response: Response,
+    accept: str | None = Header(None),
     db: Session = Depends(get_siren_db)
 ):
-    print("Received filters:", filters.dict())  # Debug
-    activity_code = filters.activityCode
-    latitude = filters.latitude
-    longitude = filters.longitude
-    radius = filters.radius
-
-    radius_meters = radius * 1000
-
-    query = """
-        SELECT e.siret, g.x_longitude AS x, g.y_latitude AS y
-        FROM geolocalisation g
-        JOIN etablissement e ON g.siret = e.siret
-        WHERE e.activiteprincipaleetablissement = :activity_code
-        AND ST_DWithin(
-            g.geog,
-            ST_SetSRID(ST_MakePoint(:longitude, :latitude), 4326)::geography,
-            :radius_meters
-        )
     """
-    result = db.execute(text(query), {
+    Search establishments of an activity within a radius.
+
+    Results are paginated with a keyset on siret (or distance): the cursor of the
+    next page is returned in the X-Next-Cursor header. With `Accept:
+    application/x-ndjson` the whole result is streamed instead, one row per line.
+    """
+    activity_code = filters.activityCode.strip().upper()
+
+    try:
+        after = decode_search_cursor(filters.cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    params = {
         "activity_code": activity_code,
-        "latitude": latitude,
-        "longitude": longitude,
-        "radius_meters": radius_meters
-    }).fetchall()
-
-    print("Query result:", result)  # Debug
-    companies = [{"siret": row[0], "x": row[1], "y": row[2]} for row in result]
-    print("Returning companies:", companies)  # Debug
-    return companies
\ No newline at end of file
+        "latitude": filters.latitude,
+        "longitude": filters.longitude,
+        "radius_meters": filters.radius * 1000
+    }
+
+    if accept and "application/x-ndjson" in accept:
+        limit = min(filters.limit or GEO_SEARCH_STREAM_MAX_ROWS, GEO_SEARCH_STREAM_MAX_ROWS)
+
+        def stream():
+            # The session lives as long as the response body is being streamed
+            stream_db = SirenSessionLocal()
+            try:
+                yield from to_ndjson(iter_search(stream_db, params, filters.orderBy, after, limit))
+            finally:
+                stream_db.close()
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    limit = min(filters.limit or GEO_SEARCH_MAX_PAGE, GEO_SEARCH_MAX_PAGE)
+    # Nearby searches share their candidates, filtered here against the exact circle
+    candidates = cached_candidates(db, activity_code, filters.latitude, filters.longitude, filters.radius)
+    if candidates is not None:
+        rows = within_radius(candidates, filters.latitude, filters.longitude, params["radius_meters"])
+        rows = keyset_page(rows, filters.orderBy, after, limit + 1)
+    else:
+        cache_key = geo_search_key(
+            geo_cache.data_version(db), activity_code, filters.latitude, filters.longitude, filters.radius,
+            filters.orderBy, limit, filters.cursor or ""
+        )
+        rows = geo_cache.get(cache_key)
+        if rows is None:
+            rows = search_page(db, params, filters.orderBy, after, limit + 1)
+            geo_cache.set(cache_key, rows)
+
+    if len(rows) > limit:
+        response.headers["X-Next-Cursor"] = encode_search_cursor(rows[limit - 1])
+    return rows[:limit]
+
+@router.post("/companies/clusters", response_model=List[ClusterSchema])
+def cluster_companies_in_radius(
+    filters: ClusterFilters,
+    db: Session = Depends(get_siren_db)
+):
+    """
+    Aggregate the establishments of a radius search in grid cells for the map.
+
+    The grid follows `zoom` (or `cellSize` in degrees) and never has more than
+    GEO_CLUSTER_MAX_CELLS cells across the search, so the payload stays bounded.
+    """
+    activity_code = filters.activityCode.strip().upper()
+    radius_meters = filters.radius * 1000
+    cell_size = cluster_cell_size(radius_meters, filters.zoom, filters.cellSize)
+
+    candidates = cached_candidates(db, activity_code, filters.latitude, filters.longitude, filters.radius)
+    if candidates is not None:
+        return cluster_rows(within_radius(candidates, filters.latitude, filters.longitude, radius_meters), cell_size)
+
+    cache_key = geo_search_key(
+        geo_cache.data_version(db), activity_code, filters.latitude, filters.longitude, filters.radius,
+        "clusters", repr(cell_size)
+    )
+    clusters = geo_cache.get(cache_key)
+    if clusters is None:
+        clusters = search_clusters(db, {
+            "activity_code": activity_code,
+            "latitude": filters.latitude,
+            "longitude": filters.longitude,
+            "radius_meters": radius_meters
+        }, cell_size)
+        geo_cache.set(cache_key, clusters)
+    return clusters
@@ -1,9 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
 from app.database import get_siren_db
 from app.models.unitelegale import UniteLegale
-from app.schemas.unitelegale import UniteLegaleResponse
+from app.schemas.unitelegale import UniteLegaleResponse, SirenBatchRequest
 from typing import List
+from app.utils.ndjson import lookup_lines, to_ndjson
+from app.utils.cache import siren_cache, invalidator
 
 router = APIRouter()
 
@@ -14,9 +18,30 @@ def search_by_siren(
 ):
     """ Search company by SIREN number (9 digits) """
     
-    results = db.query(UniteLegale).filter(UniteLegale.siren == siren).all()
+    invalidator.refresh(db)
+    results = siren_cache.get(siren)
+    if results is None:
+        rows = db.query(UniteLegale).filter(UniteLegale.siren == siren).all()
+        results = [UniteLegaleResponse.model_validate(row) for row in rows]
+        # Misses are cached too, an insertion shows up in updates_log
+        siren_cache.set(siren, results)
 
     if not results:
         raise HTTPException(status_code=404, detail="No company found with this SIREN")
 
     return results
+
+@router.post("/siren/batch")
+def search_by_siren_batch(
+    request: SirenBatchRequest,
+    db: Session = Depends(get_siren_db)
+):
+    """ Look up companies by SIREN numbers, streamed as NDJSON (misses reported inline) """
+
+    sirens = list(dict.fromkeys(request.sirens))
+    results = db.query(UniteLegale).filter(text("siren = ANY(:ids)")).params(ids=sirens).all()
+
+    return StreamingResponse(
+        to_ndjson(lookup_lines(sirens, results, "siren", UniteLegaleResponse)),
+        media_type="application/x-ndjson"
+    )
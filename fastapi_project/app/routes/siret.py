@@ -1,9 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
 from app.database import get_siren_db
 from app.models.etablissements import Etablissement
-from app.schemas.etablissements import EtablissementResponse
+from app.schemas.etablissements import EtablissementResponse, SiretBatchRequest
 from typing import List
+from app.utils.ndjson import lookup_lines, to_ndjson
+from app.utils.cache import siret_cache, invalidator
 
 router = APIRouter()
 
@@ -14,9 +18,30 @@ def search_by_siret(
 ):
     """ Search for an establishment by SIRET number (14 digits) """
     
-    results = db.query(Etablissement).filter(Etablissement.siret == siret).all()
+    invalidator.refresh(db)
+    results = siret_cache.get(siret)
+    if results is None:
+        rows = db.query(Etablissement).filter(Etablissement.siret == siret).all()
+        results = [EtablissementResponse.model_validate(row) for row in rows]
+        # Misses are cached too, an insertion shows up in updates_log
+        siret_cache.set(siret, results)
 
     if not results:
         raise HTTPException(status_code=404, detail="No establishment found with this SIRET")
 
     return results
+
+@router.post("/siret/batch")
+def search_by_siret_batch(
+    request: SiretBatchRequest,
+    db: Session = Depends(get_siren_db)
+):
+    """ Look up establishments by SIRET numbers, streamed as NDJSON (misses reported inline) """
+
+    sirets = list(dict.fromkeys(request.sirets))
+    results = db.query(Etablissement).filter(text("siret = ANY(:ids)")).params(ids=sirets).all()
+
+    return StreamingResponse(
+        to_ndjson(lookup_lines(sirets, results, "siret", EtablissementResponse)),
+        media_type="application/x-ndjson"
+    )
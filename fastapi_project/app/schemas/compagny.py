@@ -1,9 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import Literal
 
 class CompanySchema(BaseModel):
     siret: str
     x: float
     y: float
+    distance: float | None = None  # Meters from the search center
 
     class Config:
         orm_mode = True
@@ -12,4 +14,17 @@ class SearchFilters(BaseModel):
     activityCode: str  # NAF code (e.g., "08.11Z")
     latitude: float   # Latitude (e.g., 48.8490995)
     longitude: float  # Longitude (e.g., 2.3388232)
-    radius: float     # Radius in kilometers (e.g., 10)
\ No newline at end of file
+    radius: float = Field(..., gt=0)  # Radius in kilometers (e.g., 10)
+    orderBy: Literal["siret", "distance"] = "siret"  # "distance": nearest first
+    limit: int | None = Field(None, ge=1)  # Rows per page (capped server-side)
+    cursor: str | None = None  # X-Next-Cursor of the previous page
+
+class ClusterFilters(SearchFilters):
+    zoom: int | None = Field(None, ge=0, le=22)  # Web map zoom level
+    cellSize: float | None = Field(None, gt=0)  # Grid cell size in degrees (overrides zoom)
+
+class ClusterSchema(BaseModel):
+    x: float  # Centroid longitude
+    y: float  # Centroid latitude
+    count: int
+    siret: str | None = None  # Set when the cell holds a single establishment
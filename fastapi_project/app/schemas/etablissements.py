@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+import os
+from pydantic import BaseModel, Field
+from typing import Annotated
 from datetime import datetime, date  
 
 class EtablissementBase(BaseModel):
@@ -19,4 +21,9 @@ class EtablissementBase(BaseModel):
 
 class EtablissementResponse(EtablissementBase):
     class Config:
-        from_attributes = True  
+        from_attributes = True
+
+class SiretBatchRequest(BaseModel):
+    sirets: list[Annotated[str, Field(pattern=r"^\d{14}$")]] = Field(
+        ..., min_length=1, max_length=int(os.getenv("BATCH_MAX_IDS", "5000"))
+    )
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+import os
+from pydantic import BaseModel, Field
+from typing import Annotated
 from datetime import datetime
 
 class UniteLegaleBase(BaseModel):
@@ -20,3 +22,8 @@ class UniteLegaleBase(BaseModel):
 class UniteLegaleResponse(UniteLegaleBase):
     class Config:
         from_attributes = True  # ORM Compatibility
+
+class SirenBatchRequest(BaseModel):
+    sirens: list[Annotated[str, Field(pattern=r"^\d{9}$")]] = Field(
+        ..., min_length=1, max_length=int(os.getenv("BATCH_MAX_IDS", "5000"))
+    )
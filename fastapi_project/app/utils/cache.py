@@ -0,0 +1,150 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+# Minimum delay between two reads of updates_log
+CACHE_INVALIDATION_INTERVAL = float(os.getenv("CACHE_INVALIDATION_INTERVAL", "5"))
+
+
+class LookupCache:
+    """ Bounded LRU cache whose entries expire after a TTL """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """ Return the cached value of a key, or None when absent or expired """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """ Store a value, evicting the least recently used entries above the bound """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, keys):
+        """ Drop the given keys from the cache """
+        with self._lock:
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def keys(self) -> list:
+        """ Return the cached keys """
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self):
+        """ Drop every entry """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """ Return the size and counters of the cache """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+class ChangeLogInvalidator:
+    """
+    Invalidate cached entities from the updater change log.
+
+    The log is read at most every CACHE_INVALIDATION_INTERVAL seconds, by the
+    request that happens to do a lookup at that time, and only the cached keys
+    are looked up. updates_log rows are dated at the start of the updater
+    transaction, so each read looks back one TTL before the previous one: a
+    change can only be missed by a transaction running longer than the TTL.
+    If the log cannot be read, the lookup goes on and entries expire by TTL.
+    """
+
+    def __init__(self, caches: dict[str, LookupCache], interval: float = CACHE_INVALIDATION_INTERVAL):
+        self.caches = caches
+        self.interval = interval
+        self.last_seen: datetime | None = None
+        self.next_check = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, db: Session):
+        """ Drop the cached entities changed since the previous read of the log """
+        if time.monotonic() < self.next_check or not self._lock.acquire(blocking=False):
+            return
+        try:
+            self.next_check = time.monotonic() + self.interval
+            now = db.execute(text("SELECT LOCALTIMESTAMP")).scalar()
+            if self.last_seen is None:
+                # Nothing cached can predate the first read
+                self.last_seen = now
+                return
+
+            since = self.last_seen - timedelta(seconds=max(cache.ttl for cache in self.caches.values()))
+            # Cheap check first: the log is usually only written by the nightly merge
+            if db.execute(text("SELECT 1 FROM updates_log WHERE update_date >= :since LIMIT 1"),
+                          {"since": since}).first() is not None:
+                for entity_type, cache in self.caches.items():
+                    # Probe the cached keys only, through the (entity_type, entity_id) index
+                    changed = db.execute(text("""
+                        SELECT DISTINCT entity_id FROM updates_log
+                        WHERE entity_type = :entity_type
+                        AND entity_id = ANY(:entity_ids)
+                        AND update_date >= :since
+                    """), {
+                        "entity_type": entity_type,
+                        "entity_ids": cache.keys(),
+                        "since": since,
+                    }).scalars().all()
+                    cache.invalidate(changed)
+            self.last_seen = now
+        except SQLAlchemyError as e:
+            # updates_log missing or being migrated: entries only expire by TTL until the next read,
+            # which looks back from the unchanged last_seen
+            print(f"Cache invalidation skipped: {e}")
+            db.rollback()
+        finally:
+            self._lock.release()
+
+
+siren_cache = LookupCache()
+siret_cache = LookupCache()
+invalidator = ChangeLogInvalidator({"unitelegale": siren_cache, "etablissement": siret_cache})
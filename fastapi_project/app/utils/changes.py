@@ -0,0 +1,120 @@
+import base64
+import os
+from datetime import datetime
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+
+# Entries younger than this are not served yet: update_date is the start time of the
+# updater transaction, so a merge still running may commit rows older than the newest ones
+CHANGES_SETTLE_SECONDS = int(os.getenv("CHANGES_SETTLE_SECONDS", "600"))
+
+# Current row of each logged entity (NULL when the row has been deleted)
+CHANGES_QUERY = """
+    SELECT l.id, l.update_date, l.entity_type, l.entity_id, l.update_type,
+           CASE l.entity_type
+               WHEN 'etablissement' THEN (
+                   SELECT to_jsonb(e) - 'content_hash' FROM etablissement e
+                   WHERE e.siret = l.entity_id
+               )
+               WHEN 'adresse' THEN (
+                   SELECT to_jsonb(a) - 'content_hash' FROM adresse a
+                   WHERE a.siret = l.entity_id LIMIT 1
+               )
+               WHEN 'unitelegale' THEN (
+                   SELECT to_jsonb(u) - 'content_hash' FROM unitelegale u
+                   WHERE u.siren = l.entity_id
+               )
+           END AS data
+    FROM updates_log l
+    WHERE l.update_date >= :since_date
+    AND (l.update_date, l.id) > (:since_date, :since_id)
+    AND l.update_date <= LOCALTIMESTAMP - make_interval(secs => :settle)
+    AND (CAST(:entity_type AS text) IS NULL OR l.entity_type = :entity_type)
+    ORDER BY l.update_date, l.id
+    LIMIT :page_size
+"""
+
+
+def encode_cursor(update_date: datetime, entry_id: int) -> str:
+    """ Build the opaque resume cursor of a change entry """
+    raw = f"{update_date.isoformat()}|{entry_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> tuple[datetime, int]:
+    """
+    Decode a resume cursor into its (update_date, id) key.
+
+    A plain ISO date or datetime is also accepted, to start from a point in time.
+
+    Raises:
+        ValueError: If the cursor is neither a change cursor nor an ISO date.
+    """
+    if not cursor:
+        return datetime.min, 0
+    try:
+        return datetime.fromisoformat(cursor), 0
+    except ValueError:
+        pass
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        update_date, entry_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(update_date), int(entry_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid changes cursor: {cursor}") from e
+
+
+def iter_changes(
+    db: Session,
+    since: str | None = None,
+    entity_type: str | None = None,
+    limit: int | None = None,
+    page_size: int = 1000,
+):
+    """
+    Iterate over the updater change log, joined to the current rows.
+
+    Pages are read with keyset pagination on (update_date, id): each page is an
+    ordered scan of the idx_log_date_id btree of the monthly partitions, stopped
+    after page_size rows, whatever the position in the log.
+
+    Args:
+        db (Session): Database session.
+        since (str): Resume cursor (or ISO date); the whole log when omitted.
+        entity_type (str): Only 'etablissement', 'adresse' or 'unitelegale' entries.
+        limit (int): Maximum number of entries to yield.
+        page_size (int): Entries fetched per query.
+
+    Yields:
+        dict: Change entry with its resume `cursor` and the current row in `data`.
+    """
+    since_date, since_id = decode_cursor(since)
+    remaining = limit
+
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        rows = db.execute(text(CHANGES_QUERY), {
+            "since_date": since_date,
+            "since_id": since_id,
+            "settle": CHANGES_SETTLE_SECONDS,
+            "entity_type": entity_type,
+            "page_size": size,
+        }).mappings().all()
+
+        for row in rows:
+            yield {
+                "cursor": encode_cursor(row["update_date"], row["id"]),
+                "id": row["id"],
+                "update_date": row["update_date"].isoformat(),
+                "entity_type": row["entity_type"],
+                "entity_id": row["entity_id"],
+                "update_type": row["update_type"],
+                "data": row["data"],
+            }
+
+        if len(rows) < size:
+            return
+        since_date, since_id = rows[-1]["update_date"], rows[-1]["id"]
+        if remaining is not None:
+            remaining -= len(rows)
+
@@ -0,0 +1,206 @@
+import os
+import json
+import math
+import base64
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+
+# Hard cap on the rows of one JSON page
+GEO_SEARCH_MAX_PAGE = int(os.getenv("GEO_SEARCH_MAX_PAGE", "10000"))
+# Hard cap on the rows of one streamed (NDJSON) search
+GEO_SEARCH_STREAM_MAX_ROWS = int(os.getenv("GEO_SEARCH_STREAM_MAX_ROWS", "500000"))
+# Rows fetched per query when streaming
+GEO_SEARCH_STREAM_PAGE = 5000
+# Clustering: cell width in screen pixels at a given zoom, and most cells across the search diameter
+GEO_CLUSTER_CELL_PIXELS = int(os.getenv("GEO_CLUSTER_CELL_PIXELS", "64"))
+GEO_CLUSTER_MAX_CELLS = int(os.getenv("GEO_CLUSTER_MAX_CELLS", "64"))
+
+# Mean radius of the WGS84 spheroid: the sphere PostGIS measures on with use_spheroid = false
+EARTH_RADIUS_METERS = 6371008.7714
+
+SEARCH_CENTER = "ST_SetSRID(ST_MakePoint(:longitude, :latitude), 4326)::geography"
+# Distances are measured on the sphere, so that sphere_distance gives the same values
+SEARCH_DISTANCE = f"ST_Distance(g.geog, {SEARCH_CENTER}, false)"
+SEARCH_WITHIN = f"ST_DWithin(g.geog, {SEARCH_CENTER}, :radius_meters, false)"
+
+# Keyset predicate and sort order of each ordering
+SEARCH_ORDERS = {
+    "siret": ("e.siret > :after_siret", "e.siret"),
+    "distance": (
+        f"({SEARCH_DISTANCE}, e.siret) > (:after_distance, :after_siret)",
+        "distance, e.siret",
+    ),
+}
+
+
+def encode_search_cursor(row: dict) -> str:
+    """ Build the cursor resuming a search after the given row """
+    key = {"siret": row["siret"], "distance": row["distance"]}
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str | None) -> dict:
+    """
+    Decode a search cursor into its keyset parameters.
+
+    Raises:
+        ValueError: If the cursor is invalid.
+    """
+    if not cursor:
+        return {"after_siret": "", "after_distance": -1.0}
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return {"after_siret": str(key["siret"]), "after_distance": float(key["distance"])}
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid search cursor: {cursor}") from e
+
+
+def search_page(db: Session, params: dict, order: str, after: dict, limit: int) -> list[dict]:
+    """
+    Fetch one page of the établissements of an activity within a radius.
+
+    Args:
+        db (Session): Database session.
+        params (dict): activity_code, latitude, longitude and radius_meters.
+        order (str): 'siret' or 'distance' (nearest first).
+        after (dict): Keyset of the last row already returned (see decode_search_cursor).
+        limit (int): Maximum number of rows.
+    """
+    keyset, order_by = SEARCH_ORDERS[order]
+    query = f"""
+        SELECT e.siret, g.x_longitude::float8 AS x, g.y_latitude::float8 AS y,
+               {SEARCH_DISTANCE} AS distance
+        FROM geolocalisation g
+        JOIN etablissement e ON g.siret = e.siret
+        WHERE e.activiteprincipaleetablissement = :activity_code
+        AND {SEARCH_WITHIN}
+        AND {keyset}
+        ORDER BY {order_by}
+        LIMIT :limit
+    """
+    rows = db.execute(text(query), {**params, **after, "limit": limit}).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def sphere_distance(longitude: float, latitude: float, center_longitude: float, center_latitude: float) -> float:
+    """ Great-circle distance in meters, as ST_Distance(geography, geography, false) """
+    phi, center_phi = math.radians(latitude), math.radians(center_latitude)
+    a = (math.sin((center_phi - phi) / 2) ** 2
+         + math.cos(phi) * math.cos(center_phi) * math.sin(math.radians(center_longitude - longitude) / 2) ** 2)
+    return 2 * EARTH_RADIUS_METERS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def search_candidates(db: Session, params: dict, max_rows: int) -> list[dict] | None:
+    """
+    Fetch the siret and coordinates of every établissement of a search.
+
+    Returns None when there are more than `max_rows` of them.
+    """
+    query = f"""
+        SELECT e.siret, g.x_longitude::float8 AS x, g.y_latitude::float8 AS y
+        FROM geolocalisation g
+        JOIN etablissement e ON g.siret = e.siret
+        WHERE e.activiteprincipaleetablissement = :activity_code
+        AND {SEARCH_WITHIN}
+        LIMIT :limit
+    """
+    rows = db.execute(text(query), {**params, "limit": max_rows + 1}).mappings().all()
+    return None if len(rows) > max_rows else [dict(row) for row in rows]
+
+
+def within_radius(candidates: list[dict], latitude: float, longitude: float, radius_meters: float) -> list[dict]:
+    """ Keep the candidates inside a search circle, with their distance to its center """
+    rows = []
+    for row in candidates:
+        distance = sphere_distance(row["x"], row["y"], longitude, latitude)
+        if distance <= radius_meters:
+            rows.append({**row, "distance": distance})
+    return rows
+
+
+def keyset_page(rows: list[dict], order: str, after: dict, limit: int) -> list[dict]:
+    """ In-memory search_page over rows carrying their distance """
+    if order == "distance":
+        start = (after["after_distance"], after["after_siret"])
+        key = lambda row: (row["distance"], row["siret"])
+    else:
+        start = after["after_siret"]
+        key = lambda row: row["siret"]
+    return sorted((row for row in rows if key(row) > start), key=key)[:limit]
+
+
+def iter_search(db: Session, params: dict, order: str, after: dict, limit: int):
+    """
+    Iterate over the rows of a search, one keyset page at a time.
+
+    Only one page is held in memory; when `limit` rows have been yielded and more
+    remain, a final {"next_cursor": ...} entry tells how to resume.
+    """
+    remaining = limit
+    last = None
+    while True:
+        size = min(GEO_SEARCH_STREAM_PAGE, remaining + 1)
+        rows = search_page(db, params, order, after, size)
+        page = rows[:remaining]
+        yield from page
+        if page:
+            last = page[-1]
+        if len(rows) > remaining:
+            yield {"next_cursor": encode_search_cursor(last)}
+            return
+        remaining -= len(rows)
+        if len(rows) < size:
+            return
+        after = {"after_siret": rows[-1]["siret"], "after_distance": rows[-1]["distance"]}
+
+
+def cluster_cell_size(radius_meters: float, zoom: int | None = None, cell_size: float | None = None) -> float:
+    """
+    Return the clustering grid size in degrees.
+
+    `cell_size` wins over `zoom`, which maps to GEO_CLUSTER_CELL_PIXELS on a 256px
+    web map tile. Without either, the search diameter is split in
+    GEO_CLUSTER_MAX_CELLS cells; it is also the finest grid allowed, which bounds
+    the number of buckets whatever the radius.
+    """
+    min_size = 2 * radius_meters / 111_320 / GEO_CLUSTER_MAX_CELLS
+    if cell_size is None and zoom is not None:
+        cell_size = 360 / 2 ** zoom / 256 * GEO_CLUSTER_CELL_PIXELS
+    return max(cell_size or min_size, min_size)
+
+
+def search_clusters(db: Session, params: dict, cell_size: float) -> list[dict]:
+    """
+    Aggregate the établissements of a search in grid cells.
+
+    Points are grouped with ST_SnapToGrid; each cell gives its count and the
+    centroid of its points, and the siret when it holds a single one.
+    """
+    query = f"""
+        SELECT avg(g.x_longitude)::float8 AS x, avg(g.y_latitude)::float8 AS y, count(*) AS count,
+               CASE WHEN count(*) = 1 THEN min(e.siret) END AS siret
+        FROM geolocalisation g
+        JOIN etablissement e ON g.siret = e.siret
+        WHERE e.activiteprincipaleetablissement = :activity_code
+        AND {SEARCH_WITHIN}
+        GROUP BY ST_SnapToGrid(g.geog::geometry, :cell_size)
+    """
+    rows = db.execute(text(query), {**params, "cell_size": cell_size}).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def cluster_rows(rows: list[dict], cell_size: float) -> list[dict]:
+    """ In-memory search_clusters: rows are grouped by their nearest grid point """
+    cells = {}
+    for row in rows:
+        cell = (math.floor(row["x"] / cell_size + 0.5), math.floor(row["y"] / cell_size + 0.5))
+        cells.setdefault(cell, []).append(row)
+    return [
+        {
+            "x": sum(row["x"] for row in members) / len(members),
+            "y": sum(row["y"] for row in members) / len(members),
+            "count": len(members),
+            "siret": members[0]["siret"] if len(members) == 1 else None,
+        }
+        for members in cells.values()
+    ]
@@ -0,0 +1,31 @@
+import json
+from decimal import Decimal
+from pydantic import BaseModel
+
+
+def _json_default(value):
+    """ Encode NUMERIC values as JSON numbers, anything else (dates...) as strings """
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def to_ndjson(entries):
+    """ Serialize dictionaries as newline-delimited JSON """
+    for entry in entries:
+        yield json.dumps(entry, default=_json_default, ensure_ascii=False) + "\n"
+
+
+def lookup_lines(ids: list[str], rows: list, key: str, schema: type[BaseModel]):
+    """
+    Build one result line per requested identifier, in request order.
+
+    Identifiers without a matching row are reported inline with `found: false`.
+    """
+    by_id = {getattr(row, key): row for row in rows}
+    for entity_id in ids:
+        row = by_id.get(entity_id)
+        if row is None:
+            yield {key: entity_id, "found": False}
+        else:
+            yield {key: entity_id, "found": True, "data": schema.model_validate(row).model_dump(mode="json")}
@@ -0,0 +1,155 @@
+import os
+import json
+import math
+import time
+import zlib
+import threading
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+from app.utils.geo_search import search_candidates
+
+try:
+    import redis
+except ImportError:  # Optional: the in-process backend is used without it
+    redis = None
+
+REDIS_URL = os.getenv("REDIS_URL")
+GEO_CACHE_TTL_SECONDS = int(os.getenv("GEO_CACHE_TTL_SECONDS", "3600"))
+# Cache keys snap search centers to this grid (degrees, about 100m) and round the radius up to 100m
+GEO_CACHE_GRID = float(os.getenv("GEO_CACHE_GRID", "0.001"))
+# Farthest a snapped center can be from the requested one (a degree is at most 111.32 km)
+GEO_CACHE_MAX_SHIFT_METERS = GEO_CACHE_GRID / 2 * 111_320 * math.sqrt(2)
+# Largest candidate set shared by nearby searches; bigger searches are cached per exact request
+GEO_CACHE_MAX_CANDIDATES = int(os.getenv("GEO_CACHE_MAX_CANDIDATES", "20000"))
+# Minimum delay between two reads of the data version
+GEO_CACHE_VERSION_INTERVAL = float(os.getenv("GEO_CACHE_VERSION_INTERVAL", "10"))
+
+
+class MemoryBackend:
+    """ In-process stand-in for Redis, for tests and single-worker deployments """
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._values[key]
+                return None
+            return value
+
+    def setex(self, key: str, ttl: int, value: bytes):
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._next_sweep:
+                # Entries never read again are dropped here, once a minute
+                for expired in [k for k, (expires_at, _) in self._values.items() if expires_at <= now]:
+                    del self._values[expired]
+                self._next_sweep = now + 60
+            self._values[key] = (now + ttl, value)
+
+
+class ResultCache:
+    """
+    Shared cache of search results, stored as zlib-compressed JSON.
+
+    Keys embed the data version, the latest update_checkpoint write of the updater:
+    once a merge commits, new searches miss and the stale entries expire by TTL.
+    """
+
+    def __init__(self, backend, ttl: int = GEO_CACHE_TTL_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+        self._version = None
+        self._version_checked = 0.0
+
+    def data_version(self, db: Session) -> str:
+        """ Return the current data version, read at most every GEO_CACHE_VERSION_INTERVAL """
+        if self._version is None or time.monotonic() - self._version_checked >= GEO_CACHE_VERSION_INTERVAL:
+            try:
+                version = db.execute(text("SELECT max(updated_at) FROM update_checkpoint")).scalar()
+            except SQLAlchemyError:
+                # The updater has not run yet on this database
+                db.rollback()
+                version = None
+            self._version = version.strftime("%Y%m%d%H%M%S%f") if version else "0"
+            self._version_checked = time.monotonic()
+        return self._version
+
+    def get(self, key: str):
+        """ Return the cached payload of a key, or None """
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            print(f"Result cache unavailable: {e}")
+            return None
+        return None if value is None else json.loads(zlib.decompress(value))
+
+    def set(self, key: str, payload):
+        """ Store a payload for TTL seconds """
+        value = zlib.compress(json.dumps(payload, default=str).encode())
+        try:
+            self.backend.setex(key, self.ttl, value)
+        except Exception as e:
+            print(f"Result cache unavailable: {e}")
+
+
+def snap(value: float, grid: float = GEO_CACHE_GRID) -> float:
+    """ Snap a coordinate to the cache grid (cache keys only, searches use the exact center) """
+    return round(round(value / grid) * grid, 6)
+
+
+def snap_radius(radius: float) -> float:
+    """ Round a radius in kilometers up to 100m (cache keys only) """
+    return math.ceil(round(radius * 10, 6)) / 10
+
+
+def geo_search_key(version: str, activity_code: str, latitude: float, longitude: float, radius: float, *extra) -> str:
+    """ Build the cache key of a radius search from its filters """
+    parts = [version, activity_code.strip().upper(), repr(float(latitude)), repr(float(longitude)), repr(float(radius))]
+    parts.extend(str(value) for value in extra)
+    return "geo:" + ":".join(parts)
+
+
+def cached_candidates(db: Session, activity_code: str, latitude: float, longitude: float, radius: float):
+    """
+    Return the candidates of a radius search, shared by the nearby searches.
+
+    The entry holds the établissements around the snapped center within the
+    snapped radius plus GEO_CACHE_MAX_SHIFT_METERS: a superset of every circle
+    mapped to the same key, to filter with geo_search.within_radius. None when
+    there are more than GEO_CACHE_MAX_CANDIDATES of them.
+    """
+    center_latitude, center_longitude, snapped_radius = snap(latitude), snap(longitude), snap_radius(radius)
+    key = geo_search_key(
+        geo_cache.data_version(db), activity_code, center_latitude, center_longitude, snapped_radius, "candidates"
+    )
+    cached = geo_cache.get(key)
+    if cached is None:
+        cached = {"candidates": search_candidates(db, {
+            "activity_code": activity_code,
+            "latitude": center_latitude,
+            "longitude": center_longitude,
+            "radius_meters": snapped_radius * 1000 + GEO_CACHE_MAX_SHIFT_METERS,
+        }, GEO_CACHE_MAX_CANDIDATES)}
+        geo_cache.set(key, cached)
+    return cached["candidates"]
+
+
+def _create_backend():
+    """ Redis when REDIS_URL is set, the in-process backend otherwise """
+    if REDIS_URL:
+        if redis is None:
+            raise RuntimeError("REDIS_URL is set but the redis package is not installed")
+        return redis.Redis.from_url(REDIS_URL)
+    return MemoryBackend()
+
+
+geo_cache = ResultCache(_create_backend())
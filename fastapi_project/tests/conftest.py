@@ -0,0 +1,5 @@
+import os
+
+# The routes import app.database, which creates its engines at import time; no connection is opened
+os.environ.setdefault("SIREN_DATABASE_URL", "sqlite://")
+os.environ.setdefault("USER_API_DATABASE_URL", "sqlite://")
@@ -0,0 +1,73 @@
+"""Tests of the SIREN and SIRET batch lookups."""
+
+import json
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import get_siren_db
+from app.routes import siren, siret
+from app.schemas.unitelegale import UniteLegaleResponse
+from app.utils.ndjson import lookup_lines
+
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "5000"))
+
+
+def unite_legale(siren_number):
+    """ ORM-like row of unitelegale """
+    return SimpleNamespace(siren=siren_number, denominationunitelegale=f"Société {siren_number}")
+
+
+@pytest.fixture
+def client():
+    """ Client of the batch routes over a session returning the rows found """
+    db = MagicMock()
+    app = FastAPI()
+    app.include_router(siren.router, prefix="/api")
+    app.include_router(siret.router, prefix="/api")
+    app.dependency_overrides[get_siren_db] = lambda: db
+    return TestClient(app), db
+
+
+def test_lookup_lines_follow_the_request_order():
+    """ One line per identifier, in request order, misses reported inline """
+    rows = [unite_legale("222222222"), unite_legale("111111111")]
+
+    lines = list(lookup_lines(["111111111", "333333333", "222222222"], rows, "siren", UniteLegaleResponse))
+
+    assert [(line["siren"], line["found"]) for line in lines] == [
+        ("111111111", True), ("333333333", False), ("222222222", True),
+    ]
+    assert lines[0]["data"]["denominationunitelegale"] == "Société 111111111"
+    assert lines[1] == {"siren": "333333333", "found": False}
+
+
+def test_batch_streams_deduplicated_ndjson(client):
+    """ Repeated identifiers are looked up and returned once """
+    http, db = client
+    query = db.query.return_value.filter.return_value.params
+    query.return_value.all.return_value = [unite_legale("111111111")]
+
+    response = http.post("/api/siren/batch", json={"sirens": ["111111111", "999999999", "111111111"]})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [(line["siren"], line["found"]) for line in lines] == [("111111111", True), ("999999999", False)]
+    assert query.call_args.kwargs == {"ids": ["111111111", "999999999"]}
+
+
+@pytest.mark.parametrize("path, field, width", [("/api/siren/batch", "sirens", 9), ("/api/siret/batch", "sirets", 14)])
+def test_batch_rejects_too_many_ids(client, path, field, width):
+    """ Above BATCH_MAX_IDS identifiers, the request is invalid """
+    http, db = client
+    ids = [f"{n:0{width}d}" for n in range(BATCH_MAX_IDS + 1)]
+
+    response = http.post(path, json={field: ids})
+
+    assert response.status_code == 422
+    db.query.assert_not_called()
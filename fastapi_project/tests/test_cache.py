@@ -0,0 +1,69 @@
+"""Tests of the identifier lookup cache."""
+
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from sqlalchemy.exc import OperationalError
+
+from app.utils.cache import ChangeLogInvalidator, LookupCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    """ Above the bound, the entry read the longest ago goes first """
+    cache = LookupCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    """ An expired entry is a miss """
+    cache = LookupCache(max_entries=10, ttl=0.05)
+    cache.set("a", [])
+    assert cache.get("a") == []
+    time.sleep(0.06)
+
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 1, 1)
+
+
+def test_changed_entities_are_invalidated():
+    """ Cached keys found in updates_log are dropped """
+    cache = LookupCache(max_entries=10, ttl=60)
+    cache.set("123456789", ["old"])
+    cache.set("987654321", ["kept"])
+    invalidator = ChangeLogInvalidator({"unitelegale": cache}, interval=0)
+    invalidator.last_seen = datetime(2025, 2, 26)
+
+    db = MagicMock()
+    db.execute.return_value.scalar.return_value = datetime(2025, 2, 27)
+    db.execute.return_value.first.return_value = (1,)
+    db.execute.return_value.scalars.return_value.all.return_value = ["123456789"]
+    invalidator.refresh(db)
+
+    assert cache.get("123456789") is None
+    assert cache.get("987654321") == ["kept"]
+    assert invalidator.last_seen == datetime(2025, 2, 27)
+
+
+def test_log_errors_do_not_fail_the_lookup():
+    """ An unreadable updates_log rolls back and leaves the read position unchanged """
+    cache = LookupCache(max_entries=10, ttl=60)
+    cache.set("123456789", ["cached"])
+    invalidator = ChangeLogInvalidator({"unitelegale": cache}, interval=0)
+    invalidator.last_seen = datetime(2025, 2, 26)
+
+    db = MagicMock()
+    db.execute.side_effect = OperationalError("SELECT", {}, Exception("relation does not exist"))
+    invalidator.refresh(db)
+
+    db.rollback.assert_called_once()
+    assert invalidator.last_seen == datetime(2025, 2, 26)
+    assert cache.get("123456789") == ["cached"]
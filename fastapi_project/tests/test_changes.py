@@ -0,0 +1,85 @@
+"""Tests of the change log resume cursors."""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.utils.changes import decode_cursor, encode_cursor, iter_changes
+
+START = datetime(2024, 3, 1)
+# Two entries share each date: the id breaks the tie
+LOG = [
+    {"id": n, "update_date": START + timedelta(seconds=n // 2), "entity_type": "etablissement",
+     "entity_id": f"{n:014d}", "update_type": "UPDATE", "data": {"n": n}}
+    for n in range(1, 12)
+]
+
+
+def log_session():
+    """ Session answering CHANGES_QUERY with the LOG entries after the keyset """
+    db = MagicMock()
+
+    def execute(query, params):
+        key = (params["since_date"], params["since_id"])
+        rows = [row for row in LOG if (row["update_date"], row["id"]) > key][:params["page_size"]]
+        db.pages.append((key, params["page_size"]))
+        result = MagicMock()
+        result.mappings.return_value.all.return_value = rows
+        return result
+
+    db.pages = []
+    db.execute.side_effect = execute
+    return db
+
+
+def test_cursor_round_trip():
+    """ A cursor resumes after the date and id of its entry """
+    update_date = datetime(2024, 3, 1, 2, 15, 30, 123456)
+
+    cursor = encode_cursor(update_date, 42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (update_date, 42)
+
+
+@pytest.mark.parametrize("since, expected", [
+    (None, (datetime.min, 0)),
+    ("2024-03-01", (datetime(2024, 3, 1), 0)),
+    ("2024-03-01T02:15:00", (datetime(2024, 3, 1, 2, 15), 0)),
+])
+def test_dates_start_from_a_point_in_time(since, expected):
+    """ A plain ISO date starts before every entry of that instant """
+    assert decode_cursor(since) == expected
+
+
+@pytest.mark.parametrize("since", ["yesterday", "MjAyNC0wMy0wMQ", "MjAyNC0wMy0wMXx4"])
+def test_invalid_cursor_is_rejected(since):
+    """ Garbage, a cursor without id and a cursor with a non-numeric id are invalid """
+    with pytest.raises(ValueError):
+        decode_cursor(since)
+
+
+def test_changes_are_read_one_keyset_page_at_a_time():
+    """ Each page resumes after the last (update_date, id) of the previous one """
+    db = log_session()
+
+    entries = list(iter_changes(db, page_size=4))
+
+    assert [entry["id"] for entry in entries] == [row["id"] for row in LOG]
+    assert db.pages == [
+        ((datetime.min, 0), 4),
+        ((LOG[3]["update_date"], 4), 4),
+        ((LOG[7]["update_date"], 8), 4),
+    ]
+
+
+def test_changes_resume_from_a_cursor_and_stop_at_the_limit():
+    """ Following the cursor of the last entry yields the next entries, limit bounds each call """
+    db = log_session()
+
+    first = list(iter_changes(db, limit=5, page_size=3))
+    second = list(iter_changes(db, since=first[-1]["cursor"], limit=5, page_size=3))
+
+    assert [entry["id"] for entry in first + second] == list(range(1, 11))
+    assert db.pages[1] == ((LOG[2]["update_date"], 3), 2)
@@ -0,0 +1,18 @@
+"""Tests of the search clustering grid."""
+
+import pytest
+
+from app.utils import geo_search
+from app.utils.geo_search import GEO_CLUSTER_MAX_CELLS, cluster_cell_size
+
+
+def test_cluster_cell_size():
+    """ cellSize wins over zoom, and neither can go below the finest grid of the radius """
+    finest = 2 * 5000 / 111_320 / GEO_CLUSTER_MAX_CELLS
+
+    assert cluster_cell_size(5000) == pytest.approx(finest)
+    assert cluster_cell_size(5000, cell_size=0.01) == 0.01
+    assert cluster_cell_size(5000, zoom=10, cell_size=0.01) == 0.01
+    assert cluster_cell_size(5000, zoom=10) == pytest.approx(360 / 2 ** 10 / 256 * geo_search.GEO_CLUSTER_CELL_PIXELS)
+    assert cluster_cell_size(5000, zoom=20) == pytest.approx(finest)
+    assert cluster_cell_size(5000, cell_size=1e-9) == pytest.approx(finest)
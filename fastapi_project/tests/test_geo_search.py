@@ -0,0 +1,68 @@
+"""Tests of the geo search pagination helpers."""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.utils import geo_search
+from app.utils.geo_search import (
+    decode_search_cursor,
+    encode_search_cursor,
+    iter_search,
+)
+
+ROWS = [{"siret": f"{n:014d}", "distance": float(n)} for n in range(23)]
+
+
+def fake_search_page(db, params, order, after, limit):
+    """ Keyset page over ROWS, ordered by distance then siret """
+    key = (after["after_distance"], after["after_siret"])
+    return [row for row in ROWS if (row["distance"], row["siret"]) > key][:limit]
+
+
+def test_cursor_round_trip():
+    """ A cursor resumes after the siret and distance of its row """
+    cursor = encode_search_cursor({"siret": "12345678901234", "distance": 152.5, "x": 2.35})
+
+    assert "=" not in cursor
+    assert decode_search_cursor(cursor) == {"after_siret": "12345678901234", "after_distance": 152.5}
+
+
+def test_missing_cursor_starts_from_the_beginning():
+    """ Without a cursor, the keyset is below any row """
+    assert decode_search_cursor(None) == {"after_siret": "", "after_distance": -1.0}
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", "WzEsMl0"])
+def test_invalid_cursor_is_rejected(cursor):
+    """ Garbage, a JSON object without keys and a JSON list are all invalid """
+    with pytest.raises(ValueError):
+        decode_search_cursor(cursor)
+
+
+@pytest.mark.parametrize("limit", [1, 4, 5, 9, 10, 22])
+def test_search_resumes_where_the_previous_one_stopped(limit):
+    """ Following next_cursor walks every row once, across query pages """
+    seen = []
+    cursor = None
+    with patch.object(geo_search, "search_page", fake_search_page), \
+         patch.object(geo_search, "GEO_SEARCH_STREAM_PAGE", 5):
+        while True:
+            entries = list(iter_search(None, {}, "distance", decode_search_cursor(cursor), limit))
+            rows = [entry for entry in entries if "next_cursor" not in entry]
+            assert len(rows) <= limit
+            seen.extend(rows)
+            if "next_cursor" not in entries[-1]:
+                break
+            cursor = entries[-1]["next_cursor"]
+
+    assert seen == ROWS
+
+
+def test_search_without_more_rows_has_no_cursor():
+    """ A search returning exactly the remaining rows ends without next_cursor """
+    with patch.object(geo_search, "search_page", fake_search_page), \
+         patch.object(geo_search, "GEO_SEARCH_STREAM_PAGE", 5):
+        entries = list(iter_search(None, {}, "distance", decode_search_cursor(None), len(ROWS)))
+
+    assert entries == ROWS
@@ -0,0 +1,21 @@
+"""Tests of the NDJSON helpers."""
+
+import json
+from datetime import date
+from decimal import Decimal
+
+from app.utils.ndjson import to_ndjson
+
+
+def test_numeric_values_are_json_numbers():
+    """ NUMERIC coordinates stay numbers, as in the JSON responses """
+    line = next(to_ndjson([{"siret": "12345678901234", "x": Decimal("2.35"), "y": Decimal("48.85")}]))
+    entry = json.loads(line)
+    assert isinstance(entry["x"], float) and isinstance(entry["y"], float)
+    assert entry == {"siret": "12345678901234", "x": 2.35, "y": 48.85}
+
+
+def test_one_entry_per_line():
+    """ Each entry is one newline-terminated JSON document """
+    lines = list(to_ndjson([{"day": date(2025, 2, 26)}, {"nom": "Société"}]))
+    assert lines == ['{"day": "2025-02-26"}\n', '{"nom": "Société"}\n']
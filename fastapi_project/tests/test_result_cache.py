@@ -0,0 +1,137 @@
+"""Tests of the geo search result cache."""
+
+import math
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import get_siren_db
+from app.routes import compagny
+from app.utils import result_cache
+from app.utils.geo_search import EARTH_RADIUS_METERS, cluster_rows, sphere_distance
+from app.utils.result_cache import MemoryBackend, ResultCache, geo_search_key, snap, snap_radius
+
+# Requested center, snapped south-west to (48.849, 2.349) in cache keys
+LATITUDE, LONGITUDE = 48.8494, 2.3494
+
+
+def offset(distance, bearing):
+    """ Point at `distance` meters from the requested center, `bearing` degrees from north """
+    meters_per_degree = EARTH_RADIUS_METERS * math.pi / 180
+    return (
+        LONGITUDE + distance * math.sin(math.radians(bearing)) / (meters_per_degree * math.cos(math.radians(LATITUDE))),
+        LATITUDE + distance * math.cos(math.radians(bearing)) / meters_per_degree,
+    )
+
+
+@pytest.fixture
+def client():
+    """ Client of the search routes over a fresh cache and an in-memory table """
+    table = []
+
+    def candidates(db, params, max_rows):
+        rows = [
+            row for row in table
+            if sphere_distance(row["x"], row["y"], params["longitude"], params["latitude"]) <= params["radius_meters"]
+        ]
+        return None if len(rows) > max_rows else rows
+
+    cache = ResultCache(MemoryBackend())
+    app = FastAPI()
+    app.include_router(compagny.router, prefix="/api")
+    app.dependency_overrides[get_siren_db] = lambda: MagicMock()
+    with patch.object(result_cache, "geo_cache", cache), patch.object(compagny, "geo_cache", cache), \
+         patch.object(cache, "data_version", return_value="1"), \
+         patch.object(result_cache, "search_candidates", side_effect=candidates) as search_candidates:
+        yield TestClient(app), table, search_candidates
+
+
+@pytest.mark.parametrize("radius, expected", [(0.01, 0.1), (0.1, 0.1), (0.14, 0.2), (0.3, 0.3), (10, 10.0)])
+def test_radius_is_rounded_up(radius, expected):
+    """ A normalized radius never searches less than requested, nor zero """
+    assert snap_radius(radius) == expected
+
+
+def test_nearby_searches_share_a_key():
+    """ Filters are normalized: case, surrounding spaces and nearby centers """
+    first = geo_search_key("1", " 56.10a ", snap(48.8490995), snap(2.3388232), snap_radius(4.96))
+    second = geo_search_key("1", "56.10A", snap(48.8492), snap(2.3387), snap_radius(5.0))
+    assert first == second == "geo:1:56.10A:48.849:2.339:5.0"
+    assert geo_search_key("2", "56.10A", 48.849, 2.339, 5.0) != first
+
+
+def test_payload_round_trip():
+    """ Payloads are stored compressed and read back unchanged """
+    backend = MemoryBackend()
+    cache = ResultCache(backend, ttl=60)
+    payload = [{"siret": "12345678901234", "x": 2.35, "y": 48.85}] * 100
+
+    cache.set("geo:key", payload)
+
+    assert cache.get("geo:key") == payload
+    assert len(backend.get("geo:key")) < len(str(payload))
+    assert cache.get("geo:other") is None
+
+
+def test_search_covers_the_exact_circle(client):
+    """ Points near the edge are kept on the far side of the snapping shift, dropped on the near side """
+    http, table, _ = client
+    far_x, far_y = offset(990, 45)
+    near_x, near_y = offset(1010, 225)
+    table += [{"siret": "1", "x": far_x, "y": far_y}, {"siret": "2", "x": near_x, "y": near_y}]
+    # The snapped circle alone would get both wrong
+    assert sphere_distance(far_x, far_y, snap(LONGITUDE), snap(LATITUDE)) > 1000
+    assert sphere_distance(near_x, near_y, snap(LONGITUDE), snap(LATITUDE)) < 1000
+
+    response = http.post("/api/companies/search", json={
+        "activityCode": "56.10A", "latitude": LATITUDE, "longitude": LONGITUDE, "radius": 1, "orderBy": "distance"
+    })
+
+    assert response.status_code == 200
+    assert [row["siret"] for row in response.json()] == ["1"]
+    assert response.json()[0]["distance"] == pytest.approx(990, abs=0.5)
+
+
+def test_nearby_searches_share_their_candidates(client):
+    """ One candidate query serves nearby centers, each filtered against its own circle """
+    http, table, search_candidates = client
+    table += [{"siret": str(n), "x": x, "y": y} for n, (x, y) in enumerate([offset(995, 0), offset(950, 180)])]
+    search = {"activityCode": "56.10a", "latitude": LATITUDE, "longitude": LONGITUDE, "radius": 1}
+
+    first = http.post("/api/companies/search", json=search).json()
+    # 22m south, same snapped center
+    moved = http.post("/api/companies/search", json={**search, "latitude": LATITUDE - 0.0002}).json()
+
+    assert search_candidates.call_count == 1
+    assert [row["siret"] for row in first] == ["0", "1"]
+    assert [row["siret"] for row in moved] == ["1"]
+
+
+def test_uncached_searches_query_the_exact_circle(client):
+    """ Streamed and oversized searches run on the requested center and radius """
+    http, _, search_candidates = client
+    search_candidates.side_effect = lambda db, params, max_rows: None
+    exact = {"latitude": LATITUDE, "longitude": LONGITUDE, "radius_meters": 1000}
+    search = {"activityCode": "56.10A", "latitude": LATITUDE, "longitude": LONGITUDE, "radius": 1}
+
+    with patch.object(compagny, "search_page", return_value=[]) as search_page, \
+         patch.object(compagny, "iter_search", return_value=iter([])) as iter_search, \
+         patch.object(compagny, "SirenSessionLocal"):
+        http.post("/api/companies/search", json=search)
+        http.post("/api/companies/search", json=search, headers={"Accept": "application/x-ndjson"})
+
+    assert search_page.call_args.args[1] == {"activity_code": "56.10A", **exact}
+    assert iter_search.call_args.args[1] == {"activity_code": "56.10A", **exact}
+
+
+def test_cached_candidates_are_clustered_on_the_grid():
+    """ Rows snapped to the same grid point share a cluster, a lone row keeps its siret """
+    rows = [{"siret": "1", "x": 2.3401, "y": 48.8501}, {"siret": "2", "x": 2.3403, "y": 48.8499},
+            {"siret": "3", "x": 2.3452, "y": 48.8501}]
+
+    clusters = sorted(cluster_rows(rows, 0.001), key=lambda cluster: cluster["x"])
+
+    assert [(cluster["count"], cluster["siret"]) for cluster in clusters] == [(2, None), (1, "3")]
+    assert clusters[0]["x"] == pytest.approx(2.3402) and clusters[0]["y"] == pytest.approx(48.85)